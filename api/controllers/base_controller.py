@@ -1,9 +1,11 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Response
 from sqlalchemy.exc import SQLAlchemyError
-from typing import Type, TypeVar, Generic, List, Optional, Any
+from typing import Type, TypeVar, Generic, List, Optional, Any, Dict, Tuple
 from functools import wraps
 from pydantic import BaseModel
+from sqlalchemy.orm import Query
+from ..utils.pagination import DEFAULT_PAGE_SIZE, encode_cursor, decode_cursor, keyset_after
 
 # Define generic types
 ModelType = TypeVar("ModelType")
@@ -58,6 +60,10 @@ class BaseCRUDController(Generic[ModelType, CreateSchemaType, UpdateSchemaType])
     """
     CRUD controller with common operations.
     """
+    # Keyset of read_page: columns giving a stable order, ending with the primary key
+    page_keys: Tuple[str, ...] = ("id",)
+    page_descending: bool = False
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
@@ -80,10 +86,55 @@ class BaseCRUDController(Generic[ModelType, CreateSchemaType, UpdateSchemaType])
         """Retrieve all items."""
         return db.query(self.model).all()
 
+    def load_options(self) -> Tuple:
+        """Loader options of the queries whose results are returned to the client"""
+        return ()
+
+    def base_query(self, db: Session) -> Query:
+        """Query of the model with load_options applied"""
+        return db.query(self.model).options(*self.load_options())
+
+    def list_query(self, db: Session) -> Query:
+        """Base query of list endpoints; override to add filters"""
+        return self.base_query(db)
+
+    @handle_db_errors
+    def read_page(self, db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                  include_total: bool = False) -> Dict[str, Any]:
+        """
+        Retrieve one page of items, keyset-paginated on page_keys.
+        Each page seeks past the previous page's last row instead of skipping
+        rows, so deep pages cost the same as the first one.
+        :param db:
+        :param limit: page size
+        :param cursor: next_cursor of the previous page
+        :param include_total: also count all items (a full scan on big tables)
+        :return: PaginatedResponse fields
+        """
+        columns = [getattr(self.model, name) for name in self.page_keys]
+        query = self.list_query(db)
+        if cursor:
+            values = decode_cursor(cursor, len(columns))
+            query = query.filter(keyset_after(columns, values, self.page_descending))
+
+        ordering = [column.desc() if self.page_descending else column.asc() for column in columns]
+        # One extra row tells whether another page follows
+        items = query.order_by(*ordering).limit(limit + 1).all()
+        has_more = len(items) > limit
+        items = items[:limit]
+
+        return {
+            "items": items,
+            "total": self.list_query(db).order_by(None).count() if include_total else None,
+            "limit": limit,
+            "has_more": has_more,
+            "next_cursor": encode_cursor([getattr(items[-1], name) for name in self.page_keys]) if has_more else None,
+        }
+
     @handle_db_errors
     def read_one(self, db: Session, item_id: int) -> ModelType:
         """Retrieve a single item by ID."""
-        item = db.query(self.model).filter(self.model.id == item_id).first()
+        item = self.base_query(db).filter(self.model.id == item_id).first()
         if not item:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -110,7 +161,7 @@ class BaseCRUDController(Generic[ModelType, CreateSchemaType, UpdateSchemaType])
 
         item.update(update_data, synchronize_session=False)
         db.commit()
-        return item.first()
+        return self.base_query(db).filter(self.model.id == item_id).first()
 
     @handle_db_errors
     def delete(self, db: Session, item_id: int) -> Response:
@@ -3,9 +3,10 @@ from fastapi import HTTPException, status, Response
 from ..models import menu_item_ingredients as model
 from ..schemas import menu_item_ingredients as schema
 from .base_controller import BaseCRUDController
-from ..utils.caching import cache
+from ..utils.caching import cache, MENU_CACHE_TAG
+from ..utils.recipe_index import recipe_index
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 
 class MenuItemIngredientController(BaseCRUDController[model.MenuItemIngredient, schema.MenuItemIngredientCreate, schema.MenuItemIngredientUpdate]):
@@ -29,7 +30,8 @@ class MenuItemIngredientController(BaseCRUDController[model.MenuItemIngredient,
             # Create the item using parent method
             new_item = super().create(db, request)
 
-            # Invalidate menu cache
+            # Refresh the recipe index and invalidate menu cache
+            recipe_index.refresh_items(db, [new_item.menu_item_id])
             self._invalidate_menu_cache()
 
             return new_item
@@ -42,11 +44,21 @@ class MenuItemIngredientController(BaseCRUDController[model.MenuItemIngredient,
             )
 
     def update(self, db: Session, item_id: int, request: schema.MenuItemIngredientUpdate) -> model.MenuItemIngredient:
-        """Override update to invalidate cache"""
+        """Override update to refresh the recipe index and invalidate cache"""
+        previous_menu_item_id = self.read_one(db, item_id).menu_item_id
         updated_item = super().update(db, item_id, request)
+        recipe_index.refresh_items(db, [previous_menu_item_id, updated_item.menu_item_id])
         self._invalidate_menu_cache()
         return updated_item
 
+    def delete(self, db: Session, item_id: int) -> Response:
+        """Override delete to refresh the recipe index and invalidate cache"""
+        menu_item_id = self.read_one(db, item_id).menu_item_id
+        response = super().delete(db, item_id)
+        recipe_index.refresh_items(db, [menu_item_id])
+        self._invalidate_menu_cache()
+        return response
+
     def get_ingredients_for_menu_item(self, db: Session, menu_item_id: int) -> List[Dict[str, Any]]:
         """Get all ingredients for a specific menu item"""
         try:
@@ -71,8 +83,7 @@ class MenuItemIngredientController(BaseCRUDController[model.MenuItemIngredient,
 
     def _invalidate_menu_cache(self):
         """Invalidate menu-related cache entries"""
-        cache.clear_pattern("menu_search:*")
-        cache.clear_pattern("menu_item:*")
+        cache.invalidate_tags(MENU_CACHE_TAG)
 
 
 # Create controller instance
@@ -87,6 +98,9 @@ def create(db: Session, request: schema.MenuItemIngredientCreate):
 def read_all(db: Session):
     return menu_item_ingredient_controller.read_all(db)
 
+def read_page(db: Session, limit: int, cursor: Optional[str] = None, include_total: bool = False):
+    return menu_item_ingredient_controller.read_page(db, limit, cursor, include_total)
+
 
 def read_one(db: Session, item_id: int):
     return menu_item_ingredient_controller.read_one(db, item_id)
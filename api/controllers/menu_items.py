@@ -4,8 +4,10 @@ from ..models import menu_items as model
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import func
 from ..models.reviews import Reviews
-from ..models.menu_item_ingredients import MenuItemIngredient
 from ..models.resources import Resource
+from ..utils.recipe_index import recipe_index
+from ..utils.search_index import menu_search_index
+from ..utils.caching import cache, MENU_CACHE_TAG
 
 
 def create(db: Session, request):
@@ -41,6 +43,8 @@ def create(db: Session, request):
         db.add(new_item)
         db.commit()
         db.refresh(new_item)
+        menu_search_index.refresh_items(db, [new_item.id])
+        cache.invalidate_tags(MENU_CACHE_TAG)
     except SQLAlchemyError as e:
         db.rollback()
         error = str(e.__dict__.get('orig', e))
@@ -80,16 +84,20 @@ def get_nutrition_info(db: Session, item_id: int):
         if not item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Menu item not found!")
 
-        ingredients = db.query(MenuItemIngredient, Resource).join(
-            Resource, MenuItemIngredient.resource_id == Resource.id
-        ).filter(MenuItemIngredient.menu_item_id == item_id).all()
+        recipe = recipe_index.get(db, item_id)
+        names = dict(
+            db.query(Resource.id, Resource.item).filter(
+                Resource.id.in_([resource_id for resource_id, _ in recipe])
+            ).all()
+        ) if recipe else {}
 
         ingredient_list = [
             {
-                "name": resource.item,
-                "amount": ingredient.amount
+                "name": names[resource_id],
+                "amount": amount
             }
-            for ingredient, resource in ingredients
+            for resource_id, amount in recipe
+            if resource_id in names
         ]
 
         return {
@@ -115,6 +123,8 @@ def update_availability(db: Session, item_id: int, available: bool):
 
         item.update({"is_available": available}, synchronize_session=False)
         db.commit()
+        menu_search_index.refresh_items(db, [item_id])
+        cache.invalidate_tags(MENU_CACHE_TAG)
         return item.first()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
@@ -129,6 +139,8 @@ def update(db: Session, item_id, request):
         update_data = request.dict(exclude_unset=True)
         item.update(update_data, synchronize_session=False)
         db.commit()
+        menu_search_index.refresh_items(db, [item_id])
+        cache.invalidate_tags(MENU_CACHE_TAG)
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -142,6 +154,9 @@ def delete(db: Session, item_id):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
         item.delete(synchronize_session=False)
         db.commit()
+        recipe_index.discard(item_id)
+        menu_search_index.refresh_items(db, [item_id])
+        cache.invalidate_tags(MENU_CACHE_TAG)
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -1,3 +1,4 @@
+from typing import Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Response, Depends
 from ..models import order_details as model
@@ -60,6 +61,9 @@ def create(db: Session, request):
 def read_all(db: Session):
     return order_detail_controller.read_all(db)
 
+def read_page(db: Session, limit: int, cursor: Optional[str] = None, include_total: bool = False):
+    return order_detail_controller.read_page(db, limit, cursor, include_total)
+
 
 def read_one(db: Session, item_id):
     return order_detail_controller.read_one(db, item_id)
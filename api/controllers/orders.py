@@ -2,16 +2,52 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from ..models import orders as model
 from ..schemas import orders as schema
-from ..services.order_services import OrderService
+from ..services.order_services import OrderService, order_response_loading
 from ..services.inventory_services import InventoryService
-from .base_controller import BaseCRUDController
+from ..services.revenue_services import RevenueService
+from .base_controller import BaseCRUDController, handle_db_errors
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class OrderController(BaseCRUDController[model.Order, schema.OrderCreate, schema.OrderUpdate]):
+    # Newest orders first
+    page_keys = ("order_date", "id")
+    page_descending = True
+
     def __init__(self):
         super().__init__(model.Order)
 
+    def load_options(self):
+        return order_response_loading()
+
+    @handle_db_errors
+    def update(self, db: Session, item_id: int, request: schema.OrderUpdate):
+        """Update an order through the ORM, so daily_revenue follows status and type changes"""
+        order = db.query(self.model).filter(self.model.id == item_id).first()
+        if not order:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Order with id {item_id} not found"
+            )
+
+        update_data = request.model_dump(exclude_unset=True)
+        if "status" in update_data:
+            update_data["status"] = model.StatusType(getattr(update_data["status"], "value", update_data["status"]))
+        if "order_type" in update_data:
+            update_data["order_type"] = model.OrderType(getattr(update_data["order_type"], "value", update_data["order_type"]))
+        for key, value in update_data.items():
+            setattr(order, key, value)
+        db.commit()
+        return self.read_one(db, item_id)
+
+    @handle_db_errors
+    def delete(self, db: Session, item_id: int):
+        """Delete an order, taking it out of daily_revenue in the same transaction"""
+        order = db.query(self.model).filter(self.model.id == item_id).first()
+        if order:
+            RevenueService.remove_order(db, order)
+        return super().delete(db, item_id)
+
     def create_guest_order(self, db: Session, guest_info: Dict, order_items: List[Dict]):
         """Create order for guest customer"""
         return OrderService.create_guest_order(db, guest_info, order_items)
@@ -20,10 +56,36 @@ class OrderController(BaseCRUDController[model.Order, schema.OrderCreate, schema
         """Track order by tracking number"""
         return OrderService.track_order(db, tracking_number)
 
+    def _claim_pending(self, db: Session, orders: List[model.Order]) -> None:
+        """
+        Move the orders from PENDING to CONFIRMED with one guarded statement
+        (UPDATE ... WHERE status = PENDING), so an order is confirmed, and its
+        inventory deducted, at most once even when requests race
+        """
+        not_pending = [order for order in orders if order.status != model.StatusType.PENDING]
+        if not not_pending:
+            claimed = db.query(self.model).filter(
+                self.model.id.in_([order.id for order in orders]),
+                self.model.status == model.StatusType.PENDING
+            ).update({"status": model.StatusType.CONFIRMED}, synchronize_session="evaluate")
+            if claimed == len(orders):
+                return
+            # Confirmed by a concurrent request since they were read
+            for order in orders:
+                db.refresh(order, ["status"])
+            not_pending = [order for order in orders if order.status != model.StatusType.CONFIRMED]
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only pending orders can be confirmed: " + ", ".join(
+                f"order {order.id} is {order.status.value}" for order in not_pending
+            )
+        )
+
     def confirm_order(self, db: Session, order_id: int):
-        """Confirm order and deduct inventory"""
+        """Confirm a pending order and deduct inventory"""
         try:
             order = self.read_one(db, order_id)
+            self._claim_pending(db, [order])
 
             # Get order items for inventory deduction
             order_items = [
@@ -31,16 +93,15 @@ class OrderController(BaseCRUDController[model.Order, schema.OrderCreate, schema
                 for detail in order.order_details
             ]
 
-            # Deduct inventory
-            InventoryService.deduct_inventory(db, order_items)
-
-            # Update order status
-            order.status = model.StatusType.CONFIRMED
+            # Deduct inventory in the same transaction as the status change
+            InventoryService.deduct_inventory(db, order_items, commit=False)
             db.commit()
-            db.refresh(order)
 
-            return order
+            return self.read_one(db, order_id)
 
+        except HTTPException:
+            db.rollback()
+            raise
         except SQLAlchemyError as e:
             db.rollback()
             raise HTTPException(
@@ -48,6 +109,43 @@ class OrderController(BaseCRUDController[model.Order, schema.OrderCreate, schema
                 detail=f"Failed to confirm order: {str(e)}"
             )
 
+    def confirm_orders(self, db: Session, order_ids: List[int]):
+        """Confirm a batch of pending orders, reserving their inventory in one transaction"""
+        try:
+            orders = self.base_query(db).filter(self.model.id.in_(order_ids)).all()
+            missing_ids = set(order_ids) - {order.id for order in orders}
+            if missing_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Orders not found: {sorted(missing_ids)}"
+                )
+            self._claim_pending(db, orders)
+
+            InventoryService.reserve_inventory(
+                db,
+                [
+                    [
+                        {"menu_item_id": detail.menu_item_id, "quantity": detail.amount}
+                        for detail in order.order_details
+                    ]
+                    for order in orders
+                ],
+                commit=False
+            )
+            db.commit()
+
+            return self.base_query(db).filter(self.model.id.in_(order_ids)).all()
+
+        except HTTPException:
+            db.rollback()
+            raise
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Failed to confirm orders: {str(e)}"
+            )
+
 # Create controller instance
 order_controller = OrderController()
 
@@ -61,6 +159,9 @@ def create_guest_order(db: Session, guest_info: Dict, order_items: List[Dict]):
 def read_all(db: Session):
     return order_controller.read_all(db)
 
+def read_page(db: Session, limit: int, cursor: Optional[str] = None, include_total: bool = False):
+    return order_controller.read_page(db, limit, cursor, include_total)
+
 def read_one(db: Session, item_id: int):
     return order_controller.read_one(db, item_id)
 
@@ -74,4 +175,7 @@ def track_order(db: Session, tracking_number: str):
     return order_controller.track_order(db, tracking_number)
 
 def confirm_order(db: Session, order_id: int):
-    return order_controller.confirm_order(db, order_id)
\ No newline at end of file
+    return order_controller.confirm_order(db, order_id)
+
+def confirm_orders(db: Session, order_ids: List[int]):
+    return order_controller.confirm_orders(db, order_ids)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
@@ -78,6 +78,9 @@ def create(db: Session, request: schema.ResourceCreate):
 def read_all(db: Session):
     return resource_controller.read_all(db)
 
+def read_page(db: Session, limit: int, cursor: Optional[str] = None, include_total: bool = False):
+    return resource_controller.read_page(db, limit, cursor, include_total)
+
 
 def read_one(db: Session, item_id: int):
     return resource_controller.read_one(db, item_id)
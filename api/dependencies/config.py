@@ -7,5 +7,30 @@ class conf:
     db_port = int(os.getenv("DB_PORT", "3306"))
     db_user = os.getenv("DB_USER", "root")
     db_password = os.getenv("DB_PASSWORD", "T3nq@289vb")
+    # Full SQLAlchemy URL, overrides the db_* settings above (e.g. sqlite:///./local.db)
+    database_url = os.getenv("DATABASE_URL")
+    # Async routes; derived from the URL above (aiomysql / aiosqlite) when not set
+    async_database_url = os.getenv("ASYNC_DATABASE_URL")
+    # Comma-separated URLs of read-only replicas for reporting queries (primary when empty)
+    db_read_replicas = [url.strip() for url in os.getenv("DB_READ_REPLICAS", "").split(",") if url.strip()]
+    # Connection pool (ignored for SQLite)
+    db_pool_size = int(os.getenv("DB_POOL_SIZE", "10"))
+    db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    db_pool_timeout = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # below MySQL's wait_timeout
+    db_pool_pre_ping = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Per-request query count / DB time headers and logs, and the threshold for logging a query as slow
+    query_metrics_enabled = os.getenv("QUERY_METRICS_ENABLED", "true").lower() == "true"
+    slow_query_ms = float(os.getenv("SLOW_QUERY_MS", "200"))
+    # Also send the slowest statement in a response header (reveals SQL to clients)
+    query_metrics_expose_sql = os.getenv("QUERY_METRICS_EXPOSE_SQL", "false").lower() == "true"
     app_host = os.getenv("APP_HOST", "localhost")
     app_port = int(os.getenv("APP_PORT", "8000"))
+    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+    # In-process cache (fallback without Redis, L1 in front of it when cache_l1_ttl > 0)
+    cache_max_entries = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    cache_max_bytes = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    cache_l1_ttl = int(os.getenv("CACHE_L1_TTL", "0"))
+    # Serialization of values stored in Redis: "json" or "msgpack" (needs the msgpack package)
+    cache_codec = os.getenv("CACHE_CODEC", "json")
+    cache_compress_threshold = int(os.getenv("CACHE_COMPRESS_THRESHOLD", "4096"))
@@ -1,20 +1,148 @@
+import itertools
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from .config import conf
+from ..utils.pool_metrics import pool_metrics
 from urllib.parse import quote_plus
 
-SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{conf.db_user}:{quote_plus(conf.db_password)}@{conf.db_host}:{conf.db_port}/{conf.db_name}?charset=utf8mb4"
+SQLALCHEMY_DATABASE_URL = conf.database_url or f"mysql+pymysql://{conf.db_user}:{quote_plus(conf.db_password)}@{conf.db_host}:{conf.db_port}/{conf.db_name}?charset=utf8mb4"
+
+
+# Async drivers matching the sync ones
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    """The async-driver counterpart of a sync database URL"""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS[parsed.get_backend_name()]).render_as_string(hide_password=False)
+
+
+def engine_options(url: str, instrumented: bool = True) -> Dict:
+    """create_engine arguments for a database URL: pool settings from conf, none for SQLite"""
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}} if instrumented else {}
+    options = {"poolclass": pool_metrics.pool_class} if instrumented else {}
+    return {
+        **options,
+        "pool_size": conf.db_pool_size,
+        "max_overflow": conf.db_max_overflow,
+        "pool_timeout": conf.db_pool_timeout,
+        "pool_recycle": conf.db_pool_recycle,
+        "pool_pre_ping": conf.db_pool_pre_ping,
+    }
+
+
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL
+    SQLALCHEMY_DATABASE_URL,
+    **engine_options(SQLALCHEMY_DATABASE_URL)
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+# The async engine is only built on first use, so deployments without an async
+# driver installed keep working on the sync path
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        url = conf.async_database_url or async_url(SQLALCHEMY_DATABASE_URL)
+        # pool telemetry covers the sync pool only
+        _async_engine = create_async_engine(url, **engine_options(url, instrumented=False))
+        _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    get_async_engine()
+    return _async_sessionmaker
+
+
+class ReadReplicas:
+    """
+    Read-only engines for reporting queries, used round-robin.
+    Without replicas every session comes from the primary.
+    """
+
+    def __init__(self, urls: Sequence[str], primary: Callable[[], Session],
+                 async_primary: Callable[[], async_sessionmaker]):
+        self.urls: List[str] = [url for url in urls if url]
+        self._primary = primary
+        self._async_primary = async_primary
+        self._sessionmakers = [
+            sessionmaker(autocommit=False, autoflush=False, bind=self._engine(url))
+            for url in self.urls
+        ]
+        self._async_sessionmakers: Optional[List[async_sessionmaker]] = None
+        self._counter = itertools.count()
+
+    @staticmethod
+    def _engine(url: str):
+        # pool telemetry covers the primary pool only, so replica checkouts stay out of its counters
+        options = engine_options(url)
+        options.pop("poolclass", None)
+        return create_engine(url, **options)
+
+    def session(self) -> Session:
+        if not self._sessionmakers:
+            return self._primary()
+        return self._sessionmakers[next(self._counter) % len(self._sessionmakers)]()
+
+    def async_session(self) -> AsyncSession:
+        if not self.urls:
+            return self._async_primary()()
+        if self._async_sessionmakers is None:
+            self._async_sessionmakers = [
+                async_sessionmaker(
+                    create_async_engine(async_url(url), **engine_options(url, instrumented=False)),
+                    autoflush=False, expire_on_commit=False
+                )
+                for url in self.urls
+            ]
+        return self._async_sessionmakers[next(self._counter) % len(self._async_sessionmakers)]()
+
+
+read_replicas = ReadReplicas(conf.db_read_replicas, lambda: SessionLocal(), get_async_sessionmaker)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Session for reporting queries: a read replica when configured, else the primary"""
+    db = read_replicas.session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Async session for I/O-bound routes. Existing services run on it unchanged
+    through `await db.run_sync(Service.method, ...)`
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncIterator[AsyncSession]:
+    """Async counterpart of get_read_db"""
+    async with read_replicas.async_session() as db:
+        yield db
@@ -1,12 +1,29 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import index as indexRoute
 from .models import model_loader
 from .dependencies.config import conf
+from .dependencies.database import SessionLocal
+from .utils.recipe_index import recipe_index
+from .utils.search_index import menu_search_index
+from .utils.query_metrics import QueryMetricsMiddleware, query_metrics
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the in-memory recipe and menu search indexes once at startup
+    db = SessionLocal()
+    try:
+        recipe_index.rebuild(db)
+        menu_search_index.rebuild(db)
+    finally:
+        db.close()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = ["*"]
 
@@ -16,8 +33,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-Slowest-Ms", "X-DB-Slowest-Query"],
 )
 
+if conf.query_metrics_enabled:
+    query_metrics.install()
+    app.add_middleware(QueryMetricsMiddleware, metrics=query_metrics, expose_sql=conf.query_metrics_expose_sql)
+
 model_loader.index()
 indexRoute.load_routes(app)
 
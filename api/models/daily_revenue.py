@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Numeric, Date, Enum
+from ..dependencies.database import Base
+from .orders import OrderType, StatusType
+
+
+class DailyRevenue(Base):
+    """
+    Order totals per day, order type and status, kept up to date as orders are
+    completed or cancelled (see services/revenue_services.py)
+    """
+    __tablename__ = "daily_revenue"
+
+    revenue_date = Column(Date, primary_key=True)
+    order_type = Column(Enum(OrderType), primary_key=True)
+    status = Column(Enum(StatusType), primary_key=True)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+    order_count = Column(Integer, nullable=False, default=0)
+    discount = Column(Numeric(14, 2), nullable=False, default=0)
+    tax = Column(Numeric(14, 2), nullable=False, default=0)
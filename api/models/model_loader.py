@@ -1,9 +1,15 @@
-from . import customers, resources, menu_items, menu_item_ingredients, orders, order_details, payments, promotions, reviews
+from . import customers, resources, menu_items, menu_item_ingredients, orders, order_details, payments, promotions, reviews, daily_revenue
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
 
 from ..dependencies.database import engine
 
 
 def index():
+    # Created on this start: fill it from the orders already in the database
+    new_rollup = not inspect(engine).has_table(daily_revenue.DailyRevenue.__tablename__)
+
     customers.Base.metadata.create_all(engine)
     resources.Base.metadata.create_all(engine)
     menu_items.Base.metadata.create_all(engine)
@@ -12,4 +18,19 @@ def index():
     order_details.Base.metadata.create_all(engine)
     payments.Base.metadata.create_all(engine)
     promotions.Base.metadata.create_all(engine)
-    reviews.Base.metadata.create_all(engine)
\ No newline at end of file
+    reviews.Base.metadata.create_all(engine)
+    daily_revenue.Base.metadata.create_all(engine)
+
+    if new_rollup:
+        backfill_daily_revenue()
+
+
+def backfill_daily_revenue():
+    """Rebuild daily_revenue from the orders table; see backfill_daily_revenue.py"""
+    from ..services.revenue_services import RevenueService
+
+    try:
+        with Session(engine) as db:
+            RevenueService.backfill(db)
+    except Exception as e:
+        print(f"Warning: daily_revenue backfill failed, run backfill_daily_revenue.py: {e}")
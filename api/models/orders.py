@@ -27,7 +27,7 @@ class Order(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
     tracking_number = Column(String(20), unique=True, nullable=True, index=True)
-    order_date = Column(DATETIME, nullable=False, server_default=func.now())
+    order_date = Column(DATETIME, nullable=False, server_default=func.now(), index=True)
     description = Column(String(300))
     status = Column(Enum(StatusType), nullable=False, default=StatusType.PENDING)
     order_type = Column(Enum(OrderType), nullable=False, default=OrderType.DINE_IN)
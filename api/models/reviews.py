@@ -11,6 +11,6 @@ class Reviews(Base):
     customer_name = Column(String(100), nullable=False)
     rating = Column(Integer, nullable=False) # 1-5
     review_text = Column(String(500))
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), index=True)
 
     menu_item = relationship("MenuItem", back_populates="reviews")
\ No newline at end of file
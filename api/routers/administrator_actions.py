@@ -1,7 +1,12 @@
 from fastapi import APIRouter, Depends, status, Response, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from ..dependencies import database
 from ..dependencies.database import get_db
+from ..utils.pool_metrics import pool_metrics
+from ..utils.recipe_index import recipe_index
+from ..utils.search_index import menu_search_index
+from ..utils.caching import cache, MENU_CACHE_TAG, ANALYTICS_CACHE_TAG
 
 # holds common actions made by administrators
 
@@ -34,7 +39,7 @@ def purge_database(db: Session = Depends(get_db), confirm: str = None):
         #Get all table names
         tables = [
             "payments", "order_details", "menu_item_ingredients",
-            "reviews", "orders", "customers", "menu_items",
+            "reviews", "orders", "daily_revenue", "customers", "menu_items",
             "resources", "promotions"
         ]
 
@@ -47,10 +52,23 @@ def purge_database(db: Session = Depends(get_db), confirm: str = None):
         db.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
 
         db.commit()
+        recipe_index.clear()
+        menu_search_index.clear()
+        cache.invalidate_tags(MENU_CACHE_TAG, ANALYTICS_CACHE_TAG)
         return {"message": "Database purged successfully"}
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to purge database: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/metrics/db-pool")
+def get_db_pool_metrics():
+    """
+    Database connection pool telemetry: checkout latency, in-use and overflow
+    connections, checkout timeouts and connection churn since startup
+    :return:
+    """
+    return pool_metrics.snapshot(database.engine.pool)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from ..services.order_services import OrderService
 from ..services.menu_services import MenuService
@@ -8,7 +9,7 @@ from ..schemas.customer_actions import (
     GuestOrderRequest, OrderItemRequest, GuestOrderResponse, MenuSearchResponse
 )
 from ..schemas.orders import OrderTrack
-from ..dependencies.database import get_db
+from ..dependencies.database import get_db, get_async_db
 
 router = APIRouter(
     tags=['Customer Actions'],
@@ -37,20 +38,20 @@ def place_guest_order(
     )
 
 @router.get("/orders/track/{tracking_number}", response_model=OrderTrack)
-def track_my_order(tracking_number: str, db: Session = Depends(get_db)):
+async def track_my_order(tracking_number: str, db: AsyncSession = Depends(get_async_db)):
     """Track order status by tracking number"""
-    return OrderService.track_order(db, tracking_number)
+    return await db.run_sync(OrderService.track_order, tracking_number)
 
 @router.get("/menu/search")
-def search_menu(
+async def search_menu(
         search_term: Optional[str] = Query(None, description="Search for dishes"),
         category: Optional[FoodCategory] = Query(None, description="vegetarian, vegan, gluten_free, regular"),
         max_price: Optional[float] = Query(None, description="Maximum price"),
-        sort_by: str = Query("name", description="Sort by: name, price_asc, price_desc"),
-        db: Session = Depends(get_db)
+        sort_by: str = Query("name", description="Sort by: name, price_asc, price_desc, relevance"),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Search menu for specific dietary preferences"""
-    return MenuService.search_menu_items(
-        db, search_term=search_term, category=category,
+    return await db.run_sync(
+        MenuService.search_menu_items, search_term=search_term, category=category,
         max_price=max_price, sort_by=sort_by
     )
\ No newline at end of file
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, status, Response
+from fastapi import APIRouter, Depends, status, Response, Query
 from sqlalchemy.orm import Session
+from typing import Optional
 from ..controllers import menu_item_ingredients as controller
 from ..schemas import menu_item_ingredients as schema
+from ..schemas.common import PaginatedResponse
+from ..utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from ..dependencies.database import get_db
 
 router = APIRouter(
@@ -15,9 +18,15 @@ def create(request: schema.MenuItemIngredientCreate, db: Session = Depends(get_d
     return controller.create(db=db, request=request)
 
 
-@router.get("/", response_model=list[schema.MenuItemIngredient])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+@router.get("/", response_model=PaginatedResponse[schema.MenuItemIngredient])
+def read_all(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of menu item ingredients to return"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        include_total: bool = Query(False, description="Also count all menu item ingredients"),
+        db: Session = Depends(get_db)
+):
+    """Menu item ingredients, one page at a time"""
+    return controller.read_page(db, limit, cursor, include_total)
 
 
 @router.get("/{item_id}", response_model=schema.MenuItemIngredient)
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status, Path
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from ..controllers import menu_items as controller
 from ..schemas import menu_items as schema
 from ..services.menu_services import MenuService
 from ..models.menu_items import FoodCategory
-from ..dependencies.database import get_db
+from ..dependencies.database import get_db, get_async_db
 
 router = APIRouter(
     tags=['Menu Items'],
@@ -64,15 +65,15 @@ def get_menu_items(
     summary="Search menu items",
     description="Advanced search and filtering of menu items"
 )
-def search_menu_items(
+async def search_menu_items(
         search_term: Optional[str] = Query(None, description="Search in name and description"),
         category: Optional[FoodCategory] = Query(None, description="Filter by food category"),
         min_price: Optional[float] = Query(None, description="Minimum price"),
         max_price: Optional[float] = Query(None, description="Maximum price"),
         max_calories: Optional[int] = Query(None, ge=0, description="Maximum calories filter"),
-        sort_by: str = Query("name", pattern="^(name|price_asc|price_desc|calories|rating)$"),
+        sort_by: str = Query("name", pattern="^(name|price_asc|price_desc|calories|rating|relevance)$"),
         available_only: bool = Query(True, description="Show only available items"),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Menu search with multiple filters:
@@ -81,7 +82,7 @@ def search_menu_items(
     - **category**: Filter by dietary category
     - **min_price/max_price**: Price range filtering
     - **max_calories**: Maximum calories filter
-    - **sort_by**: Sort by name, price_asc, price_desc, calories, or rating
+    - **sort_by**: Sort by name, price_asc, price_desc, calories, rating, or relevance
     - **available_only**: Show only available items
     :param search_term:
     :param category:
@@ -98,11 +99,25 @@ def search_menu_items(
             detail="max_price must be greater than min_price"
         )
 
-    return MenuService.search_menu_items(
-        db, search_term, category, min_price, max_price, max_calories, sort_by, available_only
+    return await db.run_sync(
+        MenuService.search_menu_items, search_term, category, min_price, max_price, max_calories, sort_by, available_only
     )
 
 
+@router.get(
+    "/typeahead",
+    summary="Menu search suggestions",
+    description="Prefix suggestions for the menu search box"
+)
+async def typeahead(
+        q: str = Query(..., min_length=1, description="Text typed so far"),
+        limit: int = Query(10, ge=1, le=50),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Suggest available menu items whose words start with the typed text"""
+    return await db.run_sync(MenuService.suggest_menu_items, q, limit)
+
+
 @router.get(
     "/{item_id}",
     response_model=schema.MenuItemsResponse,
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import date
 from ..controllers import orders as controller
 from ..schemas import orders as schema
+from ..schemas.common import PaginatedResponse
 from ..services.order_services import OrderService
 from ..services.inventory_services import InventoryService
-from ..dependencies.database import get_db
+from ..services.export_services import ExportService
+from ..utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..dependencies.database import get_db, get_read_db, get_async_db
 
 router = APIRouter(
     tags=['Orders'],
@@ -37,22 +41,28 @@ def create_guest_order(
     return controller.create_guest_order(db, guest_info, order_items)
 
 
-@router.get("/", response_model=list[schema.Order])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+@router.get("/", response_model=PaginatedResponse[schema.Order])
+def read_all(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of orders to return"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        include_total: bool = Query(False, description="Also count all orders"),
+        db: Session = Depends(get_db)
+):
+    """Orders, one page at a time"""
+    return controller.read_page(db, limit, cursor, include_total)
 
 
 @router.get("/track/{tracking_number}", response_model=schema.OrderTrack)
-def track_order(tracking_number: str, db: Session = Depends(get_db)):
+async def track_order(tracking_number: str, db: AsyncSession = Depends(get_async_db)):
     """Track order by tracking number"""
-    return controller.track_order(db, tracking_number)
+    return await db.run_sync(controller.track_order, tracking_number)
 
 
 @router.get("/date-range")
 def get_orders_by_date_range(
         start_date: date = Query(..., description="Start date (YYYY-MM-DD)", examples=["2024-01-01"]),
         end_date: date = Query(..., description="End date (YYYY-MM-DD)", examples=["2024-01-31"]),
-        db: Session = Depends(get_db),
+        db: Session = Depends(get_read_db),
 ):
     """Get orders within date range - FIXED with proper validation"""
     # Validate date range
@@ -72,11 +82,35 @@ def get_orders_by_date_range(
     return OrderService.get_orders_by_date_range(db, start_date, end_date)
 
 
+@router.get("/export")
+def export_orders(
+        export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+        start_date: Optional[date] = Query(None, description="Only orders on or after this date"),
+        end_date: Optional[date] = Query(None, description="Only orders on or before this date"),
+        include_details: bool = Query(False, description="Include order lines"),
+        include_payments: bool = Query(False, description="Include payments"),
+        db: Session = Depends(get_read_db)
+):
+    """Stream the order history as NDJSON or CSV, without building it in memory"""
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start date must be before or equal to end date"
+        )
+    return ExportService.stream_orders(db, export_format, start_date, end_date, include_details, include_payments)
+
+
 @router.get("/{item_id}", response_model=schema.Order)
 def read_one(item_id: int, db: Session = Depends(get_db)):
     return controller.read_one(db, item_id=item_id)
 
 
+@router.put("/confirm", response_model=list[schema.Order])
+def confirm_orders(order_ids: List[int], db: Session = Depends(get_db)):
+    """Confirm a batch of orders, reserving all of their inventory in one transaction"""
+    return controller.confirm_orders(db, order_ids)
+
+
 @router.put("/{item_id}", response_model=schema.Order)
 def update(item_id: int, request: schema.OrderUpdate, db: Session = Depends(get_db)):
     return controller.update(db=db, request=request, item_id=item_id)
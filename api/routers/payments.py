@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, status, Response
+from fastapi import APIRouter, Depends, status, Response, Query
 from sqlalchemy.orm import Session
+from typing import Optional
 from ..controllers import payments as controller
 from ..schemas import payments as schema
+from ..schemas.common import PaginatedResponse
+from ..utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from ..dependencies.database import get_db
 from ..services.payment_services import PaymentService
 
@@ -29,9 +32,15 @@ def get_payment_by_order(order_id: int, db: Session = Depends(get_db)):
     """Get payment details for an order"""
     return PaymentService.get_payment_by_order(db, order_id)
 
-@router.get("/", response_model=list[schema.Payment])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+@router.get("/", response_model=PaginatedResponse[schema.Payment])
+def read_all(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of payments to return"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        include_total: bool = Query(False, description="Also count all payments"),
+        db: Session = Depends(get_db)
+):
+    """Payments, one page at a time"""
+    return controller.read_page(db, limit, cursor, include_total)
 
 
 @router.get("/{item_id}", response_model=schema.Payment)
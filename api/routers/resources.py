@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, status, Response
+from fastapi import APIRouter, Depends, status, Response, Query
 from sqlalchemy.orm import Session
+from typing import Optional
 from ..controllers import resources as controller
 from ..schemas import resources as schema
+from ..schemas.common import PaginatedResponse
+from ..utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from ..dependencies.database import get_db
 
 router = APIRouter(
@@ -15,9 +18,15 @@ def create(request: schema.ResourceCreate, db: Session = Depends(get_db)):
     return controller.create(db=db, request=request)
 
 
-@router.get("/", response_model=list[schema.Resource])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+@router.get("/", response_model=PaginatedResponse[schema.Resource])
+def read_all(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of resources to return"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        include_total: bool = Query(False, description="Also count all resources"),
+        db: Session = Depends(get_db)
+):
+    """Resources, one page at a time"""
+    return controller.read_page(db, limit, cursor, include_total)
 
 
 @router.get("/{item_id}", response_model=schema.Resource)
@@ -1,14 +1,16 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 from typing import Optional
 from ..services import staff_services
 from ..services.order_services import OrderService
+from ..services.revenue_services import RevenueService
 from ..services.inventory_services import InventoryService
 from ..services.analytics_services import AnalyticsService
 from ..schemas import menu_items as schema
 from ..schemas import promotions as promotion_schema
-from ..dependencies.database import get_db
+from ..dependencies.database import get_db, get_read_db, get_async_read_db
 
 # holds common actions made by the staff
 
@@ -48,7 +50,7 @@ def check_inventory_availability(
 def get_orders_by_date_range(
         start_date: date = Query(..., description="Start date (YYYY-MM-DD)", examples=["2024-01-01"]),
         end_date: date = Query(..., description="End date (YYYY-MM-DD)", examples=["2024-01-31"]),
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db)
 ):
     """Get orders within date range - FIXED with proper validation"""
     # Validate date range
@@ -72,25 +74,57 @@ def get_orders_by_date_range(
 @router.get("/revenue/daily")
 def get_daily_revenue(
         target_date: date = Query(..., description="Date for revenue calculation"),
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db)
 ):
     """Calculate total revenue for a specific date"""
     return OrderService.calculate_daily_revenue(db, target_date)
 
 
+@router.get("/revenue/range")
+def get_revenue_range(
+        start_date: date = Query(..., description="First day of the range"),
+        end_date: date = Query(..., description="Last day of the range"),
+        db: Session = Depends(get_read_db)
+):
+    """Completed-order revenue per day of a date range, with totals"""
+    return RevenueService.get_revenue_range(db, start_date, end_date)
+
+
+@router.get("/revenue/series")
+def get_revenue_series(
+        start_date: date = Query(..., description="First day of the range"),
+        end_date: date = Query(..., description="Last day of the range"),
+        bucket: str = Query("day", pattern="^(hour|day|week|month)$", description="Bucket size"),
+        by_order_type: bool = Query(False, description="Split each bucket by order type"),
+        db: Session = Depends(get_read_db)
+):
+    """Revenue, order count, average ticket and discounts per hour, day, week or month"""
+    return RevenueService.get_revenue_series(db, start_date, end_date, bucket, by_order_type)
+
+
 @router.get("/analytics/menu-performance")
-def get_menu_performance(db: Session = Depends(get_db)):
+async def get_menu_performance(
+        start_date: Optional[date] = Query(None, description="Only include activity on or after this date"),
+        end_date: Optional[date] = Query(None, description="Only include activity on or before this date"),
+        db: AsyncSession = Depends(get_async_read_db)
+):
     """Get menu performance analytics"""
-    return AnalyticsService.get_menu_item_performance(db)
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start date must be before or equal to end date"
+        )
+
+    return await AnalyticsService.aget_menu_item_performance(db, start_date, end_date)
 
 
 @router.get("/analytics/review-insights")
-def get_review_insights(
+async def get_review_insights(
         menu_item_id: Optional[int] = Query(None, description="Filter by menu item"),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get review insights and sentiment analysis"""
-    return AnalyticsService.get_review_insights(db, menu_item_id)
+    return await db.run_sync(AnalyticsService.get_review_insights, menu_item_id)
 
 
 # Promotion management
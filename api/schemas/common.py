@@ -1,6 +1,6 @@
 # api/schemas/common.py
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from typing import Optional, List, Generic, TypeVar
 from datetime import datetime
 from enum import Enum
 
@@ -10,9 +10,13 @@ class PaginationParams(BaseModel):
     limit: int = Field(100, ge=1, le=1000, description="Maximum number of records to return")
 
 
-class PaginatedResponse(BaseModel):
-    items: List[dict]
-    total: int
-    skip: int
+ItemType = TypeVar("ItemType")
+
+
+class PaginatedResponse(BaseModel, Generic[ItemType]):
+    items: List[ItemType]
+    total: Optional[int] = None
+    skip: int = 0
     limit: int
-    has_more: bool
\ No newline at end of file
+    has_more: bool
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to fetch the next page")
\ No newline at end of file
@@ -1,42 +1,138 @@
+import re
 from decimal import Decimal
+from datetime import date, datetime, time, timedelta
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func, desc, asc
 from fastapi import HTTPException, status
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 from ..models.menu_items import MenuItem
 from ..models.order_details import OrderDetail
 from ..models.reviews import Reviews
 from ..models.orders import Order
+from ..utils.caching import cache, MENU_CACHE_TAG, ANALYTICS_CACHE_TAG
+
+# Reviews are streamed from the database in batches of this size
+REVIEW_BATCH_SIZE = 500
+
+# Substring matchers compiled once instead of testing each keyword per review
+COMPLAINT_KEYWORDS = ['bad', 'terrible', 'awful', 'disappointing', 'cold', 'slow', 'rude']
+COMPLAINT_PATTERN = re.compile('|'.join(map(re.escape, COMPLAINT_KEYWORDS)), re.IGNORECASE)
+RECOMMENDATION_TOPIC_PATTERN = re.compile(r'cold|temperature|slow|wait|service|staff', re.IGNORECASE)
+
+# Menu performance is cached for this many seconds, then served stale for up to
+# MENU_PERFORMANCE_STALE_TTL more while a single request recomputes it
+MENU_PERFORMANCE_CACHE_TTL = 300
+MENU_PERFORMANCE_STALE_TTL = 600
+
 
 class AnalyticsService:
 
     @staticmethod
-    def get_menu_item_performance(db: Session) -> List[Dict]:
+    def get_menu_item_performance(
+            db: Session,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None
+    ) -> List[Dict]:
+        """
+        Get performance analytics for menu items, cached with single-flight refresh
+        :param db:
+        :param start_date: only count orders/reviews on or after this date
+        :param end_date: only count orders/reviews on or before this date
+        :return:
+        """
+        return cache.get_or_compute(
+            f"menu_performance:{start_date}:{end_date}",
+            lambda: AnalyticsService._compute_menu_item_performance(db, start_date, end_date),
+            ttl=MENU_PERFORMANCE_CACHE_TTL,
+            tags=[MENU_CACHE_TAG, ANALYTICS_CACHE_TAG],
+            stale_ttl=MENU_PERFORMANCE_STALE_TTL
+        )
+
+    @staticmethod
+    async def aget_menu_item_performance(
+            db: AsyncSession,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None
+    ) -> List[Dict]:
         """
-        Get performance analytics for menu items
+        get_menu_item_performance for async routes: the cache is reached through its
+        async client and the queries run on the async session
         :param db:
+        :param start_date:
+        :param end_date:
+        :return:
+        """
+        return await cache.aget_or_compute(
+            f"menu_performance:{start_date}:{end_date}",
+            lambda: db.run_sync(AnalyticsService._compute_menu_item_performance, start_date, end_date),
+            ttl=MENU_PERFORMANCE_CACHE_TTL,
+            tags=[MENU_CACHE_TAG, ANALYTICS_CACHE_TAG],
+            stale_ttl=MENU_PERFORMANCE_STALE_TTL
+        )
+
+    @staticmethod
+    def _compute_menu_item_performance(
+            db: Session,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None
+    ) -> List[Dict]:
+        """
+        Order and review stats are aggregated per item in separate subqueries before
+        being joined, so the two tables never multiply each other's rows.
+        :param db:
+        :param start_date: only count orders/reviews on or after this date
+        :param end_date: only count orders/reviews on or before this date
         :return:
         """
         try:
-            #Get order frequency and revenue per menu item
+            start_datetime = datetime.combine(start_date, time.min) if start_date else None
+            end_datetime = datetime.combine(end_date + timedelta(days=1), time.min) if end_date else None
+
+            #Order frequency per menu item
+            order_stats = db.query(
+                OrderDetail.menu_item_id.label('menu_item_id'),
+                func.count(OrderDetail.id).label('order_count'),
+                func.sum(OrderDetail.amount).label('total_quantity_sold')
+            )
+            if start_datetime or end_datetime:
+                order_stats = order_stats.join(Order, OrderDetail.order_id == Order.id)
+                if start_datetime:
+                    order_stats = order_stats.filter(Order.order_date >= start_datetime)
+                if end_datetime:
+                    order_stats = order_stats.filter(Order.order_date < end_datetime)
+            order_stats = order_stats.group_by(OrderDetail.menu_item_id).subquery()
+
+            #Rating stats per menu item
+            review_stats = db.query(
+                Reviews.menu_item_id.label('menu_item_id'),
+                func.avg(Reviews.rating).label('avg_rating'),
+                func.count(Reviews.id).label('review_count')
+            )
+            if start_datetime:
+                review_stats = review_stats.filter(Reviews.created_at >= start_datetime)
+            if end_datetime:
+                review_stats = review_stats.filter(Reviews.created_at < end_datetime)
+            review_stats = review_stats.group_by(Reviews.menu_item_id).subquery()
+
             performance_query = db.query(
                 MenuItem.id,
                 MenuItem.name,
                 MenuItem.price,
-                func.count(OrderDetail.id).label('order_count'),
-                func.sum(OrderDetail.amount).label('total_quantity_sold'),
-                (func.sum(OrderDetail.amount) * MenuItem.price).label('total_revenue'),
-                func.avg(Reviews.rating).label('avg_rating'),
-                func.count(Reviews.id).label('review_count')
-            ).outerjoin(OrderDetail, MenuItem.id == OrderDetail.menu_item_id)\
-            .outerjoin(Reviews, MenuItem.id == Reviews.menu_item_id)\
-            .group_by(MenuItem.id, MenuItem.name, MenuItem.price)\
+                order_stats.c.order_count,
+                order_stats.c.total_quantity_sold,
+                (order_stats.c.total_quantity_sold * MenuItem.price).label('total_revenue'),
+                review_stats.c.avg_rating,
+                review_stats.c.review_count
+            ).outerjoin(order_stats, MenuItem.id == order_stats.c.menu_item_id)\
+            .outerjoin(review_stats, MenuItem.id == review_stats.c.menu_item_id)\
             .all()
 
             #Calculate popularity ranking
             results = []
             for item in performance_query:
-                popularity_score = (item.order_count or 0) * Decimal('0.7') + (item.avg_rating or 0) * Decimal('0.3')
+                avg_rating = Decimal(str(item.avg_rating)) if item.avg_rating is not None else Decimal('0')
+                popularity_score = (item.order_count or 0) * Decimal('0.7') + avg_rating * Decimal('0.3')
 
                 results.append({
                     "menu_item_id": item.id,
@@ -50,7 +146,7 @@ class AnalyticsService:
                     "popularity_score": popularity_score,
                     "performance_status": AnalyticsService._get_performance_status(
                         item.order_count or 0,
-                        item.avg_rating or 0
+                        float(avg_rating)
                     )
                 })
 
@@ -80,18 +176,24 @@ class AnalyticsService:
     def get_review_insights(db: Session, menu_item_id: Optional[int] = None) -> Dict:
         """
         Get detailed review insights and identify problem areas
+        The rating distribution is a grouped SQL aggregate; only low-rated reviews with
+        text are streamed back in batches to look for complaints.
         :param db:
         :param menu_item_id:
         :return:
         """
         try:
-            query = db.query(Reviews)
+            distribution_query = db.query(Reviews.rating, func.count(Reviews.id))
             if menu_item_id:
-                query = query.filter(Reviews.menu_item_id == menu_item_id)
+                distribution_query = distribution_query.filter(Reviews.menu_item_id == menu_item_id)
 
-            reviews = query.all()
+            #Calculate rating distribution
+            rating_counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+            for rating, count in distribution_query.group_by(Reviews.rating).all():
+                rating_counts[rating] = count
 
-            if not reviews:
+            total_reviews = sum(rating_counts.values())
+            if not total_reviews:
                 return {
                     "total_reviews": 0,
                     "average_rating": 0,
@@ -100,41 +202,53 @@ class AnalyticsService:
                     "satisfaction_summary": "No reviews available"
                 }
 
-            #Calculate rating distribution
-            rating_counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-            total_rating = 0
-            complaint_keywords = ['bad', 'terrible', 'awful', 'disappointing', 'cold', 'slow', 'rude']
+            avg_rating = sum(rating * count for rating, count in rating_counts.items()) / total_reviews
+
+            #Identify potential complaints (ratings 1-2 with text), newest first
+            complaint_query = db.query(
+                Reviews.customer_name,
+                Reviews.rating,
+                Reviews.review_text,
+                Reviews.created_at,
+                Reviews.menu_item_id
+            ).filter(
+                Reviews.rating <= 2,
+                Reviews.review_text.isnot(None)
+            )
+            if menu_item_id:
+                complaint_query = complaint_query.filter(Reviews.menu_item_id == menu_item_id)
+            complaint_query = complaint_query.order_by(
+                Reviews.created_at.desc(), Reviews.id.desc()
+            ).yield_per(REVIEW_BATCH_SIZE)
+
             complaints = []
+            complaint_topics = set()
+            for review in complaint_query:
+                if not review.review_text or not COMPLAINT_PATTERN.search(review.review_text):
+                    continue
+
+                complaint_topics.update(
+                    match.lower() for match in RECOMMENDATION_TOPIC_PATTERN.findall(review.review_text)
+                )
+                if len(complaints) < 10:  #Last 10 complaints only
+                    complaints.append({
+                        "customer_name": review.customer_name,
+                        "rating": review.rating,
+                        "review_text": review.review_text,
+                        "created_at": review.created_at,
+                        "menu_item_id": review.menu_item_id
+                    })
 
-            for review in reviews:
-                rating_counts[review.rating] += 1
-                total_rating += review.rating
-
-                #Identify potential complaints (ratings 1-2 with text)
-                if review.rating <= 2 and review.review_text:
-                    text_lower = review.review_text.lower()
-                    if any(keyword in text_lower for keyword in complaint_keywords):
-                        complaints.append({
-                            "customer_name": review.customer_name,
-                            "rating": review.rating,
-                            "review_text": review.review_text,
-                            "created_at": review.created_at,
-                            "menu_item_id": review.menu_item_id
-                        })
-
-            complaints.sort(key=lambda x: x['created_at'], reverse=True)
-
-            avg_rating = total_rating / len(reviews)
             satisfaction_level = AnalyticsService._get_satisfaction_level(avg_rating, rating_counts)
 
             return {
-                "total_reviews": len(reviews),
+                "total_reviews": total_reviews,
                 "average_rating": round(avg_rating, 2),
                 "rating_distribution": rating_counts,
-                "recent_complaints": complaints[:10],  #Last 10 complaints only
+                "recent_complaints": complaints,
                 "satisfaction_summary": satisfaction_level,
                 "recommendations": AnalyticsService._get_improvement_recommendations(
-                    avg_rating, rating_counts, complaints
+                    avg_rating, rating_counts, complaint_topics
                 )
             }
 
@@ -161,8 +275,11 @@ class AnalyticsService:
             return "Poor - Significant customer dissatisfaction"
 
     @staticmethod
-    def _get_improvement_recommendations(avg_rating: float, rating_counts: Dict, complaints: List) -> List[str]:
-        """Generate improvement recommendations based on data"""
+    def _get_improvement_recommendations(avg_rating: float, rating_counts: Dict, complaint_topics: Set[str]) -> List[str]:
+        """
+        Generate improvement recommendations based on data
+        complaint_topics: topic words (see RECOMMENDATION_TOPIC_PATTERN) found in complaints
+        """
         recommendations = []
 
         if avg_rating < 3.5:
@@ -172,18 +289,16 @@ class AnalyticsService:
             recommendations.append("Focus on addressing negative feedback patterns")
 
         #Analyze complaint patterns
-        complaint_text = ' '.join([c['review_text'].lower() for c in complaints if c['review_text']])
-
-        if 'cold' in complaint_text or 'temperature' in complaint_text:
+        if complaint_topics & {'cold', 'temperature'}:
             recommendations.append("Review food temperature control and serving times")
 
-        if 'slow' in complaint_text or 'wait' in complaint_text:
+        if complaint_topics & {'slow', 'wait'}:
             recommendations.append("Improve order preparation and delivery times")
 
-        if 'service' in complaint_text or 'staff' in complaint_text:
+        if complaint_topics & {'service', 'staff'}:
             recommendations.append("Provide additional customer service training")
 
         if not recommendations:
             recommendations.append("Continue monitoring customer feedback for improvement opportunities")
 
-        return recommendations
\ No newline at end of file
+        return recommendations
@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Optional
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from ..models.customers import Customer
+from ..models.menu_items import MenuItem
+from ..models.order_details import OrderDetail
+from ..models.orders import Order
+from ..models.payments import Payment
+
+# Orders fetched per round trip while exporting
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+ORDER_COLUMNS = [
+    "id", "tracking_number", "order_date", "status", "order_type", "customer_id", "customer_name",
+    "subtotal", "tax_amount", "discount_amount", "total_amount", "promotion_code",
+]
+DETAIL_COLUMNS = ["detail_id", "menu_item_id", "menu_item_name", "quantity"]
+PAYMENT_COLUMNS = ["payment_id", "payment_amount", "payment_status", "payment_type", "payment_date"]
+
+
+def _money(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class ExportService:
+
+    @staticmethod
+    def iter_orders(
+            db: Session,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None,
+            include_details: bool = False,
+            include_payments: bool = False,
+            batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[Dict]:
+        """
+        Walk orders in id order, one batch per round trip.
+        Plain column rows are fetched instead of ORM objects, so nothing piles up in
+        the session and memory stays flat however many orders match.
+        :param db:
+        :param start_date: only orders on or after this date
+        :param end_date: only orders on or before this date
+        :param include_details: add each order's lines
+        :param include_payments: add each order's payment
+        :param batch_size:
+        :return: one dict per order
+        """
+        last_id = 0
+        while True:
+            query = db.query(
+                Order.id, Order.tracking_number, Order.order_date, Order.status, Order.order_type,
+                Order.customer_id, Order.guest_name, Customer.customer_name,
+                Order.subtotal, Order.tax_amount, Order.discount_amount, Order.total_amount,
+                Order.promotion_code
+            ).outerjoin(Customer, Order.customer_id == Customer.id).filter(Order.id > last_id)
+            if start_date:
+                query = query.filter(Order.order_date >= datetime.combine(start_date, time.min))
+            if end_date:
+                query = query.filter(Order.order_date < datetime.combine(end_date + timedelta(days=1), time.min))
+            batch = query.order_by(Order.id).limit(batch_size).all()
+            if not batch:
+                return
+
+            order_ids = [row.id for row in batch]
+            details = ExportService._load_details(db, order_ids) if include_details else None
+            payments = ExportService._load_payments(db, order_ids) if include_payments else None
+
+            for row in batch:
+                order = {
+                    "id": row.id,
+                    "tracking_number": row.tracking_number,
+                    "order_date": _timestamp(row.order_date),
+                    "status": row.status.value,
+                    "order_type": row.order_type.value,
+                    "customer_id": row.customer_id,
+                    "customer_name": row.guest_name or row.customer_name,
+                    "subtotal": _money(row.subtotal),
+                    "tax_amount": _money(row.tax_amount),
+                    "discount_amount": _money(row.discount_amount),
+                    "total_amount": _money(row.total_amount),
+                    "promotion_code": row.promotion_code,
+                }
+                if details is not None:
+                    order["details"] = details.get(row.id, [])
+                if payments is not None:
+                    order["payment"] = payments.get(row.id)
+                yield order
+
+            last_id = order_ids[-1]
+            if len(batch) < batch_size:
+                return
+
+    @staticmethod
+    def _load_details(db: Session, order_ids: List[int]) -> Dict[int, List[Dict]]:
+        rows = db.query(
+            OrderDetail.order_id, OrderDetail.id, OrderDetail.menu_item_id, MenuItem.name, OrderDetail.amount
+        ).outerjoin(MenuItem, OrderDetail.menu_item_id == MenuItem.id)\
+            .filter(OrderDetail.order_id.in_(order_ids))\
+            .order_by(OrderDetail.id)
+
+        details = defaultdict(list)
+        for order_id, detail_id, menu_item_id, name, quantity in rows:
+            details[order_id].append({
+                "detail_id": detail_id,
+                "menu_item_id": menu_item_id,
+                "menu_item_name": name,
+                "quantity": quantity,
+            })
+        return details
+
+    @staticmethod
+    def _load_payments(db: Session, order_ids: List[int]) -> Dict[int, Dict]:
+        rows = db.query(
+            Payment.order_id, Payment.id, Payment.amount, Payment.status, Payment.payment_type, Payment.payment_date
+        ).filter(Payment.order_id.in_(order_ids))
+
+        return {
+            order_id: {
+                "payment_id": payment_id,
+                "payment_amount": amount,
+                "payment_status": payment_status.value,
+                "payment_type": payment_type.value,
+                "payment_date": _timestamp(payment_date),
+            }
+            for order_id, payment_id, amount, payment_status, payment_type, payment_date in rows
+        }
+
+    @staticmethod
+    def to_ndjson(orders: Iterator[Dict]) -> Iterator[str]:
+        """One JSON document per line"""
+        for order in orders:
+            yield json.dumps(order) + "\n"
+
+    @staticmethod
+    def to_csv(orders: Iterator[Dict], include_details: bool = False, include_payments: bool = False) -> Iterator[str]:
+        """
+        Header line, then one row per order, or per order line when details are
+        included (order columns repeated)
+        """
+        columns = ORDER_COLUMNS + (DETAIL_COLUMNS if include_details else []) + (PAYMENT_COLUMNS if include_payments else [])
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+
+        def flush() -> str:
+            text = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return text
+
+        writer.writeheader()
+        yield flush()
+        for order in orders:
+            row = dict(order)
+            if include_payments:
+                row.update(order.get("payment") or {})
+            for detail in (order.get("details") or [{}]) if include_details else [{}]:
+                writer.writerow({**row, **detail})
+            yield flush()
+
+    @staticmethod
+    def stream_orders(
+            db: Session,
+            export_format: str = "ndjson",
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None,
+            include_details: bool = False,
+            include_payments: bool = False
+    ) -> StreamingResponse:
+        """
+        Streaming export response; the session is released when the stream ends
+        :param db:
+        :param export_format: ndjson or csv
+        :param start_date:
+        :param end_date:
+        :param include_details:
+        :param include_payments:
+        :return:
+        """
+        def body() -> Iterator[str]:
+            try:
+                orders = ExportService.iter_orders(db, start_date, end_date, include_details, include_payments)
+                if export_format == "csv":
+                    yield from ExportService.to_csv(orders, include_details, include_payments)
+                else:
+                    yield from ExportService.to_ndjson(orders)
+            finally:
+                db.close()
+
+        filename = f"orders_{start_date or 'all'}_{end_date or 'all'}.{export_format}"
+        return StreamingResponse(
+            body(),
+            media_type=EXPORT_FORMATS[export_format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
@@ -1,58 +1,101 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import update
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
-from ..models.menu_item_ingredients import MenuItemIngredient
 from ..models.resources import Resource
 from ..models.order_details import OrderDetail
+from ..utils.recipe_index import recipe_index
 from typing import Dict, List
+from collections import defaultdict
 
 class InventoryService:
 
+    @staticmethod
+    def _aggregate_quantities(order_items: List[Dict]) -> Dict[int, int]:
+        """Collapse order lines into total quantity per menu item (duplicate lines are summed)"""
+        quantities = defaultdict(int)
+        for item in order_items:
+            quantities[item["menu_item_id"]] += item["quantity"]
+        return dict(quantities)
+
+    @staticmethod
+    def _load_requirements(db: Session, menu_item_ids: List[int]) -> List[Dict]:
+        """
+        Ingredient requirements of the given menu items with current stock.
+        Recipes come from the in-memory recipe index; stock is read in one query.
+        :param db:
+        :param menu_item_ids:
+        :return: [{"menu_item_id", "amount", "resource_id", "resource_item", "resource_amount"}, ...]
+        """
+        recipes = {menu_item_id: recipe_index.get(db, menu_item_id) for menu_item_id in menu_item_ids}
+        resource_ids = {resource_id for recipe in recipes.values() for resource_id, _ in recipe}
+        if not resource_ids:
+            return []
+
+        resources = {
+            resource.id: resource
+            for resource in db.query(Resource.id, Resource.item, Resource.amount).filter(
+                Resource.id.in_(resource_ids)
+            )
+        }
+
+        return [
+            {
+                "menu_item_id": menu_item_id,
+                "amount": amount,
+                "resource_id": resource_id,
+                "resource_item": resources[resource_id].item,
+                "resource_amount": resources[resource_id].amount
+            }
+            for menu_item_id, recipe in recipes.items()
+            for resource_id, amount in recipe
+            if resource_id in resources
+        ]
+
     @staticmethod
     def check_availability(db: Session, order_items: List[Dict]) -> Dict:
         """
         Check if all items in order can be fulfilled with current inventory
         order_items: [{"menu_item_id: 1, "quantity": 2}, ...]
+
+        Recipes come from the recipe index and stock is read in a single query. Ingredient
+        demand is summed across lines, so two items sharing an ingredient are checked
+        against the stock together rather than each against the full amount.
         :param db:
         :param order_items:
         :return:
         """
         try:
-            availability = {}
-            insufficient_items = []
-
-            for item in order_items:
-                menu_item_id = item["menu_item_id"]
-                quantity = item["quantity"]
-
-                #Get required ingredients for this menu item
-                ingredients = db.query(MenuItemIngredient).join(Resource).filter(
-                    MenuItemIngredient.menu_item_id == menu_item_id
-                ).all()
+            quantities = InventoryService._aggregate_quantities(order_items)
+            requirements = InventoryService._load_requirements(db, list(quantities))
 
-                item_available = True
-                required_ingredients = {}
+            # Total demand per resource across every line of the order
+            total_demand = defaultdict(int)
+            for row in requirements:
+                total_demand[row["resource_id"]] += row["amount"] * quantities[row["menu_item_id"]]
 
-                for ingredient in ingredients:
-                    required_amount = ingredient.amount * quantity
-                    available_amount = ingredient.resource.amount
-
-                    required_ingredients[ingredient.resource.item] = {
-                        "required": required_amount,
-                        "available": available_amount,
-                        "sufficient": available_amount >= required_amount
-                    }
+            availability = {
+                menu_item_id: {"available": True, "ingredients": {}}
+                for menu_item_id in quantities
+            }
 
-                    if available_amount < required_amount:
-                        item_available = False
+            for row in requirements:
+                entry = availability[row["menu_item_id"]]
+                sufficient = row["resource_amount"] >= total_demand[row["resource_id"]]
 
-                availability[menu_item_id] = {
-                    "available": item_available,
-                    "ingredients": required_ingredients
+                entry["ingredients"][row["resource_item"]] = {
+                    "required": row["amount"] * quantities[row["menu_item_id"]],
+                    "available": row["resource_amount"],
+                    "sufficient": sufficient
                 }
 
-                if not item_available:
-                    insufficient_items.append(menu_item_id)
+                if not sufficient:
+                    entry["available"] = False
+
+            insufficient_items = [
+                menu_item_id for menu_item_id, entry in availability.items()
+                if not entry["available"]
+            ]
 
             return {
                 "all_available": len(insufficient_items) == 0,
@@ -68,44 +111,94 @@ class InventoryService:
 
 
     @staticmethod
-    def deduct_inventory(db: Session, order_items: List[Dict]) -> bool:
+    def deduct_inventory(db: Session, order_items: List[Dict], commit: bool = True) -> bool:
         """
         Deduct inventory after order confirmation
         :param db:
         :param order_items:
+        :param commit: commit the deduction, or leave it in the caller's transaction
+        :return:
+        """
+        return InventoryService.reserve_inventory(db, [order_items], commit=commit)
+
+    @staticmethod
+    def reserve_inventory(db: Session, orders: List[List[Dict]], commit: bool = True) -> bool:
+        """
+        Reserve ingredients for a batch of orders in one transaction.
+
+        Every resource is decremented with a single guarded statement
+        (UPDATE ... WHERE amount >= needed), so concurrent confirmations can never
+        drive stock negative and no row is held locked while Python does arithmetic.
+        Resources are updated in id order to keep lock acquisition consistent
+        between concurrent batches. If any resource is short, nothing is applied.
+        :param db:
+        :param orders: list of order_items lists, one per order
+        :param commit: commit the reservation; when False, committing it or rolling
+                       it back after an error is left to the caller's transaction
         :return:
         """
         try:
-            for item in order_items:
-                menu_item_id = item["menu_item_id"]
-                quantity = item["quantity"]
-
-                ingredients = db.query(MenuItemIngredient).join(Resource).filter(
-                    MenuItemIngredient.menu_item_id == menu_item_id
-                ).all()
-
-                for ingredient in ingredients:
-                    required_amount = ingredient.amount * quantity
-                    resource = ingredient.resource
-                    resource.amount -= required_amount
-
-                    if resource.amount < 0:
-                        db.rollback()
-                        raise HTTPException(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail=f"Insufficient inventory for {resource.item}"
-                        )
-
-            db.commit()
+            quantities = defaultdict(int)
+            for order_items in orders:
+                for menu_item_id, quantity in InventoryService._aggregate_quantities(order_items).items():
+                    quantities[menu_item_id] += quantity
+
+            demand = recipe_index.requirements(db, quantities)
+
+            short_resource_ids = []
+            for resource_id in sorted(demand):
+                needed = demand[resource_id]
+                if needed <= 0:
+                    continue
+
+                result = db.execute(
+                    update(Resource)
+                    .where(Resource.id == resource_id, Resource.amount >= needed)
+                    .values(amount=Resource.amount - needed)
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount == 0:
+                    short_resource_ids.append(resource_id)
+
+            if short_resource_ids:
+                shortfalls = InventoryService._get_shortfalls(db, short_resource_ids, demand)
+                if commit:
+                    db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={
+                        "message": "Insufficient inventory",
+                        "shortfalls": shortfalls
+                    }
+                )
+
+            if commit:
+                db.commit()
             return True
 
         except SQLAlchemyError as e:
-            db.rollback()
+            if commit:
+                db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Failed to deduct inventory: {str(e)}"
             )
 
+    @staticmethod
+    def _get_shortfalls(db: Session, resource_ids: List[int], demand: Dict[int, int]) -> List[Dict]:
+        """Describe the resources that could not cover their demand"""
+        resources = db.query(Resource).filter(Resource.id.in_(resource_ids)).order_by(Resource.id).all()
+        return [
+            {
+                "resource_id": resource.id,
+                "ingredient": resource.item,
+                "needed": demand[resource.id],
+                "available": resource.amount,
+                "shortage": demand[resource.id] - resource.amount
+            }
+            for resource in resources
+        ]
+
     @staticmethod
     def get_low_stock_items(db: Session, threshold: int = 10) -> List[Dict]:
         """
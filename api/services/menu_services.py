@@ -1,9 +1,10 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import and_
 from fastapi import HTTPException, status
 from typing import List, Optional, Dict
 from ..models.menu_items import MenuItem, FoodCategory
 from ..models.reviews import Reviews
+from ..utils.search_index import menu_search_index
 from sqlalchemy import func
 
 
@@ -22,31 +23,46 @@ class MenuService:
     ) -> List[Dict]:
         """
         Search and filter menu items.
+        search_term matches whole words or word prefixes of the name and description.
         :param db:
         :param search_term:
         :param category:
         :param min_price:
         :param max_price:
         :param max_calories:
-        :param sort_by:
+        :param sort_by: name, price_asc, price_desc, calories, rating or relevance
         :param available_only:
         :return:
         """
         try:
-            query = db.query(MenuItem)
+            # Review stats per item, joined once instead of queried per result row
+            review_stats = db.query(
+                Reviews.menu_item_id,
+                func.avg(Reviews.rating).label('avg_rating'),
+                func.count(Reviews.id).label('review_count')
+            ).group_by(Reviews.menu_item_id).subquery()
+
+            query = db.query(
+                MenuItem,
+                review_stats.c.avg_rating,
+                review_stats.c.review_count
+            ).outerjoin(
+                review_stats,
+                MenuItem.id == review_stats.c.menu_item_id
+            )
 
             # Filter by availability
             if available_only:
                 query = query.filter(MenuItem.is_available == True)
 
             # Apply filters
+            relevance = {}
             if search_term:
-                query = query.filter(
-                    or_(
-                        MenuItem.name.ilike(f"%{search_term}%"),
-                        MenuItem.description.ilike(f"%{search_term}%")
-                    )
-                )
+                # Tokenized prefix search from the in-memory index instead of a leading-wildcard LIKE scan
+                relevance = dict(menu_search_index.search(db, search_term))
+                if not relevance:
+                    return []
+                query = query.filter(MenuItem.id.in_(list(relevance)))
 
             if category:
                 query = query.filter(MenuItem.food_category == category)
@@ -68,33 +84,16 @@ class MenuService:
             elif sort_by == "calories":
                 query = query.order_by(MenuItem.calories.asc())
             elif sort_by == "rating":
-                #Subquery for rating sort
-                avg_rating_subquery = db.query(
-                    Reviews.menu_item_id,
-                    func.avg(Reviews.rating).label('avg_rating')
-                ).group_by(Reviews.menu_item_id).subquery()
-
-                query = query.outerjoin(
-                    avg_rating_subquery,
-                    MenuItem.id == avg_rating_subquery.c.menu_item_id
-                ).order_by(avg_rating_subquery.c.avg_rating.desc().nullslast())
-            else:  # default to name
+                # Unrated items last (portable alternative to NULLS LAST, which MySQL lacks)
+                query = query.order_by(
+                    review_stats.c.avg_rating.is_(None),
+                    review_stats.c.avg_rating.desc()
+                )
+            else:  # default to name; relevance ties are also broken by name
                 query = query.order_by(MenuItem.name.asc())
 
-            items = query.all()
-
-            # Add review stats
-            result = []
-            for item in items:
-                avg_rating = db.query(func.avg(Reviews.rating)).filter(
-                    Reviews.menu_item_id == item.id
-                ).scalar()
-
-                review_count = db.query(func.count(Reviews.id)).filter(
-                    Reviews.menu_item_id == item.id
-                ).scalar()
-
-                result.append({
+            results = [
+                {
                     "id": item.id,
                     "name": item.name,
                     "description": item.description,
@@ -104,12 +103,22 @@ class MenuService:
                     "is_available": item.is_available,
                     "average_rating": float(avg_rating) if avg_rating else None,
                     "review_count": review_count or 0
-                })
+                }
+                for item, avg_rating, review_count in query.all()
+            ]
+
+            if sort_by == "relevance" and relevance:
+                results.sort(key=lambda result: relevance[result["id"]], reverse=True)
 
-            return result
+            return results
 
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Search failed: {str(e)}"
-            )
\ No newline at end of file
+            )
+
+    @staticmethod
+    def suggest_menu_items(db: Session, prefix: str, limit: int = 10) -> List[Dict]:
+        """Typeahead suggestions for the search box, served from the in-memory index"""
+        return menu_search_index.suggest(db, prefix, limit)
\ No newline at end of file
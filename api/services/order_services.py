@@ -1,14 +1,15 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func, and_
+from sqlalchemy import and_
 from datetime import datetime, date, timedelta, time
-from typing import List, Dict, Optional
-from ..models.orders import Order, StatusType
+from typing import List, Dict, Optional, Tuple
+from ..models.orders import Order, OrderType, StatusType
 from ..models.order_details import OrderDetail
 from ..models.menu_items import MenuItem
 from ..models.promotions import Promotion
 from .inventory_services import InventoryService
+from .revenue_services import RevenueService
 from decimal import Decimal
 import logging
 
@@ -16,6 +17,31 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def order_response_loading() -> Tuple:
+    """
+    Loader options of schema.Order responses. Every relationship a response
+    touches is fetched once for the whole result instead of lazily per row.
+    Built on call because options need every mapper configured.
+    """
+    return (
+        selectinload(Order.order_details).joinedload(OrderDetail.menu_item),
+        selectinload(Order.payment),
+    )
+
+
+def order_tracking_loading() -> Tuple:
+    """Loader options of track_order: lines with their menu items, and the customer"""
+    return (
+        selectinload(Order.order_details).joinedload(OrderDetail.menu_item),
+        joinedload(Order.customer),
+    )
+
+
+def order_summary_loading() -> Tuple:
+    """Loader options of order listings that only show the customer's name"""
+    return (joinedload(Order.customer),)
+
+
 class OrderService:
 
     @staticmethod
@@ -61,14 +87,15 @@ class OrderService:
                     detail=f"Menu items not available: {list(unavailable_ids)}"
                 )
 
-            # Create order
+            # Create order; the request may carry the schema enum or its value
+            order_type = guest_info.get("order_type", "dine_in")
             new_order = Order(
                 customer_id=None,
                 guest_name=guest_info["guest_name"],
                 guest_phone=guest_info["guest_phone"],
                 guest_email=guest_info.get("guest_email"),
                 description=guest_info.get("description"),
-                order_type=guest_info.get("order_type", "dine_in"),
+                order_type=OrderType(getattr(order_type, "value", order_type)),
                 promotion_code=guest_info.get("promotion_code")
             )
 
@@ -114,7 +141,7 @@ class OrderService:
 
             # Set estimated completion time
             new_order.estimated_completion = OrderService._calculate_estimated_completion(
-                new_order.order_type, len(order_items)
+                new_order.order_type.value, len(order_items)
             )
 
             db.commit()
@@ -174,7 +201,8 @@ class OrderService:
     def track_order(db: Session, tracking_number: str) -> Dict:
         """Track order by tracking number"""
         try:
-            order = db.query(Order).filter(Order.tracking_number == tracking_number).first()
+            order = db.query(Order).options(*order_tracking_loading())\
+                .filter(Order.tracking_number == tracking_number).first()
             if not order:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -308,7 +336,7 @@ class OrderService:
                     detail="Start date must be before or equal to end date"
                 )
 
-            orders = db.query(Order).filter(
+            orders = db.query(Order).options(*order_summary_loading()).filter(
                 and_(
                     Order.order_date >= start_datetime,
                     Order.order_date <= end_datetime
@@ -337,33 +365,10 @@ class OrderService:
 
     @staticmethod
     def calculate_daily_revenue(db: Session, target_date: date) -> Dict:
-        """Calculate total revenue for a specific date - ONLY COMPLETED ORDERS"""
-        try:
-            start_of_day = datetime.combine(target_date, datetime.min.time())
-            end_of_day = start_of_day + timedelta(days=1)
-
-            result = db.query(
-                func.sum(Order.total_amount).label("total_revenue"),
-                func.count(Order.id).label("order_count")
-            ).filter(
-                and_(
-                    Order.order_date >= start_of_day,
-                    Order.order_date < end_of_day,
-                    Order.status == StatusType.COMPLETED  #only completed orders
-                )
-            ).first()
-
-            total_revenue = float(result.total_revenue) if result.total_revenue else 0.0
-            order_count = result.order_count if result.order_count else 0
-
-            return {
-                "date": target_date.isoformat(),
-                "total_revenue": total_revenue,
-                "order_count": order_count
-            }
-
-        except SQLAlchemyError as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Database error: {str(e)}"
-            )
\ No newline at end of file
+        """Calculate total revenue for a specific date - ONLY COMPLETED ORDERS, read from the daily_revenue rollup"""
+        revenue = RevenueService.get_revenue_range(db, target_date, target_date)
+        return {
+            "date": target_date.isoformat(),
+            "total_revenue": revenue["total_revenue"],
+            "order_count": revenue["order_count"]
+        }
\ No newline at end of file
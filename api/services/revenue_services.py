@@ -0,0 +1,406 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import and_, delete, event, func, insert, inspect, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from ..models.daily_revenue import DailyRevenue
+from ..models.orders import Order, OrderType, StatusType
+
+# Statuses whose orders are counted in daily_revenue. Orders are only rolled up
+# once settled, so the hot path of placing and preparing orders never touches it.
+ROLLUP_STATUSES = (StatusType.COMPLETED, StatusType.CANCELLED)
+
+# Order attributes a rollup row is derived from
+_ROLLUP_ATTRIBUTES = ("order_date", "order_type", "status", "total_amount", "discount_amount", "tax_amount")
+
+RollupKey = Tuple[date, OrderType, StatusType]
+
+_ZERO = Decimal("0")
+
+# Granularities of get_revenue_series. Hours are not in the rollup and come
+# from the orders table, so their range is bounded.
+REVENUE_BUCKETS = ("hour", "day", "week", "month")
+MAX_HOURLY_DAYS = 31
+
+
+def _amount(value) -> Decimal:
+    return Decimal(str(value)) if value is not None else _ZERO
+
+
+class RevenueService:
+
+    @staticmethod
+    def _contribution(values: Dict) -> Optional[Tuple[RollupKey, Tuple[Decimal, int, Decimal, Decimal]]]:
+        """The rollup row an order with these values counts towards, and what it adds there"""
+        if values["status"] not in ROLLUP_STATUSES or values["order_date"] is None:
+            return None
+        key = (values["order_date"].date(), values["order_type"], values["status"])
+        return key, (_amount(values["total_amount"]), 1, _amount(values["discount_amount"]), _amount(values["tax_amount"]))
+
+    @staticmethod
+    def _current_values(order: Order) -> Dict:
+        return {name: getattr(order, name) for name in _ROLLUP_ATTRIBUTES}
+
+    @staticmethod
+    def _committed_values(order: Order) -> Dict:
+        """Attribute values as last loaded from the database, before pending changes"""
+        state = inspect(order)
+        values = {}
+        for name in _ROLLUP_ATTRIBUTES:
+            history = state.attrs[name].history
+            if history.deleted:
+                values[name] = history.deleted[0]
+            elif history.unchanged:
+                values[name] = history.unchanged[0]
+            else:
+                values[name] = getattr(order, name)
+        return values
+
+    @staticmethod
+    def collect_changes(session: Session) -> Dict[RollupKey, List]:
+        """
+        Net rollup deltas of the orders a flush is about to insert, update or delete
+        :return: key -> [revenue, count, discount, tax]
+        """
+        deltas = defaultdict(lambda: [_ZERO, 0, _ZERO, _ZERO])
+
+        def add(contribution, sign: int):
+            if contribution is not None:
+                key, values = contribution
+                for position, value in enumerate(values):
+                    deltas[key][position] += sign * value
+
+        with session.no_autoflush:
+            for order in session.new:
+                if isinstance(order, Order):
+                    if order.order_date is None and order.status in ROLLUP_STATUSES:
+                        order.order_date = datetime.now()  # the server default would not be seen here
+                    add(RevenueService._contribution(RevenueService._current_values(order)), 1)
+            for order in session.dirty:
+                if isinstance(order, Order) and session.is_modified(order):
+                    add(RevenueService._contribution(RevenueService._committed_values(order)), -1)
+                    add(RevenueService._contribution(RevenueService._current_values(order)), 1)
+            for order in session.deleted:
+                if isinstance(order, Order):
+                    add(RevenueService._contribution(RevenueService._committed_values(order)), -1)
+
+        return {key: values for key, values in deltas.items() if values[1] or any(values[i] for i in (0, 2, 3))}
+
+    @staticmethod
+    def remove_order(db: Session, order: Order) -> None:
+        """Take an order out of the rollup before it is deleted with a bulk statement"""
+        contribution = RevenueService._contribution(RevenueService._committed_values(order))
+        if contribution is not None:
+            key, (revenue, count, discount, tax) = contribution
+            RevenueService.apply_deltas(db.connection(), {key: [-revenue, -count, -discount, -tax]})
+
+    @staticmethod
+    def apply_deltas(connection: Connection, deltas: Dict[RollupKey, List]) -> None:
+        """Add the deltas to their rollup rows, creating missing rows, in the caller's transaction"""
+        if not deltas:
+            return
+        rows = [
+            {"revenue_date": key[0], "order_type": key[1], "status": key[2],
+             "revenue": revenue, "order_count": count, "discount": discount, "tax": tax}
+            for key, (revenue, count, discount, tax) in deltas.items()
+        ]
+        table = DailyRevenue.__table__
+        dialect = connection.dialect.name
+
+        if dialect == "mysql":
+            statement = mysql.insert(table)
+            connection.execute(statement.on_duplicate_key_update(
+                revenue=table.c.revenue + statement.inserted.revenue,
+                order_count=table.c.order_count + statement.inserted.order_count,
+                discount=table.c.discount + statement.inserted.discount,
+                tax=table.c.tax + statement.inserted.tax,
+            ), rows)
+        elif dialect in ("sqlite", "postgresql"):
+            statement = (sqlite if dialect == "sqlite" else postgresql).insert(table)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.revenue_date, table.c.order_type, table.c.status],
+                set_={
+                    "revenue": table.c.revenue + statement.excluded.revenue,
+                    "order_count": table.c.order_count + statement.excluded.order_count,
+                    "discount": table.c.discount + statement.excluded.discount,
+                    "tax": table.c.tax + statement.excluded.tax,
+                },
+            ), rows)
+        else:
+            for row in rows:
+                updated = connection.execute(update(table).where(and_(
+                    table.c.revenue_date == row["revenue_date"],
+                    table.c.order_type == row["order_type"],
+                    table.c.status == row["status"],
+                )).values(
+                    revenue=table.c.revenue + row["revenue"],
+                    order_count=table.c.order_count + row["order_count"],
+                    discount=table.c.discount + row["discount"],
+                    tax=table.c.tax + row["tax"],
+                ))
+                if not updated.rowcount:
+                    connection.execute(insert(table), row)
+
+    @staticmethod
+    def backfill(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+        """
+        Rebuild the rollup from the orders table, for all days or a date range.
+        Needed once for existing data and after orders are changed with bulk
+        statements that bypass the ORM.
+        :param db:
+        :param start_date: first day to rebuild
+        :param end_date: last day to rebuild
+        :return: number of rollup rows written
+        """
+        try:
+            order_filters = [Order.status.in_(ROLLUP_STATUSES)]
+            rollup_filters = []
+            if start_date:
+                order_filters.append(Order.order_date >= datetime.combine(start_date, time.min))
+                rollup_filters.append(DailyRevenue.revenue_date >= start_date)
+            if end_date:
+                order_filters.append(Order.order_date < datetime.combine(end_date + timedelta(days=1), time.min))
+                rollup_filters.append(DailyRevenue.revenue_date <= end_date)
+
+            db.execute(delete(DailyRevenue).where(*rollup_filters))
+            order_day = func.date(Order.order_date)
+            totals = select(
+                order_day,
+                Order.order_type,
+                Order.status,
+                func.coalesce(func.sum(Order.total_amount), 0),
+                func.count(Order.id),
+                func.coalesce(func.sum(Order.discount_amount), 0),
+                func.coalesce(func.sum(Order.tax_amount), 0),
+            ).where(*order_filters).group_by(order_day, Order.order_type, Order.status)
+            result = db.execute(insert(DailyRevenue).from_select(
+                ["revenue_date", "order_type", "status", "revenue", "order_count", "discount", "tax"], totals
+            ))
+            db.commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Database error: {str(e)}"
+            )
+
+    @staticmethod
+    def get_revenue_range(db: Session, start_date: date, end_date: date) -> Dict:
+        """
+        Completed-order revenue per day and in total, read from the rollup
+        :param db:
+        :param start_date:
+        :param end_date:
+        :return: totals plus one entry per day of the range (zeros included)
+        """
+        if start_date > end_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Start date must be before or equal to end date"
+            )
+        try:
+            rows = db.query(
+                DailyRevenue.revenue_date,
+                func.sum(DailyRevenue.revenue),
+                func.sum(DailyRevenue.order_count),
+                func.sum(DailyRevenue.discount),
+                func.sum(DailyRevenue.tax),
+            ).filter(
+                DailyRevenue.revenue_date >= start_date,
+                DailyRevenue.revenue_date <= end_date,
+                DailyRevenue.status == StatusType.COMPLETED,
+            ).group_by(DailyRevenue.revenue_date).all()
+        except SQLAlchemyError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Database error: {str(e)}"
+            )
+
+        by_day = {revenue_date: values for revenue_date, *values in rows}
+        days = []
+        for offset in range((end_date - start_date).days + 1):
+            day = start_date + timedelta(days=offset)
+            revenue, count, discount, tax = by_day.get(day, (0, 0, 0, 0))
+            days.append({
+                "date": day.isoformat(),
+                "total_revenue": float(revenue or 0),
+                "order_count": int(count or 0),
+                "discount_total": float(discount or 0),
+                "tax_total": float(tax or 0),
+            })
+
+        return {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "total_revenue": round(sum(day["total_revenue"] for day in days), 2),
+            "order_count": sum(day["order_count"] for day in days),
+            "discount_total": round(sum(day["discount_total"] for day in days), 2),
+            "tax_total": round(sum(day["tax_total"] for day in days), 2),
+            "days": days,
+        }
+
+    @staticmethod
+    def _bucket_start(day: date, bucket: str) -> date:
+        """First day of the week (Monday) or month holding `day`"""
+        if bucket == "week":
+            return day - timedelta(days=day.weekday())
+        if bucket == "month":
+            return day.replace(day=1)
+        return day
+
+    @staticmethod
+    def _bucket_keys(start_date: date, end_date: date, bucket: str) -> List:
+        """Every bucket of the range in order, including empty ones"""
+        if bucket == "hour":
+            first = datetime.combine(start_date, time.min)
+            return [first + timedelta(hours=hour) for hour in range(((end_date - start_date).days + 1) * 24)]
+        keys, day = [], RevenueService._bucket_start(start_date, bucket)
+        while day <= end_date:
+            keys.append(day)
+            if bucket == "month":
+                day = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+            else:
+                day += timedelta(days=7 if bucket == "week" else 1)
+        return keys
+
+    @staticmethod
+    def _hour_expression(db: Session):
+        """order_date truncated to the hour, as 'YYYY-MM-DD HH:00:00' text"""
+        dialect = db.get_bind().dialect.name
+        if dialect == "mysql":
+            return func.date_format(Order.order_date, "%Y-%m-%d %H:00:00")
+        if dialect == "postgresql":
+            return func.to_char(func.date_trunc("hour", Order.order_date), "YYYY-MM-DD HH24:00:00")
+        return func.strftime("%Y-%m-%d %H:00:00", Order.order_date)
+
+    @staticmethod
+    def _series_rows(db: Session, start_date: date, end_date: date, bucket: str) -> List[Tuple]:
+        """(bucket key, order type, revenue, order count, discount) of completed orders, from one grouped query"""
+        if bucket == "hour":
+            hour = RevenueService._hour_expression(db)
+            rows = db.query(
+                hour,
+                Order.order_type,
+                func.sum(Order.total_amount),
+                func.count(Order.id),
+                func.sum(Order.discount_amount),
+            ).filter(
+                Order.order_date >= datetime.combine(start_date, time.min),
+                Order.order_date < datetime.combine(end_date + timedelta(days=1), time.min),
+                Order.status == StatusType.COMPLETED,
+            ).group_by(hour, Order.order_type).all()
+            return [(datetime.strptime(key, "%Y-%m-%d %H:%M:%S"), *values) for key, *values in rows]
+
+        rows = db.query(
+            DailyRevenue.revenue_date,
+            DailyRevenue.order_type,
+            DailyRevenue.revenue,
+            DailyRevenue.order_count,
+            DailyRevenue.discount,
+        ).filter(
+            DailyRevenue.revenue_date >= start_date,
+            DailyRevenue.revenue_date <= end_date,
+            DailyRevenue.status == StatusType.COMPLETED,
+        ).all()
+        return [(RevenueService._bucket_start(day, bucket), *values) for day, *values in rows]
+
+    @staticmethod
+    def _series_point(revenue: Decimal, count: int, discount: Decimal) -> Dict:
+        return {
+            "total_revenue": float(round(revenue, 2)),
+            "order_count": count,
+            "average_ticket": float(round(revenue / count, 2)) if count else 0.0,
+            "discount_total": float(round(discount, 2)),
+        }
+
+    @staticmethod
+    def get_revenue_series(db: Session, start_date: date, end_date: date, bucket: str = "day",
+                           by_order_type: bool = False) -> Dict:
+        """
+        Completed-order revenue, order count, average ticket and discounts per
+        hour, day, week or month of a date range. Days, weeks and months are
+        summed from the daily_revenue rollup behind calculate_daily_revenue;
+        hours are grouped from the orders table in a single query.
+        :param db:
+        :param start_date:
+        :param end_date:
+        :param bucket: hour, day, week or month; weeks start on Monday
+        :param by_order_type: also split every bucket by order type
+        :return: totals plus one entry per bucket (empty buckets included)
+        """
+        if bucket not in REVENUE_BUCKETS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Bucket must be one of: {', '.join(REVENUE_BUCKETS)}"
+            )
+        if start_date > end_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Start date must be before or equal to end date"
+            )
+        if bucket == "hour" and (end_date - start_date).days >= MAX_HOURLY_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Hourly buckets are limited to {MAX_HOURLY_DAYS} days"
+            )
+        try:
+            rows = RevenueService._series_rows(db, start_date, end_date, bucket)
+        except SQLAlchemyError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Database error: {str(e)}"
+            )
+
+        # bucket key -> order type -> [revenue, count, discount]
+        sums = defaultdict(lambda: defaultdict(lambda: [_ZERO, 0, _ZERO]))
+        for key, order_type, revenue, count, discount in rows:
+            values = sums[key][order_type]
+            values[0] += _amount(revenue)
+            values[1] += int(count or 0)
+            values[2] += _amount(discount)
+
+        totals = [_ZERO, 0, _ZERO]
+        buckets = []
+        for key in RevenueService._bucket_keys(start_date, end_date, bucket):
+            by_type = sums.get(key, {})
+            revenue = sum((values[0] for values in by_type.values()), _ZERO)
+            count = sum(values[1] for values in by_type.values())
+            discount = sum((values[2] for values in by_type.values()), _ZERO)
+            totals = [totals[0] + revenue, totals[1] + count, totals[2] + discount]
+            point = {"bucket_start": key.isoformat(), **RevenueService._series_point(revenue, count, discount)}
+            if by_order_type:
+                point["order_types"] = {
+                    order_type.value: RevenueService._series_point(*by_type.get(order_type, (_ZERO, 0, _ZERO)))
+                    for order_type in OrderType
+                }
+            buckets.append(point)
+
+        return {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "bucket": bucket,
+            **RevenueService._series_point(*totals),
+            "buckets": buckets,
+        }
+
+
+@event.listens_for(Session, "before_flush")
+def _update_daily_revenue(session: Session, flush_context, instances):
+    """Keep daily_revenue in step with every ORM change to orders, in the same transaction"""
+    RevenueService.apply_deltas(session.connection(), RevenueService.collect_changes(session))
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the previous value when one of these is assigned, so the order can be
+# taken out of the rollup row it was counted in
+for _attribute in _ROLLUP_ATTRIBUTES:
+    event.listen(getattr(Order, _attribute), "set", _keep_previous_value, retval=True, active_history=True)
@@ -1,63 +1,52 @@
-from sqlalchemy import func, and_
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Response
 from sqlalchemy.exc import SQLAlchemyError
-from api.models.menu_item_ingredients import MenuItemIngredient
-from api.models.orders import Order, StatusType
 from api.models.payments import Payment, PaymentStatus
 from api.models.resources import Resource
 from api.models import promotions as promotion_model
+from api.utils.recipe_index import recipe_index
+from api.services.order_services import OrderService
 
 
 def calculate_daily_revenue(db: Session, date):
     """
     Calculate daily revenue from completed orders only
-    This must match exactly what OrderService.calculate_daily_revenue returns
+    Reads the same daily_revenue rollup as OrderService.calculate_daily_revenue
     """
-    try:
-        result = db.query(
-            func.sum(Order.total_amount).label("total_revenue"),
-            func.count(Order.id).label("order_count")
-        ).filter(
-            and_(
-                func.date(Order.order_date) == date,
-                Order.status == StatusType.COMPLETED  #Only completed orders
-            )
-        ).first()
-
-        return {
-            "date": date.isoformat(),
-            "total_revenue": float(result.total_revenue) if result.total_revenue else 0.0,
-            "order_count": result.order_count or 0
-        }
-
-    except SQLAlchemyError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Database error: {str(e)}"
-        )
+    return OrderService.calculate_daily_revenue(db, date)
 
 
 # this function gets and returns the ingredients needed for a particular menu item
 def get_required_ingredients(db, menu_item_id, quantity):
-    ingredients = db.query(MenuItemIngredient).join(Resource).filter(
-        MenuItemIngredient.menu_item_id == menu_item_id
-    ).all()
+    recipe = recipe_index.get(db, menu_item_id)
+    if not recipe:
+        return {}
+
+    names = dict(
+        db.query(Resource.id, Resource.item).filter(
+            Resource.id.in_([resource_id for resource_id, _ in recipe])
+        ).all()
+    )
 
     return {
-        ingredient.resource.item: ingredient.amount * quantity
-        for ingredient in ingredients
+        names[resource_id]: amount * quantity
+        for resource_id, amount in recipe
+        if resource_id in names
     }
 
 def check_ingredient_availability(db, menu_item_id, quantity):
-    required = get_required_ingredients(db, menu_item_id, quantity)
+    required = recipe_index.requirements(db, {menu_item_id: quantity})
+    if not required:
+        return []
+
+    resources = db.query(Resource).filter(Resource.id.in_(list(required))).all()
     shortages = []
 
-    for ingredient_name, needed_amount in required.items():
-        resource = db.query(Resource).filter(Resource.item == ingredient_name).first()
-        if resource and resource.amount < needed_amount:
+    for resource in resources:
+        needed_amount = required[resource.id]
+        if resource.amount < needed_amount:
             shortages.append({
-                "ingredient": ingredient_name,
+                "ingredient": resource.item,
                 "needed": needed_amount,
                 "available": resource.amount,
                 "shortage": needed_amount - resource.amount
@@ -0,0 +1,202 @@
+import hashlib
+import importlib
+import inspect
+import json
+import struct
+import zlib
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session
+
+try:
+    import msgpack
+except ImportError:  # optional, JSON is used without it
+    msgpack = None
+
+# Bump when the shape of cached values changes; entries written under another
+# version are treated as misses instead of being handed to new code
+CACHE_SCHEMA_VERSION = 1
+
+# Payloads larger than this many bytes are zlib-compressed
+COMPRESS_THRESHOLD = 4096
+
+# Entry header: format version, schema version, flags, fresh-until timestamp (0 = none)
+_HEADER = struct.Struct("!BHBd")
+_FORMAT_VERSION = 1
+_FLAG_COMPRESSED = 1
+_FLAG_MSGPACK = 2
+
+_TYPE_KEY = "__type__"
+# Cached enums are only resolved from the application's own modules
+_ENUM_MODULE_PREFIX = "api."
+
+
+class CodecError(ValueError):
+    """Raised for entries that cannot be decoded by this codec and schema version"""
+
+
+class Stamped(NamedTuple):
+    """Cached result together with the time (epoch seconds) until which it is fresh"""
+    value: Any
+    fresh_until: float
+
+
+def _encode_default(value: Any) -> Any:
+    """Tag the non-JSON types our services return so they decode to the same type"""
+    if isinstance(value, Enum):
+        enum_type = type(value)
+        return {_TYPE_KEY: "enum", "value": [f"{enum_type.__module__}:{enum_type.__qualname__}", value.value]}
+    if isinstance(value, Decimal):
+        return {_TYPE_KEY: "decimal", "value": str(value)}
+    if isinstance(value, datetime):
+        return {_TYPE_KEY: "datetime", "value": value.isoformat()}
+    if isinstance(value, date):
+        return {_TYPE_KEY: "date", "value": value.isoformat()}
+    if isinstance(value, time):
+        return {_TYPE_KEY: "time", "value": value.isoformat()}
+    if isinstance(value, timedelta):
+        return {_TYPE_KEY: "timedelta", "value": value.total_seconds()}
+    if isinstance(value, (set, frozenset)):
+        return {_TYPE_KEY: "set", "value": sorted(value, key=repr)}
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def _tag_non_string_keys(value: Any) -> Any:
+    """JSON objects only have string keys, so keep dicts keyed by ints etc. as pairs"""
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {key: _tag_non_string_keys(item) for key, item in value.items()}
+        return {_TYPE_KEY: "dict", "value": [[key, _tag_non_string_keys(item)] for key, item in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [_tag_non_string_keys(item) for item in value]
+    return value
+
+
+def _decode_enum(value: Any) -> Enum:
+    """Only ever resolves to an Enum subclass, never to arbitrary callables"""
+    path, member_value = value
+    module_name, _, type_name = path.partition(":")
+    if not module_name.startswith(_ENUM_MODULE_PREFIX):
+        raise ValueError(f"Enum outside the application: {path}")
+    enum_type = getattr(importlib.import_module(module_name), type_name, None)
+    if not (isinstance(enum_type, type) and issubclass(enum_type, Enum)):
+        raise ValueError(f"Not an enum: {path}")
+    return enum_type(member_value)
+
+
+def _decode_pairs(pairs: Any) -> Dict:
+    return {tuple(key) if isinstance(key, list) else key: item for key, item in pairs}
+
+
+_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "decimal": Decimal,
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "time": time.fromisoformat,
+    "timedelta": lambda seconds: timedelta(seconds=seconds),
+    "set": set,
+    "dict": _decode_pairs,
+    "enum": _decode_enum,
+}
+
+
+def _decode_hook(value: Dict) -> Any:
+    decoder = _DECODERS.get(value.get(_TYPE_KEY)) if len(value) == 2 else None
+    return decoder(value["value"]) if decoder else value
+
+
+class CacheCodec:
+    """
+    Serializes cache entries as a small header followed by JSON (or msgpack) and
+    optionally zlib-compresses large payloads. Decimal, date/time and enum values
+    survive the round trip; anything else unknown is rejected rather than pickled.
+    """
+
+    def __init__(self, use_msgpack: bool = False, compress_threshold: Optional[int] = COMPRESS_THRESHOLD,
+                 schema_version: int = CACHE_SCHEMA_VERSION):
+        if use_msgpack and msgpack is None:
+            print("Warning: msgpack not installed, caching as JSON")
+            use_msgpack = False
+        self.use_msgpack = use_msgpack
+        self.compress_threshold = compress_threshold
+        self.schema_version = schema_version
+
+    def _dumps(self, value: Any) -> bytes:
+        if self.use_msgpack:
+            return msgpack.packb(value, default=_encode_default, use_bin_type=True)
+        return json.dumps(_tag_non_string_keys(value), default=_encode_default, separators=(",", ":")).encode()
+
+    def _loads(self, payload: bytes, flags: int) -> Any:
+        if flags & _FLAG_MSGPACK:
+            if msgpack is None:
+                raise CodecError("Entry was written with msgpack, which is not installed")
+            return msgpack.unpackb(payload, object_hook=_decode_hook, raw=False, strict_map_key=False)
+        return json.loads(payload, object_hook=_decode_hook)
+
+    def encode(self, value: Any) -> bytes:
+        fresh_until = 0.0
+        if isinstance(value, Stamped):
+            value, fresh_until = value
+
+        payload = self._dumps(value)
+        flags = _FLAG_MSGPACK if self.use_msgpack else 0
+        if self.compress_threshold is not None and len(payload) > self.compress_threshold:
+            payload = zlib.compress(payload)
+            flags |= _FLAG_COMPRESSED
+        return _HEADER.pack(_FORMAT_VERSION, self.schema_version, flags, fresh_until) + payload
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            format_version, schema_version, flags, fresh_until = _HEADER.unpack_from(data)
+        except struct.error:
+            raise CodecError("Truncated cache entry")
+        if format_version != _FORMAT_VERSION or schema_version != self.schema_version:
+            raise CodecError("Cache entry written by another version")
+
+        payload = data[_HEADER.size:]
+        try:
+            if flags & _FLAG_COMPRESSED:
+                payload = zlib.decompress(payload)
+            value = self._loads(payload, flags)
+        except (ValueError, ImportError, zlib.error) as e:
+            raise CodecError(f"Corrupt cache entry: {e}")
+        return Stamped(value, fresh_until) if fresh_until else value
+
+
+def _is_session(value: Any) -> bool:
+    # The async session type is only imported where it is used
+    return isinstance(value, Session) or type(value).__name__ == "AsyncSession"
+
+
+def build_key(prefix: str, args: Tuple = (), kwargs: Optional[Dict] = None,
+              signature: Optional[inspect.Signature] = None) -> str:
+    """
+    Cache key for a call: the readable prefix plus a hash of the arguments.
+    Database sessions are left out, and when the function signature is given the
+    arguments are bound to their parameter names first, so f(1, b=2) and f(1, 2)
+    share a key.
+    """
+    kwargs = kwargs or {}
+    if signature is not None:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = {name: value for name, value in bound.arguments.items() if not _is_session(value)}
+        key_data: Any = arguments
+    else:
+        key_data = {
+            "args": [value for value in args if not _is_session(value)],
+            "kwargs": {name: value for name, value in kwargs.items() if not _is_session(value)},
+        }
+    canonical = json.dumps(key_data, default=_key_default, sort_keys=True, separators=(",", ":"))
+    return f"{prefix}:{hashlib.sha256(canonical.encode()).hexdigest()[:32]}"
+
+
+def _key_default(value: Any) -> Any:
+    try:
+        return _encode_default(value)
+    except TypeError:
+        return repr(value)
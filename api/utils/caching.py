@@ -1,132 +1,655 @@
 from functools import wraps
-from typing import Any, Dict, Optional, Callable
-import pickle
-import hashlib
+from typing import Any, Awaitable, Dict, List, Optional, Callable, Sequence
+import inspect
 import time
 import redis
+import redis.asyncio as redis_asyncio
 from redis.exceptions import  RedisError, ConnectionError
 import json
 import asyncio
+import threading
+import uuid
+import weakref
 from fastapi import HTTPException, status
+from .memory_cache import MemoryCache
+from .cache_codec import CacheCodec, CodecError, Stamped as _Stamped, build_key
+from ..dependencies.config import conf
+
+# Redis keys holding the generation counter of each tag
+TAG_KEY_PREFIX = "cache_tag:"
+SCAN_BATCH_SIZE = 500
+
+# Pub/sub channel on which workers announce invalidations to each other's L1
+INVALIDATION_CHANNEL = "cache_invalidation"
+LISTENER_RETRY_SECONDS = 1.0
+
+# Single-flight recomputation locks
+LOCK_KEY_PREFIX = "cache_lock:"
+LOCK_POLL_SECONDS = 0.05
+
+# Tag of every cached result derived from menu items or their recipes
+MENU_CACHE_TAG = "menu"
+
+# Tag of analytics results (aggregates over orders and reviews)
+ANALYTICS_CACHE_TAG = "analytics"
+
+
+_MISSING = object()
 
 
 class CacheManager:
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
-        try:
-            self.redis_client = redis.from_url(redis_url)
-            self.redis_client.ping()  # Test connection
-        except (ConnectionError, TimeoutError):
-            self.redis_client = None
-            print("Warning: Redis not available, using in-memory cache")
-            self._memory_cache: Dict[str, Dict] = {}
+    def __init__(self, redis_url: Optional[str] = "redis://localhost:6379",
+                 max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024,
+                 l1_ttl: Optional[int] = None, redis_client: Optional[redis.Redis] = None,
+                 async_redis_client: Optional[redis_asyncio.Redis] = None, async_max_connections: int = 50,
+                 codec: Optional[CacheCodec] = None):
+        """
+        :param redis_url: None to use the in-memory cache only
+        :param max_entries: entry limit of the in-process cache
+        :param max_bytes: approximate byte budget of the in-process cache
+        :param l1_ttl: keep Redis hits in the in-process cache for up to this many seconds
+        :param redis_client: ready-made client to use instead of connecting to redis_url
+        :param async_redis_client: ready-made asyncio client for coroutine callers
+        :param async_max_connections: size of the asyncio client's connection pool
+        :param codec: serializer of the values stored in Redis (JSON by default)
+        """
+        self.redis_client = None
+        self.codec = codec or CacheCodec()
+        self.async_redis_client = async_redis_client
+        self.local = MemoryCache(max_entries=max_entries, max_bytes=max_bytes)
+        self.l1_ttl = l1_ttl
+        self._tag_generations: Dict[str, int] = {}
+        # Identifies this process' own messages on the invalidation channel
+        self.instance_id = uuid.uuid4().hex
+        self._listener: Optional[threading.Thread] = None
+        self._listener_stopped = threading.Event()
+        # Per-key locks, dropped automatically once nobody holds or waits on them
+        self._key_locks = weakref.WeakValueDictionary()
+        self._async_key_locks = weakref.WeakValueDictionary()
+        self._key_locks_guard = threading.Lock()
+
+        if redis_client is not None:
+            self.redis_client = redis_client
+        elif redis_url is not None:
+            try:
+                self.redis_client = redis.from_url(redis_url)
+                self.redis_client.ping()  # Test connection
+                # Connections are opened lazily from the pool, in the running event loop
+                self.async_redis_client = redis_asyncio.from_url(redis_url, max_connections=async_max_connections)
+            except (ConnectionError, TimeoutError):
+                self.redis_client = None
+                print("Warning: Redis not available, using in-memory cache")
+
+        if self._use_l1:
+            self.start_listener()
+
+    @property
+    def _use_l1(self) -> bool:
+        return self.redis_client is not None and bool(self.l1_ttl)
 
     def _generate_key(self, prefix: str, *args, **kwargs) -> str:
-        """Generate cache key from function name and arguments"""
-        key_data = f"{prefix}:{str(args)}:{str(sorted(kwargs.items()))}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+        """Generate cache key from function name and arguments (the prefix stays readable)"""
+        return build_key(prefix, args, kwargs)
 
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"{TAG_KEY_PREFIX}{tag}"
+
+    def _tag_versions(self, tags: Sequence[str]) -> List[int]:
+        """Current generation of each tag"""
+        if not self.redis_client:
+            return [self._tag_generations.get(tag, 0) for tag in tags]
+
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        if not self._use_l1:
+            values = self.redis_client.mget(tag_keys)
+            return [int(value) if value else 0 for value in values]
+
+        # Generations are kept in L1 too; invalidation messages drop them
+        versions = [self.local.get(tag_key) for tag_key in tag_keys]
+        missing = [i for i, version in enumerate(versions) if version is None]
+        if missing:
+            values = self.redis_client.mget([tag_keys[i] for i in missing])
+            for i, value in zip(missing, values):
+                versions[i] = int(value) if value else 0
+                self.local.set(tag_keys[i], versions[i], self.l1_ttl)
+        return versions
+
+    def _versioned_key(self, key: str, tags: Sequence[str]) -> str:
+        """
+        Embed the generation of every tag in the key, so bumping a tag makes all
+        entries stored under it unreachable (they then age out through their TTL)
+        """
+        if not tags:
+            return key
+        tags = sorted(set(tags))
+        versions = self._tag_versions(tags)
+        return f"{key}@" + ",".join(f"{tag}.{version}" for tag, version in zip(tags, versions))
+
+    def get(self, key: str, tags: Sequence[str] = (), bypass_l1: bool = False) -> Optional[Any]:
+        """
+        Get value from cache
+        :param bypass_l1: read Redis even when L1 has a copy, refreshing that copy
+        """
         try:
-            if self.redis_client:
-                value = self.redis_client.get(key)
-                if value:
-                    return pickle.loads(value)
-            else:
-                cache_item = self._memory_cache.get(key)
-                if cache_item and cache_item['expires'] > time.time():
-                    return cache_item['data']
-                elif cache_item:
-                    del self._memory_cache[key]
+            key = self._versioned_key(key, tags)
+            if not self.redis_client or (self._use_l1 and not bypass_l1):
+                value = self.local.get(key)
+                if value is not None or not self.redis_client:
+                    return value
+
+            value = self.redis_client.get(key)
+            if value:
+                try:
+                    result = self.codec.decode(value)
+                except CodecError:
+                    # Written by another deploy or codec; recomputed and overwritten
+                    return None
+                if self._use_l1:
+                    # Never keep a local copy longer than Redis keeps the original
+                    remaining = self.redis_client.ttl(key)
+                    self.local.set(key, result, min(self.l1_ttl, remaining) if remaining > 0 else self.l1_ttl)
+                return result
         except Exception as e:
             print(f"Cache get error: {e}")
         return None
 
-    def set(self, key: str, value: Any, ttl: int = 300) -> bool:
-        """Set value in cache with TTL"""
+    def set(self, key: str, value: Any, ttl: int = 300, tags: Sequence[str] = ()) -> bool:
+        """Set value in cache with TTL, registered under the given tags"""
         try:
+            key = self._versioned_key(key, tags)
             if self.redis_client:
-                return self.redis_client.setex(key, ttl, pickle.dumps(value))
-            else:
-                self._memory_cache[key] = {
-                    'data': value,
-                    'expires': time.time() + ttl
-                }
-                return True
+                stored = self.redis_client.setex(key, ttl, self.codec.encode(value))
+                if self._use_l1:
+                    self.local.set(key, value, min(ttl, self.l1_ttl))
+                return stored
+            return self.local.set(key, value, ttl)
         except Exception as e:
             print(f"Cache set error: {e}")
         return False
 
-    def delete(self, key: str) -> bool:
+    def delete(self, key: str, tags: Sequence[str] = ()) -> bool:
         """Delete key from cache"""
         try:
+            key = self._versioned_key(key, tags)
+            deleted = self.local.delete(key)
             if self.redis_client:
-                return bool(self.redis_client.delete(key))
-            else:
-                if key in self._memory_cache:
-                    del self._memory_cache[key]
-                    return True
+                deleted = bool(self.redis_client.delete(key)) or deleted
+                self._publish_invalidation(keys=[key])
+            return deleted
         except Exception as e:
             print(f"Cache delete error: {e}")
         return False
 
-    def clear_pattern(self, pattern: str) -> int:
-        """Clear keys matching pattern"""
+    def invalidate_tags(self, *tags: str) -> bool:
+        """
+        Invalidate every entry registered under any of the tags.
+        Costs one counter increment per tag, whatever the number of keys.
+        """
         try:
             if self.redis_client:
-                keys = self.redis_client.keys(pattern)
-                if keys:
-                    return self.redis_client.delete(*keys)
+                pipeline = self.redis_client.pipeline(transaction=False)
+                for tag in tags:
+                    pipeline.incr(self._tag_key(tag))
+                pipeline.execute()
+                for tag in tags:
+                    self.local.delete(self._tag_key(tag))
+                self._publish_invalidation(keys=[self._tag_key(tag) for tag in tags])
             else:
-                keys_to_delete = [k for k in self._memory_cache.keys() if pattern in k]
-                for key in keys_to_delete:
-                    del self._memory_cache[key]
-                return len(keys_to_delete)
+                for tag in tags:
+                    self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+            return True
+        except Exception as e:
+            print(f"Cache invalidate error: {e}")
+        return False
+
+    def clear_pattern(self, pattern: str) -> int:
+        """
+        Clear keys matching a glob pattern.
+        Walks the keyspace incrementally with SCAN; prefer invalidate_tags for
+        anything on a request path.
+        """
+        try:
+            deleted = self.local.delete_matching(pattern)
+            if self.redis_client:
+                deleted = 0
+                batch = []
+                for key in self.redis_client.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+                    batch.append(key)
+                    if len(batch) >= SCAN_BATCH_SIZE:
+                        deleted += self.redis_client.delete(*batch)
+                        batch = []
+                if batch:
+                    deleted += self.redis_client.delete(*batch)
+                self._publish_invalidation(pattern=pattern)
+            return deleted
         except Exception as e:
             print(f"Cache clear pattern error: {e}")
         return 0
 
+    async def _run_sync(self, method: Callable, *args) -> Any:
+        """
+        Fallback without an asyncio client: in-memory calls are cheap, blocking Redis
+        calls are moved off the event loop
+        """
+        if not self.redis_client:
+            return method(*args)
+        return await asyncio.to_thread(method, *args)
+
+    async def _atag_versions(self, tags: Sequence[str]) -> List[int]:
+        """Coroutine counterpart of _tag_versions"""
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        versions = [self.local.get(tag_key) for tag_key in tag_keys] if self._use_l1 else [None] * len(tags)
+        missing = [i for i, version in enumerate(versions) if version is None]
+        if missing:
+            values = await self.async_redis_client.mget([tag_keys[i] for i in missing])
+            for i, value in zip(missing, values):
+                versions[i] = int(value) if value else 0
+                if self._use_l1:
+                    self.local.set(tag_keys[i], versions[i], self.l1_ttl)
+        return versions
+
+    async def _aversioned_keys(self, keys: Sequence[str], tags: Sequence[str]) -> List[str]:
+        """Versioned form of several keys sharing the same tags, resolving the generations once"""
+        if not tags:
+            return list(keys)
+        tags = sorted(set(tags))
+        versions = await self._atag_versions(tags)
+        suffix = ",".join(f"{tag}.{version}" for tag, version in zip(tags, versions))
+        return [f"{key}@{suffix}" for key in keys]
+
+    async def _aversioned_key(self, key: str, tags: Sequence[str]) -> str:
+        return (await self._aversioned_keys([key], tags))[0]
+
+    async def aget(self, key: str, tags: Sequence[str] = (), bypass_l1: bool = False) -> Optional[Any]:
+        """Get value from cache without blocking the event loop"""
+        if self.async_redis_client is None:
+            return await self._run_sync(self.get, key, tags, bypass_l1)
+        return (await self.amget([key], tags, bypass_l1))[0]
+
+    async def amget(self, keys: Sequence[str], tags: Sequence[str] = (),
+                    bypass_l1: bool = False) -> List[Optional[Any]]:
+        """
+        Get several values sharing the same tags in one round trip
+        (plus one for the tag generations when they are not in L1)
+        :return: values in the order of keys, None for misses
+        """
+        if self.async_redis_client is None:
+            return [await self._run_sync(self.get, key, tags, bypass_l1) for key in keys]
+        results: List[Optional[Any]] = [None] * len(keys)
+        try:
+            versioned = await self._aversioned_keys(keys, tags)
+            missing = list(range(len(keys)))
+            if self._use_l1 and not bypass_l1:
+                for i, key in enumerate(versioned):
+                    results[i] = self.local.get(key)
+                missing = [i for i in missing if results[i] is None]
+            if not missing:
+                return results
+
+            pipeline = self.async_redis_client.pipeline(transaction=False)
+            pipeline.mget([versioned[i] for i in missing])
+            if self._use_l1:
+                for i in missing:
+                    pipeline.ttl(versioned[i])
+            replies = await pipeline.execute()
+
+            for position, i in enumerate(missing):
+                value = replies[0][position]
+                if not value:
+                    continue
+                try:
+                    results[i] = self.codec.decode(value)
+                except CodecError:
+                    continue
+                if self._use_l1:
+                    remaining = replies[1 + position]
+                    self.local.set(versioned[i], results[i],
+                                   min(self.l1_ttl, remaining) if remaining > 0 else self.l1_ttl)
+        except Exception as e:
+            print(f"Cache get error: {e}")
+        return results
+
+    async def aset(self, key: str, value: Any, ttl: int = 300, tags: Sequence[str] = ()) -> bool:
+        """Set value in cache without blocking the event loop"""
+        if self.async_redis_client is None:
+            return await self._run_sync(self.set, key, value, ttl, tags)
+        try:
+            key = await self._aversioned_key(key, tags)
+            stored = await self.async_redis_client.setex(key, ttl, self.codec.encode(value))
+            if self._use_l1:
+                self.local.set(key, value, min(ttl, self.l1_ttl))
+            return bool(stored)
+        except Exception as e:
+            print(f"Cache set error: {e}")
+        return False
+
+    async def adelete(self, key: str, tags: Sequence[str] = ()) -> bool:
+        """Delete key from cache without blocking the event loop"""
+        if self.async_redis_client is None:
+            return await self._run_sync(self.delete, key, tags)
+        try:
+            key = await self._aversioned_key(key, tags)
+            deleted = self.local.delete(key)
+            deleted = bool(await self.async_redis_client.delete(key)) or deleted
+            await self._apublish_invalidation(keys=[key])
+            return deleted
+        except Exception as e:
+            print(f"Cache delete error: {e}")
+        return False
+
+    async def ainvalidate_tags(self, *tags: str) -> bool:
+        """Coroutine counterpart of invalidate_tags"""
+        if self.async_redis_client is None:
+            return await self._run_sync(self.invalidate_tags, *tags)
+        try:
+            pipeline = self.async_redis_client.pipeline(transaction=False)
+            for tag in tags:
+                pipeline.incr(self._tag_key(tag))
+            await pipeline.execute()
+            for tag in tags:
+                self.local.delete(self._tag_key(tag))
+            await self._apublish_invalidation(keys=[self._tag_key(tag) for tag in tags])
+            return True
+        except Exception as e:
+            print(f"Cache invalidate error: {e}")
+        return False
+
+    def _key_lock(self, key: str, factory: Callable, locks: weakref.WeakValueDictionary):
+        with self._key_locks_guard:
+            lock = locks.get(key)
+            if lock is None:
+                lock = factory()
+                locks[key] = lock
+            return lock
+
+    def _acquire_shared_lock(self, key: str, lock_timeout: float) -> Optional[str]:
+        """
+        Try once to take the cross-worker lock of a key
+        :return: owner token, None when another worker holds it
+        """
+        if not self.redis_client:
+            return "local"
+        token = uuid.uuid4().hex
+        acquired = self.redis_client.set(
+            f"{LOCK_KEY_PREFIX}{key}", token, nx=True, px=int(lock_timeout * 1000)
+        )
+        return token if acquired else None
+
+    def _release_shared_lock(self, key: str, token: str) -> None:
+        if not self.redis_client:
+            return
+        lock_key = f"{LOCK_KEY_PREFIX}{key}"
+        try:
+            # Only delete our own lock; it also expires by itself if we never get here
+            if self.redis_client.get(lock_key) == token.encode():
+                self.redis_client.delete(lock_key)
+        except Exception as e:
+            print(f"Cache unlock error: {e}")
+
+    def _fresh(self, key: str, tags: Sequence[str]) -> Any:
+        # Straight from Redis: a refresh by another worker is not announced, so
+        # this worker's L1 may still hold the expired stamp
+        entry = self.get(key, tags, bypass_l1=True)
+        if isinstance(entry, _Stamped) and entry.fresh_until > time.time():
+            return entry.value
+        return _MISSING
+
+    def _store(self, key: str, value: Any, ttl: int, stale_ttl: int, tags: Sequence[str]) -> None:
+        # Kept physically for ttl + stale_ttl, but only fresh for ttl
+        self.set(key, _Stamped(value, time.time() + ttl), ttl + stale_ttl, tags)
+
+    async def _aacquire_shared_lock(self, key: str, lock_timeout: float) -> Optional[str]:
+        if self.async_redis_client is None:
+            return await self._run_sync(self._acquire_shared_lock, key, lock_timeout)
+        token = uuid.uuid4().hex
+        acquired = await self.async_redis_client.set(
+            f"{LOCK_KEY_PREFIX}{key}", token, nx=True, px=int(lock_timeout * 1000)
+        )
+        return token if acquired else None
+
+    async def _arelease_shared_lock(self, key: str, token: str) -> None:
+        if self.async_redis_client is None:
+            return await self._run_sync(self._release_shared_lock, key, token)
+        lock_key = f"{LOCK_KEY_PREFIX}{key}"
+        try:
+            if await self.async_redis_client.get(lock_key) == token.encode():
+                await self.async_redis_client.delete(lock_key)
+        except Exception as e:
+            print(f"Cache unlock error: {e}")
+
+    async def _afresh(self, key: str, tags: Sequence[str]) -> Any:
+        entry = await self.aget(key, tags, bypass_l1=True)
+        if isinstance(entry, _Stamped) and entry.fresh_until > time.time():
+            return entry.value
+        return _MISSING
+
+    async def _astore(self, key: str, value: Any, ttl: int, stale_ttl: int, tags: Sequence[str]) -> None:
+        await self.aset(key, _Stamped(value, time.time() + ttl), ttl + stale_ttl, tags)
+
+    def _recompute(self, key: str, compute: Callable[[], Any], ttl: int, tags: Sequence[str],
+                   stale_ttl: int, lock_timeout: float, wait: bool) -> Any:
+        """
+        Recompute a key while holding its in-process and cross-worker lock
+        :return: the fresh value, or _MISSING when the lock was not obtained
+        """
+        local_lock = self._key_lock(key, threading.Lock, self._key_locks)
+        acquired = local_lock.acquire(timeout=lock_timeout) if wait else local_lock.acquire(blocking=False)
+        if not acquired:
+            return _MISSING
+        try:
+            deadline = time.monotonic() + lock_timeout
+            while True:
+                # Another thread or worker may have refreshed it meanwhile
+                value = self._fresh(key, tags)
+                if value is not _MISSING:
+                    return value
+                token = self._acquire_shared_lock(key, lock_timeout)
+                if token is not None:
+                    break
+                if not wait or time.monotonic() >= deadline:
+                    return _MISSING
+                time.sleep(LOCK_POLL_SECONDS)
+
+            try:
+                value = self._fresh(key, tags)
+                if value is _MISSING:
+                    value = compute()
+                    self._store(key, value, ttl, stale_ttl, tags)
+                return value
+            finally:
+                self._release_shared_lock(key, token)
+        finally:
+            local_lock.release()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: int = 300,
+                       tags: Sequence[str] = (), stale_ttl: int = 0, lock_timeout: float = 10) -> Any:
+        """
+        Cached value of a key, computed by a single caller at a time.
+        Within stale_ttl seconds after expiry the old value keeps being served
+        while one caller recomputes it.
+        :param lock_timeout: longest wait for another caller's recomputation, also
+                             the lifetime of the cross-worker lock
+        """
+        entry = self.get(key, tags)
+        if isinstance(entry, _Stamped):
+            if entry.fresh_until > time.time():
+                return entry.value
+            value = self._recompute(key, compute, ttl, tags, stale_ttl, lock_timeout, wait=False)
+            return entry.value if value is _MISSING else value
+
+        value = self._recompute(key, compute, ttl, tags, stale_ttl, lock_timeout, wait=True)
+        if value is _MISSING:
+            # Gave up waiting for the other caller
+            value = compute()
+            self._store(key, value, ttl, stale_ttl, tags)
+        return value
+
+    async def _arecompute(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: int,
+                          tags: Sequence[str], stale_ttl: int, lock_timeout: float, wait: bool) -> Any:
+        """Coroutine counterpart of _recompute"""
+        local_lock = self._key_lock(key, asyncio.Lock, self._async_key_locks)
+        if not wait and local_lock.locked():
+            return _MISSING
+        try:
+            await asyncio.wait_for(local_lock.acquire(), timeout=lock_timeout)
+        except asyncio.TimeoutError:
+            return _MISSING
+        try:
+            deadline = time.monotonic() + lock_timeout
+            while True:
+                value = await self._afresh(key, tags)
+                if value is not _MISSING:
+                    return value
+                token = await self._aacquire_shared_lock(key, lock_timeout)
+                if token is not None:
+                    break
+                if not wait or time.monotonic() >= deadline:
+                    return _MISSING
+                await asyncio.sleep(LOCK_POLL_SECONDS)
+
+            try:
+                value = await self._afresh(key, tags)
+                if value is _MISSING:
+                    value = await compute()
+                    await self._astore(key, value, ttl, stale_ttl, tags)
+                return value
+            finally:
+                await self._arelease_shared_lock(key, token)
+        finally:
+            local_lock.release()
+
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: int = 300,
+                              tags: Sequence[str] = (), stale_ttl: int = 0, lock_timeout: float = 10) -> Any:
+        """Coroutine counterpart of get_or_compute; never blocks the event loop on Redis"""
+        entry = await self.aget(key, tags)
+        if isinstance(entry, _Stamped):
+            if entry.fresh_until > time.time():
+                return entry.value
+            value = await self._arecompute(key, compute, ttl, tags, stale_ttl, lock_timeout, wait=False)
+            return entry.value if value is _MISSING else value
+
+        value = await self._arecompute(key, compute, ttl, tags, stale_ttl, lock_timeout, wait=True)
+        if value is _MISSING:
+            value = await compute()
+            await self._astore(key, value, ttl, stale_ttl, tags)
+        return value
+
+    def _publish_invalidation(self, keys: Sequence[str] = (), pattern: Optional[str] = None) -> None:
+        """Tell the other workers to drop these keys from their L1"""
+        if not self.l1_ttl:
+            return
+        message = {"origin": self.instance_id, "keys": list(keys), "pattern": pattern}
+        self.redis_client.publish(INVALIDATION_CHANNEL, json.dumps(message))
+
+    async def _apublish_invalidation(self, keys: Sequence[str] = (), pattern: Optional[str] = None) -> None:
+        if not self.l1_ttl:
+            return
+        message = {"origin": self.instance_id, "keys": list(keys), "pattern": pattern}
+        await self.async_redis_client.publish(INVALIDATION_CHANNEL, json.dumps(message))
+
+    def handle_invalidation(self, data: Any) -> None:
+        """Apply an invalidation message received from another worker"""
+        message = json.loads(data)
+        if message.get("origin") == self.instance_id:
+            return
+        for key in message.get("keys") or ():
+            self.local.delete(key)
+        if message.get("pattern"):
+            self.local.delete_matching(message["pattern"])
+
+    def start_listener(self) -> None:
+        """Subscribe to the invalidation channel in a daemon thread"""
+        if self._listener is not None:
+            return
+        self._listener_stopped.clear()
+        self._listener = threading.Thread(target=self._listen, name="cache-invalidation-listener", daemon=True)
+        self._listener.start()
+
+    def stop_listener(self) -> None:
+        self._listener_stopped.set()
+        if self._listener is not None:
+            self._listener.join(timeout=5)
+            self._listener = None
+
+    def _listen(self) -> None:
+        while not self._listener_stopped.is_set():
+            pubsub = None
+            try:
+                pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Messages may have been missed while (re)connecting
+                self.local.clear()
+                while not self._listener_stopped.is_set():
+                    message = pubsub.get_message(timeout=LISTENER_RETRY_SECONDS)
+                    if message and message.get("type") == "message":
+                        self.handle_invalidation(message["data"])
+            except Exception as e:
+                print(f"Cache invalidation listener error: {e}")
+                self._listener_stopped.wait(LISTENER_RETRY_SECONDS)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend in use and counters of the in-process cache"""
+        return {
+            "backend": "redis" if self.redis_client else "memory",
+            "l1_enabled": self._use_l1,
+            "invalidation_listener": self._listener is not None and self._listener.is_alive(),
+            "local": self.local.stats(),
+        }
+
 
 # Global cache instance
-cache = CacheManager()
+cache = CacheManager(
+    conf.redis_url,
+    max_entries=conf.cache_max_entries,
+    max_bytes=conf.cache_max_bytes,
+    l1_ttl=conf.cache_l1_ttl or None,
+    codec=CacheCodec(
+        use_msgpack=conf.cache_codec == "msgpack",
+        compress_threshold=conf.cache_compress_threshold or None
+    )
+)
 
 
-def cached(ttl: int = 300, key_prefix: Optional[str] = None):
-    """Cache decorator for functions"""
+def cached(ttl: int = 300, key_prefix: Optional[str] = None, tags: Sequence[str] = (),
+           stale_ttl: int = 0, lock_timeout: float = 10):
+    """
+    Cache decorator for functions
+    Concurrent misses of the same key are computed once (per key lock in-process
+    and in Redis); the others wait for that result.
+    tags: invalidation tags for the cached results, see CacheManager.invalidate_tags
+    stale_ttl: seconds after expiry during which the old result is still served
+               while a single caller recomputes it
+    """
 
     def decorator(func: Callable):
+        prefix = key_prefix or f"{func.__module__}.{func.__name__}"
+        signature = inspect.signature(func)
+
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
-            # Generate cache key
-            prefix = key_prefix or f"{func.__module__}.{func.__name__}"
-            cache_key = cache._generate_key(prefix, *args, **kwargs)
+            # Generate cache key (database sessions are not part of it)
+            cache_key = build_key(prefix, args, kwargs, signature)
 
-            # Try to get from cache
-            cached_result = cache.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            cache.set(cache_key, result, ttl)
-            return result
+            return await cache.aget_or_compute(
+                cache_key, lambda: func(*args, **kwargs), ttl, tags, stale_ttl, lock_timeout
+            )
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            # Generate cache key
-            prefix = key_prefix or f"{func.__module__}.{func.__name__}"
-            cache_key = cache._generate_key(prefix, *args, **kwargs)
-
-            # Try to get from cache
-            cached_result = cache.get(cache_key)
-            if cached_result is not None:
-                return cached_result
+            # Generate cache key (database sessions are not part of it)
+            cache_key = build_key(prefix, args, kwargs, signature)
 
-            # Execute function and cache result
-            result = func(*args, **kwargs)
-            cache.set(cache_key, result, ttl)
-            return result
+            return cache.get_or_compute(
+                cache_key, lambda: func(*args, **kwargs), ttl, tags, stale_ttl, lock_timeout
+            )
 
         return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
 
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,176 @@
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, NamedTuple, Optional
+
+# Containers nested deeper than this are not walked when estimating sizes
+SIZE_DEPTH_LIMIT = 4
+
+
+class _Entry(NamedTuple):
+    value: Any
+    expires: float
+    size: int
+
+
+def approximate_size(value: Any, depth: int = 0) -> int:
+    """
+    Rough memory footprint of a value in bytes.
+    Walks lists, tuples, sets and dicts a few levels deep; good enough for a budget,
+    not meant to be exact.
+    """
+    size = sys.getsizeof(value)
+    if depth >= SIZE_DEPTH_LIMIT:
+        return size
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += approximate_size(key, depth + 1) + approximate_size(item, depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += approximate_size(item, depth + 1)
+    return size
+
+
+class MemoryCache:
+    """
+    Bounded in-process cache with per-entry TTL and LRU eviction.
+
+    Holds at most `max_entries` entries and roughly `max_bytes` bytes of values;
+    the least recently used entries are evicted first. Expired entries are
+    dropped on read and by a background sweeper every `sweep_interval` seconds.
+    Used as the fallback when Redis is unavailable and as the L1 tier in front
+    of Redis.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024,
+                 sweep_interval: Optional[float] = 60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _start_sweeper(self) -> None:
+        """Start the expiry sweeper on first write (no thread for an unused cache)"""
+        if self._sweeper is not None or not self.sweep_interval:
+            return
+        # The thread only holds a weak reference, so a discarded cache is collected
+        self._sweeper = threading.Thread(
+            target=_sweep_loop, args=(weakref.ref(self), self.sweep_interval, self._stopped),
+            name="memory-cache-sweeper", daemon=True
+        )
+        self._sweeper.start()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, ttl: float) -> bool:
+        size = approximate_size(value)
+        if size > self.max_bytes:
+            # Never leave the value this one was meant to replace behind
+            self.delete(key)
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, time.monotonic() + ttl, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+        self._start_sweeper()
+        return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                return True
+        return False
+
+    def delete_matching(self, pattern: str) -> int:
+        """Delete keys matching a glob pattern"""
+        with self._lock:
+            keys = [key for key in self._entries if fnmatchcase(key, pattern)]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def sweep(self) -> int:
+        """Drop every expired entry; returns how many were dropped"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry.expires <= now]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def stop(self) -> None:
+        """Stop the background sweeper"""
+        self._stopped.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _sweep_loop(cache_ref: "weakref.ref[MemoryCache]", interval: float, stopped: threading.Event) -> None:
+    while not stopped.wait(interval):
+        cache = cache_ref()
+        if cache is None:
+            return
+        cache.sweep()
+        del cache
@@ -0,0 +1,67 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+# Page size limits shared by the list routes
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor holding the keyset values of the last row of a page"""
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Keyset values of a cursor; 400 when it was not produced by encode_cursor"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = [_decode_value(value) for value in json.loads(payload)]
+    except (binascii.Error, ValueError, TypeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+    return values
+
+
+def keyset_after(columns: Sequence[Any], values: Sequence[Any], descending: bool = False):
+    """
+    Filter for the rows that come after `values` in (columns...) order:
+    (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+    """
+    conditions = []
+    for position, column in enumerate(columns):
+        beyond = column < values[position] if descending else column > values[position]
+        equal_prefix = [columns[i] == values[i] for i in range(position)]
+        conditions.append(and_(*equal_prefix, beyond) if equal_prefix else beyond)
+    return or_(*conditions)
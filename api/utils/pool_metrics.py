@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Type
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+# Number of recent checkout latencies kept for percentiles
+LATENCY_WINDOW = 1000
+
+
+class PoolMetrics:
+    """
+    Connection pool telemetry: checkout latency, overflow use, timeouts and
+    connection churn. Engines opt in by using `pool_class` as their poolclass.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._pool_class: Optional[Type[QueuePool]] = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latencies.clear()
+            self.checkouts = 0
+            self.checkout_seconds_total = 0.0
+            self.checkout_seconds_max = 0.0
+            self.overflow_checkouts = 0
+            self.timeouts = 0
+            self.connections_created = 0
+            self.connections_invalidated = 0
+
+    @property
+    def pool_class(self) -> Type[QueuePool]:
+        """QueuePool subclass reporting into this instance"""
+        if self._pool_class is None:
+            metrics = self
+
+            class InstrumentedQueuePool(QueuePool):
+                def _do_get(self):
+                    started = time.perf_counter()
+                    try:
+                        connection = super()._do_get()
+                    except PoolTimeoutError:
+                        metrics.record_timeout()
+                        raise
+                    metrics.record_checkout(time.perf_counter() - started, self.checkedout() > self.size())
+                    return connection
+
+            event.listen(InstrumentedQueuePool, "connect", lambda *args: metrics.record_connect())
+            event.listen(InstrumentedQueuePool, "invalidate", lambda *args: metrics.record_invalidate())
+            self._pool_class = InstrumentedQueuePool
+        return self._pool_class
+
+    def record_checkout(self, seconds: float, overflow: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds_total += seconds
+            self.checkout_seconds_max = max(self.checkout_seconds_max, seconds)
+            self._latencies.append(seconds)
+            if overflow:
+                self.overflow_checkouts += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connections_created += 1
+
+    def record_invalidate(self) -> None:
+        with self._lock:
+            self.connections_invalidated += 1
+
+    def snapshot(self, pool: Optional[Pool] = None) -> Dict:
+        """
+        Counters so far plus, when given, the live state of a pool
+        :param pool: e.g. engine.pool
+        :return:
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            result = {
+                "checkouts": self.checkouts,
+                "checkout_ms_avg": round(self.checkout_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "checkout_ms_p95": round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000, 3) if latencies else 0.0,
+                "checkout_ms_max": round(self.checkout_seconds_max * 1000, 3),
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "connections_created": self.connections_created,
+                "connections_invalidated": self.connections_invalidated,
+            }
+
+        if isinstance(pool, QueuePool):
+            result.update({
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return result
+
+
+# Global pool metrics instance
+pool_metrics = PoolMetrics()
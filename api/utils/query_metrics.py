@@ -0,0 +1,165 @@
+import logging
+import re
+import time
+from contextvars import ContextVar, Token
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from ..dependencies.config import conf
+
+logger = logging.getLogger(__name__)
+
+# Statements logged or sent in headers are cut to this many characters
+STATEMENT_PREVIEW_LENGTH = 300
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_preview(statement: str) -> str:
+    """Statement on a single line and bounded in length"""
+    text = _WHITESPACE.sub(" ", statement).strip()
+    return text if len(text) <= STATEMENT_PREVIEW_LENGTH else text[:STATEMENT_PREVIEW_LENGTH - 3] + "..."
+
+
+class RequestQueryStats:
+    """Queries issued while serving one request"""
+    __slots__ = ("count", "total_seconds", "slowest_seconds", "slowest_statement", "slow_count")
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.slow_count = 0
+
+    def record(self, statement: str, seconds: float, slow: bool) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if slow:
+            self.slow_count += 1
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def as_dict(self) -> Dict:
+        return {
+            "queries": self.count,
+            "db_ms": round(self.total_seconds * 1000, 3),
+            "slowest_ms": round(self.slowest_seconds * 1000, 3),
+            "slow_queries": self.slow_count,
+            "slowest_statement": statement_preview(self.slowest_statement) if self.slowest_statement else None,
+        }
+
+
+class QueryMetrics:
+    """
+    Per-request SQL counters. Cursor events of every engine feed the stats of the
+    request being served (found through a context variable, so threadpool and
+    run_sync work is attributed correctly); statements outside a request only
+    cost the context variable lookup.
+    """
+
+    def __init__(self, slow_query_ms: float = 200.0):
+        self.slow_query_ms = slow_query_ms
+        self._current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+        self._installed = False
+
+    def install(self) -> None:
+        """Listen to the cursor events of all engines, including ones created later"""
+        if not self._installed:
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self._installed = True
+
+    def uninstall(self) -> None:
+        if self._installed:
+            event.remove(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self._installed = False
+
+    def begin(self) -> Tuple[RequestQueryStats, Token]:
+        """Start collecting for the current context: the stats being filled and the token for end()"""
+        stats = RequestQueryStats()
+        return stats, self._current.set(stats)
+
+    def end(self, token: Token) -> None:
+        self._current.reset(token)
+
+    def current(self) -> Optional[RequestQueryStats]:
+        return self._current.get()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None and self._current.get() is not None:
+            context._query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        stats = self._current.get()
+        if started is None or stats is None:
+            return
+        seconds = time.perf_counter() - started
+        slow = seconds * 1000 >= self.slow_query_ms
+        stats.record(statement, seconds, slow)
+        if slow:
+            logger.warning(
+                f"Slow query ({seconds * 1000:.1f} ms): {statement_preview(statement)}",
+                extra={"db_query_ms": round(seconds * 1000, 3), "db_statement": statement_preview(statement)}
+            )
+
+
+class QueryMetricsMiddleware:
+    """
+    ASGI middleware adding each request's query count, DB time and slowest query
+    to the response headers and to one log line per request. Streamed bodies may
+    keep querying after the headers went out; the log line covers the whole stream.
+    """
+
+    def __init__(self, app, metrics: QueryMetrics, expose_sql: bool = False):
+        self.app = app
+        self.metrics = metrics
+        # The slowest statement only goes into a header when asked for, it reveals the schema
+        self.expose_sql = expose_sql
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = self.metrics.begin()
+        started = time.perf_counter()
+        response_status = None
+
+        async def send_with_headers(message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Time-Ms"] = f"{stats.total_seconds * 1000:.3f}"
+                headers["X-DB-Slowest-Ms"] = f"{stats.slowest_seconds * 1000:.3f}"
+                if self.expose_sql and stats.slowest_statement:
+                    headers["X-DB-Slowest-Query"] = statement_preview(stats.slowest_statement)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            self.metrics.end(token)
+            summary = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": response_status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                **stats.as_dict(),
+            }
+            level = logging.WARNING if stats.slow_count else logging.INFO
+            logger.log(
+                level,
+                " ".join(f"{key}={value}" for key, value in summary.items() if key != "slowest_statement"),
+                extra={"db_stats": summary}
+            )
+
+
+# Global query metrics instance
+query_metrics = QueryMetrics(slow_query_ms=conf.slow_query_ms)
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..models.menu_item_ingredients import MenuItemIngredient
+
+# (resource_id, amount per serving)
+RecipeEntry = Tuple[int, int]
+
+
+class RecipeIndex:
+    """
+    In-process index of menu item recipes: menu_item_id -> ((resource_id, amount), ...)
+
+    Built once from menu_item_ingredients and kept current by the ingredient
+    controller, so requirement calculations for a basket need no DB reads.
+    Every change bumps `version`. The whole index is also rebuilt after
+    `max_age` seconds so that workers which did not perform a change converge.
+    """
+
+    def __init__(self, max_age: int = 300):
+        self.max_age = max_age
+        self.version = 0
+        self._recipes: Dict[int, Tuple[RecipeEntry, ...]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age
+
+    @staticmethod
+    def _load(db: Session, menu_item_ids: Optional[Iterable[int]] = None) -> Dict[int, Tuple[RecipeEntry, ...]]:
+        query = db.query(
+            MenuItemIngredient.menu_item_id,
+            MenuItemIngredient.resource_id,
+            MenuItemIngredient.amount
+        )
+        if menu_item_ids is not None:
+            query = query.filter(MenuItemIngredient.menu_item_id.in_(list(menu_item_ids)))
+
+        recipes = defaultdict(list)
+        for menu_item_id, resource_id, amount in query.order_by(MenuItemIngredient.id):
+            recipes[menu_item_id].append((resource_id, amount))
+        return {menu_item_id: tuple(entries) for menu_item_id, entries in recipes.items()}
+
+    def rebuild(self, db: Session) -> None:
+        """Reload every recipe from the database"""
+        recipes = self._load(db)
+        with self._lock:
+            self._recipes = recipes
+            self._loaded_at = time.monotonic()
+            self.version += 1
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._is_stale():
+            self.rebuild(db)
+
+    def refresh_items(self, db: Session, menu_item_ids: Iterable[int]) -> None:
+        """Reload the recipes of the given menu items only"""
+        menu_item_ids = {menu_item_id for menu_item_id in menu_item_ids if menu_item_id is not None}
+        if not menu_item_ids or self._loaded_at is None:
+            return
+
+        loaded = self._load(db, menu_item_ids)
+        with self._lock:
+            # Copy-on-write so concurrent readers always see a complete index
+            recipes = dict(self._recipes)
+            for menu_item_id in menu_item_ids:
+                if menu_item_id in loaded:
+                    recipes[menu_item_id] = loaded[menu_item_id]
+                else:
+                    recipes.pop(menu_item_id, None)
+            self._recipes = recipes
+            self.version += 1
+
+    def discard(self, menu_item_id: int) -> None:
+        """Drop a menu item, e.g. after it was deleted"""
+        with self._lock:
+            if menu_item_id in self._recipes:
+                recipes = dict(self._recipes)
+                del recipes[menu_item_id]
+                self._recipes = recipes
+                self.version += 1
+
+    def clear(self) -> None:
+        """Forget everything; the next lookup rebuilds from the database"""
+        with self._lock:
+            self._recipes = {}
+            self._loaded_at = None
+            self.version += 1
+
+    def get(self, db: Session, menu_item_id: int) -> Tuple[RecipeEntry, ...]:
+        """Recipe of a single menu item (empty when it has no ingredients)"""
+        self.ensure_loaded(db)
+        return self._recipes.get(menu_item_id, ())
+
+    def requirements(self, db: Session, quantities: Dict[int, int]) -> Dict[int, int]:
+        """
+        Total demand per resource for a basket
+        :param db:
+        :param quantities: {menu_item_id: quantity}
+        :return: {resource_id: amount needed}
+        """
+        self.ensure_loaded(db)
+        recipes = self._recipes
+
+        demand = defaultdict(int)
+        for menu_item_id, quantity in quantities.items():
+            for resource_id, amount in recipes.get(menu_item_id, ()):
+                demand[resource_id] += amount * quantity
+        return dict(demand)
+
+
+# Global recipe index instance
+recipe_index = RecipeIndex()
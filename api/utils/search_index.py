@@ -0,0 +1,180 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..models.menu_items import MenuItem
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Relevance weights
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+PREFIX_FACTOR = 0.5  # a prefix match counts half as much as a whole-word match
+
+
+class _Document(NamedTuple):
+    name: str
+    description: Optional[str]
+    is_available: bool
+
+
+class _Snapshot(NamedTuple):
+    documents: Dict[int, _Document]
+    postings: Dict[str, Dict[int, float]]
+    vocabulary: List[str]
+
+
+_EMPTY = _Snapshot({}, {}, [])
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-case alphanumeric tokens of a text"""
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class MenuSearchIndex:
+    """
+    In-process inverted index over menu item names and descriptions.
+
+    Every query token must match a word of the item either exactly or as a
+    prefix; matches in the name weigh more than matches in the description.
+    Built lazily from the database, refreshed per item by the menu item
+    controller and fully rebuilt after `max_age` seconds so that other
+    workers converge: a change made through another worker can be missing
+    from this index for up to `max_age` seconds.
+    """
+
+    def __init__(self, max_age: int = 300):
+        self.max_age = max_age
+        self.version = 0
+        self._snapshot = _EMPTY
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def _is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age
+
+    @staticmethod
+    def _load(db: Session, menu_item_ids: Optional[Iterable[int]] = None) -> Dict[int, _Document]:
+        query = db.query(MenuItem.id, MenuItem.name, MenuItem.description, MenuItem.is_available)
+        if menu_item_ids is not None:
+            query = query.filter(MenuItem.id.in_(list(menu_item_ids)))
+        return {
+            item_id: _Document(name, description, bool(is_available))
+            for item_id, name, description, is_available in query
+        }
+
+    def _publish(self, documents: Dict[int, _Document]) -> None:
+        """Derive postings and vocabulary from documents and swap them in"""
+        postings = defaultdict(dict)
+        for item_id, document in documents.items():
+            for weight, text in ((DESCRIPTION_WEIGHT, document.description), (NAME_WEIGHT, document.name)):
+                for token in tokenize(text):
+                    postings[token][item_id] = max(postings[token].get(item_id, 0.0), weight)
+
+        # Readers grab the snapshot once, so they never see a half-updated index
+        with self._lock:
+            self._snapshot = _Snapshot(documents, dict(postings), sorted(postings))
+            self.version += 1
+
+    def rebuild(self, db: Session) -> None:
+        """Reload every menu item from the database"""
+        self._publish(self._load(db))
+        self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._is_stale():
+            self.rebuild(db)
+
+    def refresh_items(self, db: Session, menu_item_ids: Iterable[int]) -> None:
+        """Reload the given menu items only (deleted items are dropped)"""
+        menu_item_ids = set(menu_item_ids)
+        if not menu_item_ids or self._loaded_at is None:
+            return
+
+        loaded = self._load(db, menu_item_ids)
+        with self._lock:
+            documents = dict(self._snapshot.documents)
+            for item_id in menu_item_ids:
+                if item_id in loaded:
+                    documents[item_id] = loaded[item_id]
+                else:
+                    documents.pop(item_id, None)
+            self._publish(documents)
+
+    def clear(self) -> None:
+        """Forget everything; the next lookup rebuilds from the database"""
+        with self._lock:
+            self._snapshot = _EMPTY
+            self._loaded_at = None
+            self.version += 1
+
+    @staticmethod
+    def _match_token(snapshot: _Snapshot, token: str) -> Dict[int, float]:
+        """Scores of items matching a single query token exactly or by prefix"""
+        postings, vocabulary = snapshot.postings, snapshot.vocabulary
+        scores = dict(postings.get(token, {}))
+
+        position = bisect_left(vocabulary, token)
+        while position < len(vocabulary) and vocabulary[position].startswith(token):
+            term = vocabulary[position]
+            if term != token:
+                for item_id, weight in postings[term].items():
+                    scores[item_id] = max(scores.get(item_id, 0.0), weight * PREFIX_FACTOR)
+            position += 1
+        return scores
+
+    def _rank(self, db: Session, text: str, available_only: bool,
+              limit: Optional[int]) -> Tuple[_Snapshot, List[Tuple[int, float]]]:
+        self.ensure_loaded(db)
+        snapshot = self._snapshot
+
+        scores: Optional[Dict[int, float]] = None
+        for token in dict.fromkeys(tokenize(text)):
+            token_scores = self._match_token(snapshot, token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    item_id: score + token_scores[item_id]
+                    for item_id, score in scores.items()
+                    if item_id in token_scores
+                }
+            if not scores:
+                return snapshot, []
+
+        if scores is None:
+            return snapshot, []
+
+        documents = snapshot.documents
+        ranked = sorted(
+            (
+                (item_id, score) for item_id, score in scores.items()
+                if not available_only or documents[item_id].is_available
+            ),
+            key=lambda match: (-match[1], documents[match[0]].name)
+        )
+        return snapshot, ranked[:limit] if limit else ranked
+
+    def search(self, db: Session, text: str, available_only: bool = False,
+               limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Rank menu items against a search text
+        :return: [(menu_item_id, score), ...] best match first
+        """
+        return self._rank(db, text, available_only, limit)[1]
+
+    def suggest(self, db: Session, prefix: str, limit: int = 10) -> List[Dict]:
+        """Typeahead suggestions for available menu items, answered from memory"""
+        snapshot, ranked = self._rank(db, prefix, True, limit)
+        return [
+            {"id": item_id, "name": snapshot.documents[item_id].name}
+            for item_id, _ in ranked
+        ]
+
+
+# Global menu search index instance
+menu_search_index = MenuSearchIndex()
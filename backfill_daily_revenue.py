@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Rebuild the daily_revenue rollup from the orders table.
+
+Run once after creating the table on an existing database, and after orders
+were loaded or changed outside the API (LOAD DATA, manual SQL). Without dates
+every day is rebuilt.
+
+    python backfill_daily_revenue.py
+    python backfill_daily_revenue.py --start 2024-01-01 --end 2024-01-31
+"""
+
+import argparse
+from datetime import date
+from typing import List, Optional
+
+from api.dependencies.database import Base, SessionLocal, engine
+from api.models import model_loader  # noqa: F401, configures every model
+from api.services.revenue_services import RevenueService
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=date.fromisoformat, help="first day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+    if args.start and args.end and args.start > args.end:
+        parser.error("--start must be before or equal to --end")
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        rows = RevenueService.backfill(db, args.start, args.end)
+    finally:
+        db.close()
+    print(f"✅ Rebuilt daily_revenue: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the ordering hot paths.
+
+Seeds a dataset with SampleDataGenerator, drives the key endpoints concurrently
+and writes latency percentiles, queries per request and throughput to a JSON
+file. Pass an earlier result as --baseline to compare: the exit code is 1 when
+an endpoint got slower than the tolerance allows or issues more queries.
+
+The warmup requests fill the result cache, so by default the cached endpoints
+(menu_search, menu_performance) are measured warm. --cold-cache invalidates the
+cache before every request to measure the queries behind them instead; the
+report's meta records which of the two a run used. Concurrent requests can still
+reuse each other's results, so pair it with --concurrency 1 for per-request costs.
+
+    python benchmark.py --scale 5 --output baseline.json
+    python benchmark.py --scale 5 --baseline baseline.json --output current.json
+    python benchmark.py --skip-seed --cold-cache --concurrency 1 --endpoints menu_search menu_performance
+
+Seeding drops and recreates every table. The database is ./benchmark.db unless
+--database-url names another one, never DATABASE_URL from the environment, and
+a non-SQLite database is only recreated with --recreate.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+DEFAULT_DATABASE_URL = "sqlite:///./benchmark.db"
+
+# Requests per endpoint that are sent before measuring
+WARMUP_REQUESTS = 5
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not values:
+        return 0.0
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def summarize(latencies: List[float], query_counts: List[int], errors: int, elapsed: float) -> Dict:
+    """
+    Statistics of one endpoint's run
+    :param latencies: seconds per successful request
+    :param query_counts: X-DB-Query-Count of each successful request
+    :param errors: requests answered with a non-2xx status
+    :param elapsed: wall time of the run in seconds
+    :return:
+    """
+    latencies = sorted(latencies)
+    requests = len(latencies) + errors
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        "queries_per_request": round(statistics.fmean(query_counts), 2) if query_counts else None,
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float) -> List[str]:
+    """
+    Regressions of `current` against `baseline`: p95 latency above the baseline
+    by more than `tolerance` (a fraction), more queries per request, or new errors
+    :return: one message per regression
+    """
+    regressions = []
+    for name, before in baseline.get("endpoints", {}).items():
+        after = current.get("endpoints", {}).get(name)
+        if after is None:
+            continue
+        if after["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} ms -> {after['p95_ms']} ms")
+        if (before["queries_per_request"] is not None and after["queries_per_request"] is not None
+                and after["queries_per_request"] > before["queries_per_request"]):
+            regressions.append(
+                f"{name}: queries per request {before['queries_per_request']} -> {after['queries_per_request']}"
+            )
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {after['errors']}")
+    return regressions
+
+
+def seed(scale: int, random_seed: int) -> None:
+    """Recreate the schema and fill it with SampleDataGenerator, `scale` times the default sizes"""
+    from faker import Faker
+    from api.dependencies.database import Base, SessionLocal, engine
+    from sample_data_generator import SampleDataGenerator
+
+    random.seed(random_seed)
+    Faker.seed(random_seed)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    db = SessionLocal()
+    try:
+        generator = SampleDataGenerator(db)
+        generator.generate_customers(50 * scale)
+        generator.generate_resources()
+        generator.generate_menu_items()
+        generator.generate_menu_item_ingredients()
+        generator.generate_promotions()
+        generator.generate_orders(100 * scale)
+        generator.generate_order_details()
+        generator.generate_payments()
+        generator.generate_reviews(200 * scale)
+    finally:
+        db.close()
+    print(f"Seeded with scale {scale}, random seed {random_seed}")
+
+
+def build_scenarios() -> Dict[str, Callable[[random.Random], Dict]]:
+    """Request factories per endpoint, drawing ids and tracking numbers from the seeded data"""
+    from api.dependencies.database import SessionLocal
+    from api.models import model_loader  # noqa: F401, configures every model
+    from api.models.menu_items import MenuItem
+    from api.models.orders import Order
+
+    db = SessionLocal()
+    try:
+        tracking_numbers = [number for (number,) in db.query(Order.tracking_number).limit(1000)]
+        menu_item_ids = [item_id for (item_id,) in db.query(MenuItem.id).filter(MenuItem.is_available == True)]
+    finally:
+        db.close()
+    if not tracking_numbers or not menu_item_ids:
+        raise SystemExit("No orders or menu items found; run without --skip-seed first")
+
+    today = date.today()
+    search_terms = ["chicken", "salad", "burger", "pasta", "vegan", "spicy"]
+
+    def guest_order(rng: random.Random) -> Dict:
+        return {
+            "method": "POST",
+            "url": "/customer_actions/orders/guest",
+            "json": {
+                "guest_info": {"guest_name": "Benchmark Guest", "guest_phone": "5550100100", "order_type": "takeout"},
+                "order_items": [
+                    {"menu_item_id": menu_item_id, "quantity": 1}
+                    for menu_item_id in rng.sample(menu_item_ids, min(2, len(menu_item_ids)))
+                ],
+            },
+        }
+
+    def track(rng: random.Random) -> Dict:
+        return {"method": "GET", "url": f"/customer_actions/orders/track/{rng.choice(tracking_numbers)}"}
+
+    def menu_search(rng: random.Random) -> Dict:
+        return {"method": "GET", "url": "/customer_actions/menu/search",
+                "params": {"search_term": rng.choice(search_terms), "sort_by": "relevance"}}
+
+    def menu_performance(rng: random.Random) -> Dict:
+        return {"method": "GET", "url": "/staff_actions/analytics/menu-performance",
+                "params": {"start_date": str(today - timedelta(days=30)), "end_date": str(today)}}
+
+    def date_range(rng: random.Random) -> Dict:
+        start = today - timedelta(days=rng.randint(1, 90))
+        return {"method": "GET", "url": "/staff_actions/orders/date-range",
+                "params": {"start_date": str(start), "end_date": str(min(start + timedelta(days=7), today))}}
+
+    return {
+        "guest_order": guest_order,
+        "track": track,
+        "menu_search": menu_search,
+        "menu_performance": menu_performance,
+        "date_range": date_range,
+    }
+
+
+def run_endpoint(client, make_request: Callable[[random.Random], Dict], requests: int,
+                 concurrency: int, random_seed: int, before_request: Optional[Callable[[], None]] = None) -> Dict:
+    """
+    Send `requests` requests from `concurrency` threads and summarize them
+    :param before_request: called before each request, outside the timed part
+    :return:
+    """
+    rng = random.Random(random_seed)
+    planned = [make_request(rng) for _ in range(requests + WARMUP_REQUESTS)]
+
+    def send(request: Dict):
+        if before_request is not None:
+            before_request()
+        started = time.perf_counter()
+        response = client.request(**request)
+        return time.perf_counter() - started, response
+
+    for request in planned[:WARMUP_REQUESTS]:
+        send(request)
+
+    latencies, query_counts, errors = [], [], 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for seconds, response in executor.map(send, planned[WARMUP_REQUESTS:]):
+            if response.is_success:
+                latencies.append(seconds)
+                if "X-DB-Query-Count" in response.headers:
+                    query_counts.append(int(response.headers["X-DB-Query-Count"]))
+            else:
+                errors += 1
+    return summarize(latencies, query_counts, errors, time.perf_counter() - started)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL,
+                        help="database to seed and, without --base-url, to serve from")
+    parser.add_argument("--base-url", help="benchmark a running server instead of an in-process TestClient "
+                             "(restart it after seeding so its search indexes see the new data)")
+    parser.add_argument("--scale", type=int, default=1, help="dataset size as a multiple of the generator defaults")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already in the database")
+    parser.add_argument("--recreate", action="store_true",
+                        help="allow seeding to drop every table of a non-SQLite --database-url")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--endpoints", nargs="+", help="subset of endpoints to run")
+    parser.add_argument("--cold-cache", action="store_true",
+                        help="invalidate the result cache before every request (in-process only); "
+                             "concurrent requests can still reuse each other's results")
+    parser.add_argument("--seed", type=int, default=42, help="random seed of the data and the requests")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="earlier result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 increase, as a fraction")
+    args = parser.parse_args(argv)
+    from sqlalchemy.engine import make_url
+
+    if not args.skip_seed and make_url(args.database_url).get_backend_name() != "sqlite" and not args.recreate:
+        parser.error(f"seeding drops every table of {make_url(args.database_url)!r}; "
+                     "pass --recreate to allow it or --skip-seed to reuse its data")
+    if args.cold_cache and args.base_url:
+        parser.error("--cold-cache needs the in-process client: a server's in-process cache tier cannot be cleared")
+
+    # The engine is created on import, so the URL has to be in place first
+    os.environ["DATABASE_URL"] = args.database_url
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    if not args.skip_seed:
+        seed(args.scale, args.seed)
+    scenarios = build_scenarios()
+    names = args.endpoints or list(scenarios)
+    unknown = set(names) - set(scenarios)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}; choose from {', '.join(scenarios)}")
+
+    if args.base_url:
+        import httpx
+        client_context = httpx.Client(base_url=args.base_url, timeout=60)
+    else:
+        from fastapi.testclient import TestClient
+        from api.main import app
+        client_context = TestClient(app)
+
+    before_request = None
+    if args.cold_cache:
+        from api.utils.caching import cache, ANALYTICS_CACHE_TAG, MENU_CACHE_TAG
+
+        def before_request():
+            cache.invalidate_tags(MENU_CACHE_TAG, ANALYTICS_CACHE_TAG)
+
+    results = {}
+    with client_context as client:
+        for index, name in enumerate(names):
+            results[name] = run_endpoint(client, scenarios[name], args.requests, args.concurrency, args.seed + index,
+                                         before_request)
+            stats = results[name]
+            print(f"{name:<18} p50 {stats['p50_ms']:>8} ms  p95 {stats['p95_ms']:>8} ms  p99 {stats['p99_ms']:>8} ms  "
+                  f"{stats['throughput_rps']:>8} req/s  queries {stats['queries_per_request']}  errors {stats['errors']}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "database": make_url(args.database_url).get_backend_name(),
+            "target": args.base_url or "in-process",
+            "scale": args.scale,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "cache": "cold" if args.cold_cache else "warm",
+            "python": platform.python_version(),
+        },
+        "endpoints": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        baseline_cache = baseline.get("meta", {}).get("cache", "warm")
+        if baseline_cache != report["meta"]["cache"]:
+            print(f"WARNING baseline ran with a {baseline_cache} cache, this run with a {report['meta']['cache']} one")
+        regressions = compare(baseline, report, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
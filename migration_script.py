@@ -28,6 +28,10 @@ def migrate_database():
                 # Add index for tracking number
                 "CREATE INDEX idx_orders_tracking_number ON orders(tracking_number)",
 
+                # Indexes for date-windowed analytics
+                "CREATE INDEX ix_orders_order_date ON orders(order_date)",
+                "CREATE INDEX ix_reviews_created_at ON reviews(created_at)",
+
                 # Update existing orders with tracking numbers
                 """UPDATE orders
                    SET tracking_number = CONCAT('ORD', LPAD(id, 6, '0'))
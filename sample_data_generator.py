@@ -4,12 +4,23 @@ Sample Data Generator for Restaurant Order System
 Generates realistic test data for all tables in the database
 """
 
+import argparse
+import csv
+import enum
+import hashlib
+import itertools
+import multiprocessing
+import os
 import random
 import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta, date
 from decimal import Decimal
-from typing import List, Dict
+from typing import Callable, List, Dict, NamedTuple, Optional, Tuple
 from faker import Faker
+from sqlalchemy import Table, create_engine, func, insert, select
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
 # Import all models
@@ -22,12 +33,47 @@ from api.models.order_details import OrderDetail
 from api.models.payments import Payment, PaymentType, PaymentStatus
 from api.models.promotions import Promotion
 from api.models.reviews import Reviews
-from api.dependencies.database import get_db, engine
+from api.dependencies.database import Base, get_db, engine, SQLALCHEMY_DATABASE_URL
 from api.models.model_loader import index
+from api.services.revenue_services import RevenueService
 
 # Initialize Faker
 fake = Faker()
 
+# Sample review texts by rating
+REVIEW_TEMPLATES = {
+    5: [
+        "Absolutely amazing! Best {} I've ever had.",
+        "Perfect! Will definitely order {} again.",
+        "Outstanding quality and taste. Highly recommend the {}.",
+        "Exceeded expectations! The {} was fantastic.",
+    ],
+    4: [
+        "Really good {}. Would order again.",
+        "Great taste, good portion size for the {}.",
+        "Very satisfied with the {}. Good value.",
+        "Solid choice. The {} was well prepared.",
+    ],
+    3: [
+        "The {} was okay, nothing special.",
+        "Average {}. Not bad but not great either.",
+        "Decent {} for the price.",
+        "The {} was fine, could be better.",
+    ],
+    2: [
+        "Disappointed with the {}. Expected better.",
+        "The {} was below average.",
+        "Not impressed with the {}. Bland taste.",
+        "The {} was cold when it arrived.",
+    ],
+    1: [
+        "Terrible {}. Waste of money.",
+        "The {} was awful. Very disappointed.",
+        "Poor quality {}. Will not order again.",
+        "The {} was inedible. Horrible experience.",
+    ]
+}
+
 
 class SampleDataGenerator:
     def __init__(self, db: Session):
@@ -350,6 +396,7 @@ class SampleDataGenerator:
 
         orders = self.db.query(Order).all()
         menu_items = self.db.query(MenuItem).filter(MenuItem.is_available == True).all()
+        discount_percents = {promotion.code: promotion.discount_percent for promotion in self.db.query(Promotion)}
 
         order_details = []
         for order in orders:
@@ -370,12 +417,8 @@ class SampleDataGenerator:
 
             # Update order totals
             discount = Decimal('0')
-            if order.promotion_code:
-                promotion = self.db.query(Promotion).filter(
-                    Promotion.code == order.promotion_code
-                ).first()
-                if promotion:
-                    discount = subtotal * (Decimal(str(promotion.discount_percent)) / 100)
+            if order.promotion_code in discount_percents:
+                discount = subtotal * (Decimal(str(discount_percents[order.promotion_code])) / 100)
 
             tax_rate = Decimal('0.07')  # 7% NC sales tax
             tax_amount = (subtotal - discount) * tax_rate
@@ -434,47 +477,13 @@ class SampleDataGenerator:
 
         menu_items = self.db.query(MenuItem).all()
 
-        # Sample review texts by rating
-        review_templates = {
-            5: [
-                "Absolutely amazing! Best {} I've ever had.",
-                "Perfect! Will definitely order {} again.",
-                "Outstanding quality and taste. Highly recommend the {}.",
-                "Exceeded expectations! The {} was fantastic.",
-            ],
-            4: [
-                "Really good {}. Would order again.",
-                "Great taste, good portion size for the {}.",
-                "Very satisfied with the {}. Good value.",
-                "Solid choice. The {} was well prepared.",
-            ],
-            3: [
-                "The {} was okay, nothing special.",
-                "Average {}. Not bad but not great either.",
-                "Decent {} for the price.",
-                "The {} was fine, could be better.",
-            ],
-            2: [
-                "Disappointed with the {}. Expected better.",
-                "The {} was below average.",
-                "Not impressed with the {}. Bland taste.",
-                "The {} was cold when it arrived.",
-            ],
-            1: [
-                "Terrible {}. Waste of money.",
-                "The {} was awful. Very disappointed.",
-                "Poor quality {}. Will not order again.",
-                "The {} was inedible. Horrible experience.",
-            ]
-        }
-
         reviews = []
         for _ in range(count):
             menu_item = random.choice(menu_items)
             rating = random.choices([1, 2, 3, 4, 5], weights=[5, 10, 25, 35, 25])[0]  # Weighted towards higher ratings
 
             # Generate review text
-            template = random.choice(review_templates[rating])
+            template = random.choice(REVIEW_TEMPLATES[rating])
             review_text = template.format(menu_item.name.lower())
 
             # Some reviews have no text
@@ -512,28 +521,582 @@ class SampleDataGenerator:
         }
 
         for table, count in counts.items():
-            print(f"{table:<25}: {count:>5}")
+            print(f"{table:<25}: {count:>12,}")
 
         print("=" * 50)
         print("🎉 All sample data generated successfully!")
 
 
-def main():
+# Rows per executemany round trip in bulk mode
+BULK_CHUNK_SIZE = 5000
+
+# Relative order volume per hour of the day: lunch and dinner rushes
+ORDER_HOUR_WEIGHTS = [0, 0, 0, 0, 0, 0, 0, 1, 2, 2, 3, 8, 12, 9, 4, 3, 4, 8, 12, 11, 7, 4, 2, 1]
+
+TAX_RATE = Decimal("0.07")  # 7% NC sales tax
+CENT = Decimal("0.01")
+
+# Distinct names, emails and addresses drawn from in bulk mode (Faker is too slow per row)
+FAKE_POOL_SIZE = 2000
+
+# Upper bound of lines per generated order; shards reserve this many detail ids per order
+MAX_LINES_PER_ORDER = 5
+
+# Load order of the bulk tables, parents first
+BULK_TABLES = [Customer.__table__, Order.__table__, OrderDetail.__table__, Payment.__table__, Reviews.__table__]
+
+
+class ProgressReporter:
+    """Prints done/total, rate and ETA of a long step, at most every `interval` seconds"""
+
+    def __init__(self, label: str, total: int, interval: float = 2.0, enabled: bool = True):
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.enabled = enabled
+        self.done = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+
+    def advance(self, count: int) -> None:
+        self.done += count
+        now = time.monotonic()
+        if self.enabled and now - self._last_report >= self.interval:
+            self._last_report = now
+            rate = self.done / (now - self.started)
+            eta = (self.total - self.done) / rate if rate else 0
+            print(f"   {self.label}: {self.done:,}/{self.total:,} ({self.done / self.total:.0%}) "
+                  f"{rate:,.0f} rows/s, ~{eta:.0f}s left")
+
+    def finish(self) -> None:
+        if self.enabled:
+            elapsed = time.monotonic() - self.started
+            print(f"✅ Created {self.done:,} {self.label} in {elapsed:.1f}s")
+
+
+class DatabaseSink:
+    """Writes bulk rows with Core insert() executemany, one transaction per call"""
+
+    def __init__(self, db_engine: Engine):
+        self.engine = db_engine
+
+    def write(self, batches: List[Tuple[Table, List[Dict]]]) -> None:
+        with self.engine.begin() as conn:
+            for table, rows in batches:
+                if rows:
+                    conn.execute(insert(table), rows)
+
+    def close(self) -> None:
+        pass
+
+
+class CsvSink:
+    """
+    Writes bulk rows to one CSV file per table, formatted for MySQL's LOAD DATA
+    (see write_load_data_script): unquoted NULL, enums by name, header line first
+    """
+
+    def __init__(self, directory: str, suffix: str = ""):
+        self.directory = directory
+        self.suffix = suffix
+        self.paths: Dict[str, str] = {}
+        self._files = {}
+        self._writers = {}
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _format(value):
+        if value is None:
+            return "NULL"
+        if isinstance(value, enum.Enum):
+            return value.name
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, datetime):
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+        return value
+
+    def write(self, batches: List[Tuple[Table, List[Dict]]]) -> None:
+        for table, rows in batches:
+            if not rows:
+                continue
+            writer = self._writers.get(table.name)
+            if writer is None:
+                path = os.path.join(self.directory, f"{table.name}{self.suffix}.csv")
+                self._files[table.name] = open(path, "w", newline="", encoding="utf-8")
+                writer = self._writers[table.name] = csv.writer(self._files[table.name], lineterminator="\n")
+                writer.writerow(rows[0].keys())
+                self.paths[table.name] = path
+            writer.writerows([self._format(value) for value in row.values()] for row in rows)
+
+    def close(self) -> None:
+        for file in self._files.values():
+            file.close()
+
+
+class BulkDataGenerator:
+    """
+    Generator for capacity-testing datasets of millions of orders. Rows are built
+    as plain dicts with explicit ids and written with Core insert() executemany,
+    one transaction per chunk; prices and promotions come from lookup maps built
+    once, and every random choice comes from one RNG seeded with `seed`, so the
+    same seed on an empty database gives the same data.
+    """
+
+    def __init__(self, db_engine: Engine = engine, seed: int = 42, chunk_size: int = BULK_CHUNK_SIZE,
+                 progress: bool = True, sink=None):
+        """
+        :param db_engine: database to read reference data and ids from
+        :param seed: seed of all random choices
+        :param chunk_size: rows per insert
+        :param progress: print progress reports
+        :param sink: where rows go, a DatabaseSink on db_engine by default (or a CsvSink)
+        """
+        self.engine = db_engine
+        self.sink = sink or DatabaseSink(db_engine)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.fake = Faker()
+        self.fake.seed_instance(seed)
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self._hour_weights = list(itertools.accumulate(ORDER_HOUR_WEIGHTS))
+        self._pool = None
+        self._lookups = None
+
+    def generate_all_data(self, customers: int = 10000, orders: int = 1000000, reviews: int = 100000,
+                          years: int = 2, end: Optional[datetime] = None):
+        """
+        Reference data when missing, then customers, orders (with lines and payments) and reviews
+        :param years: length of the order history
+        :param end: end of the history (now by default; fix it for reproducible dates)
+        """
+        print("🚀 Starting bulk data generation...")
+        index()
+        self.ensure_reference_data()
+        end = end or datetime.now()
+        start = end - timedelta(days=365 * years)
+        self.generate_customers(customers)
+        self.generate_orders(orders, start, end)
+        self.generate_reviews(reviews, start, end)
+        # Core inserts bypass the ORM hook that maintains daily_revenue
+        with Session(self.engine) as db:
+            RevenueService.backfill(db, start.date(), end.date())
+        print("✅ Bulk data generation completed!")
+
+    def ensure_reference_data(self):
+        """Resources, menu items, recipes and promotions from SampleDataGenerator, once"""
+        with Session(self.engine) as db:
+            if db.query(MenuItem.id).first() is not None:
+                return
+            # The small generator uses the module-level RNGs; seed them for the same reproducibility
+            random.seed(self.seed)
+            fake.seed_instance(self.seed)
+            generator = SampleDataGenerator(db)
+            generator.generate_resources()
+            generator.generate_menu_items()
+            generator.generate_menu_item_ingredients()
+            generator.generate_promotions()
+
+    def _fake_pool(self) -> Dict[str, List[str]]:
+        if self._pool is None:
+            self._pool = {
+                "names": [self.fake.name() for _ in range(FAKE_POOL_SIZE)],
+                "emails": [self.fake.email() for _ in range(FAKE_POOL_SIZE)],
+                "addresses": [self.fake.address().replace('\n', ', ')[:100] for _ in range(FAKE_POOL_SIZE)],
+            }
+        return self._pool
+
+    def load_lookups(self) -> Dict:
+        """Menu prices, promotion discounts and customer ids, read once per run"""
+        with self.engine.connect() as conn:
+            menu_rows = conn.execute(select(MenuItem.id, MenuItem.price, MenuItem.name, MenuItem.is_available)).all()
+            promotions = conn.execute(select(Promotion.code, Promotion.discount_percent)).all()
+            customer_ids = conn.execute(select(Customer.id)).scalars().all()
+        self._lookups = {
+            "prices": {item_id: Decimal(str(price)) for item_id, price, _, available in menu_rows if available},
+            "menu_names": {item_id: name for item_id, _, name, _ in menu_rows},
+            "discounts": {code: Decimal(percent) / 100 for code, percent in promotions},
+            "customer_ids": customer_ids,
+        }
+        self._lookups["available_ids"] = sorted(self._lookups["prices"])
+        self._lookups["promotion_codes"] = sorted(self._lookups["discounts"])
+        return self._lookups
+
+    def _next_id(self, model) -> int:
+        with self.engine.connect() as conn:
+            return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+    def _report(self, message: str) -> None:
+        if self.progress:
+            print(message)
+
+    def _insert_chunks(self, label: str, model, total: int, build_row: Callable[[int], Dict],
+                       first_id: Optional[int] = None):
+        """Write `total` rows of `model` with consecutive explicit ids from first_id (next free id by default)"""
+        progress = ProgressReporter(label, total, enabled=self.progress)
+        next_id = first_id or self._next_id(model)
+        for chunk_start in range(0, total, self.chunk_size):
+            rows = [build_row(next_id + offset) for offset in range(chunk_start, min(chunk_start + self.chunk_size, total))]
+            self.sink.write([(model.__table__, rows)])
+            progress.advance(len(rows))
+        progress.finish()
+
+    def generate_customers(self, count: int = 10000):
+        """Bulk-insert customers"""
+        self._report(f"👥 Generating {count:,} customers...")
+        pool = self._fake_pool()
+        area_codes = [919, 704, 828, 910, 252, 336, 984]  # NC area codes
+
+        def build_row(customer_id: int) -> Dict:
+            return {
+                "id": customer_id,
+                "customer_name": self.rng.choice(pool["names"]),
+                "customer_email": f"customer{customer_id}@example.com",
+                "customer_phone": f"{self.rng.choice(area_codes)}{self.rng.randint(200, 999)}{self.rng.randint(1000, 9999)}",
+                "customer_address": self.rng.choice(pool["addresses"]),
+            }
+
+        self._insert_chunks("customers", Customer, count, build_row)
+
+    def _order_date(self, start: datetime, days: int) -> datetime:
+        day = start + timedelta(days=self.rng.randrange(days + 1))
+        hour = self.rng.choices(range(24), cum_weights=self._hour_weights)[0]
+        return day.replace(hour=hour, minute=self.rng.randrange(60), second=self.rng.randrange(60), microsecond=0)
+
+    def _order_status(self, order_date: datetime, now: datetime) -> StatusType:
+        # Recent orders are still in the kitchen, older ones completed or cancelled
+        if now - order_date < timedelta(hours=2):
+            return self.rng.choice([StatusType.PENDING, StatusType.CONFIRMED, StatusType.IN_PROGRESS])
+        return StatusType.COMPLETED if self.rng.random() < 0.9 else StatusType.CANCELLED
+
+    def build_order(self, order_id: int, detail_id: int, payment_id: int, start: datetime, days: int,
+                    now: datetime) -> Tuple[Dict, List[Dict], Optional[Dict]]:
+        """
+        One order's rows: the order, its lines (ids from detail_id on) and, when it
+        was paid, its payment
+        :return: order row, detail rows, payment row or None
+        """
+        lookups = self._lookups
+        order_date = self._order_date(start, days)
+        order_status = self._order_status(order_date, now)
+        is_guest = self.rng.random() < 0.3 or not lookups["customer_ids"]
+
+        details, subtotal = [], Decimal("0")
+        menu_item_ids = self.rng.sample(lookups["available_ids"], min(self.rng.randint(1, MAX_LINES_PER_ORDER), len(lookups["available_ids"])))
+        for offset, menu_item_id in enumerate(menu_item_ids):
+            quantity = self.rng.randint(1, 3)
+            details.append({"id": detail_id + offset, "order_id": order_id, "menu_item_id": menu_item_id, "amount": quantity})
+            subtotal += lookups["prices"][menu_item_id] * quantity
+
+        promotion_code = None
+        discount = Decimal("0")
+        if lookups["promotion_codes"] and self.rng.random() < 0.2:
+            promotion_code = self.rng.choice(lookups["promotion_codes"])
+            discount = (subtotal * lookups["discounts"][promotion_code]).quantize(CENT)
+        tax_amount = ((subtotal - discount) * TAX_RATE).quantize(CENT)
+        total = subtotal - discount + tax_amount
+
+        order = {
+            "id": order_id,
+            "customer_id": None if is_guest else self.rng.choice(lookups["customer_ids"]),
+            "tracking_number": f"BLK{order_id:010d}",
+            "order_date": order_date,
+            "description": None,
+            "status": order_status,
+            "order_type": self.rng.choice(list(OrderType)),
+            "subtotal": subtotal,
+            "tax_amount": tax_amount,
+            "discount_amount": discount,
+            "total_amount": total,
+            "promotion_code": promotion_code,
+            "guest_name": self.rng.choice(self._pool["names"]) if is_guest else None,
+            "guest_phone": f"555{order_id % 10000000:07d}" if is_guest else None,
+            "guest_email": None,
+            "estimated_completion": order_date + timedelta(minutes=self.rng.randint(20, 60)),
+        }
+
+        payment = None
+        if order_status != StatusType.CANCELLED and order_status != StatusType.PENDING:
+            payment = {
+                "id": payment_id,
+                "order_id": order_id,
+                "payment_date": order_date + timedelta(minutes=self.rng.randint(1, 30)),
+                "amount": float(total),
+                "status": PaymentStatus.COMPLETED,
+                "payment_type": self.rng.choice(list(PaymentType)),
+            }
+        return order, details, payment
+
+    def generate_orders(self, count: int = 1000000, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                        first_ids: Optional[Tuple[int, int, int]] = None) -> Dict[str, int]:
+        """
+        Bulk-insert orders between start and end together with their lines and payments
+        :param first_ids: first order, detail and payment id (next free ids by default)
+        :return: rows written per table
+        """
+        self._report(f"📋 Generating {count:,} orders with details and payments...")
+        end = end or datetime.now()
+        start = start or end - timedelta(days=365)
+        days = max((end - start).days, 0)
+        self._fake_pool()
+        self.load_lookups()
+        if not self._lookups["available_ids"]:
+            raise ValueError("No available menu items to order")
+
+        order_id, detail_id, payment_id = first_ids or (
+            self._next_id(Order), self._next_id(OrderDetail), self._next_id(Payment)
+        )
+        progress = ProgressReporter("orders", count, enabled=self.progress)
+        line_count = payment_count = 0
+        for chunk_start in range(0, count, self.chunk_size):
+            orders, details, payments = [], [], []
+            for _ in range(min(self.chunk_size, count - chunk_start)):
+                order, order_details, payment = self.build_order(order_id, detail_id, payment_id, start, days, end)
+                orders.append(order)
+                details.extend(order_details)
+                order_id += 1
+                detail_id += len(order_details)
+                if payment:
+                    payments.append(payment)
+                    payment_id += 1
+
+            self.sink.write([(Order.__table__, orders), (OrderDetail.__table__, details), (Payment.__table__, payments)])
+            line_count += len(details)
+            payment_count += len(payments)
+            progress.advance(len(orders))
+        progress.finish()
+        self._report(f"   with {line_count:,} order details and {payment_count:,} payments")
+        return {"orders": count, "order_details": line_count, "payments": payment_count}
+
+    def generate_reviews(self, count: int = 100000, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                         first_id: Optional[int] = None):
+        """Bulk-insert reviews of random menu items, ids from first_id (next free id by default)"""
+        self._report(f"⭐ Generating {count:,} reviews...")
+        end = end or datetime.now()
+        start = start or end - timedelta(days=365)
+        seconds = max(int((end - start).total_seconds()), 0)
+        pool = self._fake_pool()
+        menu_names = (self._lookups or self.load_lookups())["menu_names"]
+        menu_item_ids = sorted(menu_names)
+
+        def build_row(review_id: int) -> Dict:
+            menu_item_id = self.rng.choice(menu_item_ids)
+            rating = self.rng.choices([1, 2, 3, 4, 5], weights=[5, 10, 25, 35, 25])[0]
+            review_text = None
+            if self.rng.random() >= 0.2:  # some reviews have no text
+                review_text = self.rng.choice(REVIEW_TEMPLATES[rating]).format(menu_names[menu_item_id].lower())
+            return {
+                "id": review_id,
+                "menu_item_id": menu_item_id,
+                "customer_name": self.rng.choice(pool["names"]),
+                "rating": rating,
+                "review_text": review_text,
+                "created_at": start + timedelta(seconds=self.rng.randrange(seconds + 1)),
+            }
+
+        self._insert_chunks("reviews", Reviews, count, build_row, first_id)
+
+
+class ShardPlan(NamedTuple):
+    """Work of one generator process: its seed, counts and the first id of each id range it owns"""
+    shard: int
+    seed: int
+    orders: int
+    order_id: int
+    detail_id: int
+    payment_id: int
+    reviews: int
+    review_id: int
+
+
+def shard_seed(seed: int, shard: int) -> int:
+    """Seed of one shard, derived from the run seed so shards never share a random stream"""
+    return int.from_bytes(hashlib.sha256(f"{seed}:{shard}".encode()).digest()[:8], "big")
+
+
+def _split(total: int, shards: int) -> List[int]:
+    return [total // shards + (1 if shard < total % shards else 0) for shard in range(shards)]
+
+
+def plan_shards(orders: int, reviews: int, shards: int, seed: int, first_order_id: int, first_detail_id: int,
+                first_payment_id: int, first_review_id: int) -> List[ShardPlan]:
+    """
+    Split the work into shards with disjoint id ranges: each shard owns as many
+    order and payment ids as it has orders, MAX_LINES_PER_ORDER detail ids per
+    order and as many review ids as reviews. The data depends only on the seed
+    and the number of shards, not on which process runs first.
+    """
+    plans = []
+    order_offset = review_offset = 0
+    for shard, (shard_orders, shard_reviews) in enumerate(zip(_split(orders, shards), _split(reviews, shards))):
+        plans.append(ShardPlan(
+            shard=shard,
+            seed=shard_seed(seed, shard),
+            orders=shard_orders,
+            order_id=first_order_id + order_offset,
+            detail_id=first_detail_id + order_offset * MAX_LINES_PER_ORDER,
+            payment_id=first_payment_id + order_offset,
+            reviews=shard_reviews,
+            review_id=first_review_id + review_offset,
+        ))
+        order_offset += shard_orders
+        review_offset += shard_reviews
+    return plans
+
+
+def _shard_engine(database_url: str) -> Engine:
+    # Shards write to SQLite concurrently; wait for the write lock instead of failing
+    connect_args = {"timeout": 300} if database_url.startswith("sqlite") else {}
+    return create_engine(database_url, connect_args=connect_args)
+
+
+def _run_shard(plan: ShardPlan, database_url: str, start: datetime, end: datetime, chunk_size: int,
+               csv_dir: Optional[str]) -> Dict:
+    """Process pool entry point: generate one shard into the database or its own CSV files"""
+    started = time.monotonic()
+    shard_engine = _shard_engine(database_url)
+    sink = CsvSink(csv_dir, suffix=f".shard{plan.shard:03d}") if csv_dir else DatabaseSink(shard_engine)
+    try:
+        generator = BulkDataGenerator(shard_engine, seed=plan.seed, chunk_size=chunk_size, progress=False, sink=sink)
+        counts = generator.generate_orders(plan.orders, start, end, (plan.order_id, plan.detail_id, plan.payment_id))
+        generator.generate_reviews(plan.reviews, start, end, plan.review_id)
+        counts["reviews"] = plan.reviews
+    finally:
+        sink.close()
+        shard_engine.dispose()
+    return {"shard": plan.shard, "seconds": time.monotonic() - started,
+            "files": getattr(sink, "paths", {}), **counts}
+
+
+def write_load_data_script(csv_dir: str, files: Dict[str, List[str]]) -> str:
+    """SQL script loading the shard CSV files with LOAD DATA, parent tables first"""
+    statements = []
+    for table in BULK_TABLES:
+        for path in sorted(files.get(table.name, [])):
+            with open(path, encoding="utf-8") as csv_file:
+                columns = next(csv.reader(csv_file))
+            statements.append(
+                f"LOAD DATA LOCAL INFILE '{os.path.abspath(path)}' INTO TABLE {table.name}\n"
+                f"  FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY ''\n"
+                f"  LINES TERMINATED BY '\\n' IGNORE 1 LINES\n"
+                f"  ({', '.join(columns)});"
+            )
+    script_path = os.path.join(csv_dir, "load_data.sql")
+    with open(script_path, "w", encoding="utf-8") as script:
+        script.write("\n\n".join(statements) + "\n")
+    return script_path
+
+
+def generate_parallel(database_url: str, customers: int = 10000, orders: int = 1000000, reviews: int = 100000,
+                      years: int = 2, end: Optional[datetime] = None, seed: int = 42, shards: int = 8,
+                      workers: Optional[int] = None, chunk_size: int = BULK_CHUNK_SIZE,
+                      csv_dir: Optional[str] = None) -> Dict[str, int]:
+    """
+    Bulk generation spread over a process pool. Reference data and customers are
+    written first by this process; orders (with details and payments) and reviews
+    are then split into `shards` with their own seeds and id ranges.
+    :param database_url: database holding the reference data, and the target unless csv_dir is given
+    :param csv_dir: write CSV files plus a load_data.sql script here instead of inserting
+    :return: rows generated per table
+    """
+    end = end or datetime.now()
+    start = end - timedelta(days=365 * years)
+    print(f"🚀 Starting parallel bulk data generation ({shards} shards)...")
+
+    parent_engine = _shard_engine(database_url)
+    try:
+        Base.metadata.create_all(parent_engine)
+        generator = BulkDataGenerator(parent_engine, seed=seed, chunk_size=chunk_size)
+        generator.ensure_reference_data()
+        generator.generate_customers(customers)
+        plans = plan_shards(
+            orders, reviews, shards, seed,
+            generator._next_id(Order), generator._next_id(OrderDetail),
+            generator._next_id(Payment), generator._next_id(Reviews)
+        )
+    finally:
+        parent_engine.dispose()
+
+    totals = {"orders": 0, "order_details": 0, "payments": 0, "reviews": 0}
+    files: Dict[str, List[str]] = {}
+    started = time.monotonic()
+    # spawn: workers start clean instead of inheriting this process' connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(_run_shard, plan, database_url, start, end, chunk_size, csv_dir) for plan in plans]
+        for future in as_completed(futures):
+            result = future.result()
+            for table in totals:
+                totals[table] += result[table]
+            for table, path in result["files"].items():
+                files.setdefault(table, []).append(path)
+            print(f"   shard {result['shard'] + 1}/{shards} done: {result['orders']:,} orders "
+                  f"in {result['seconds']:.1f}s")
+
+    print(f"✅ Created {totals['orders']:,} orders, {totals['order_details']:,} order details, "
+          f"{totals['payments']:,} payments and {totals['reviews']:,} reviews in {time.monotonic() - started:.1f}s")
+    if csv_dir:
+        print(f"📄 CSV files and LOAD DATA script: {write_load_data_script(csv_dir, files)}")
+        print("   run backfill_daily_revenue.py once the files are loaded")
+    else:
+        backfill_engine = _shard_engine(database_url)
+        try:
+            with Session(backfill_engine) as db:
+                RevenueService.backfill(db, start.date(), end.date())
+        finally:
+            backfill_engine.dispose()
+    return totals
+
+
+def main(argv: Optional[List[str]] = None):
     """Main function to run the data generator"""
+    parser = argparse.ArgumentParser(description="Generate sample data for the restaurant order system")
+    parser.add_argument("--bulk", action="store_true",
+                        help="capacity-testing dataset: millions of rows via chunked Core inserts")
+    parser.add_argument("--customers", type=int, default=10000, help="bulk mode: customers to add")
+    parser.add_argument("--orders", type=int, default=1000000, help="bulk mode: orders to add")
+    parser.add_argument("--reviews", type=int, default=100000, help="bulk mode: reviews to add")
+    parser.add_argument("--years", type=int, default=2, help="bulk mode: order history length")
+    parser.add_argument("--end-date", type=date.fromisoformat, help="bulk mode: last day of the history (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=42, help="bulk mode: random seed")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE, help="bulk mode: rows per insert")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="bulk mode: split orders and reviews over this many processes")
+    parser.add_argument("--workers", type=int, help="bulk mode: process pool size (CPU count by default)")
+    parser.add_argument("--csv-dir", help="bulk mode with --shards: write CSV files for LOAD DATA instead of inserting")
+    args = parser.parse_args(argv)
+    if args.csv_dir and args.shards < 2:
+        parser.error("--csv-dir needs --shards 2 or more")
+
+    db = None
     try:
+        end = datetime.combine(args.end_date, datetime.max.time()).replace(microsecond=0) if args.end_date else None
+        if args.bulk and args.shards > 1:
+            generate_parallel(
+                SQLALCHEMY_DATABASE_URL, customers=args.customers, orders=args.orders, reviews=args.reviews,
+                years=args.years, end=end, seed=args.seed, shards=args.shards, workers=args.workers,
+                chunk_size=args.chunk_size, csv_dir=args.csv_dir
+            )
+        elif args.bulk:
+            BulkDataGenerator(engine, seed=args.seed, chunk_size=args.chunk_size).generate_all_data(
+                customers=args.customers, orders=args.orders, reviews=args.reviews, years=args.years, end=end
+            )
+
         # Get database session
         db = next(get_db())
 
         # Create generator and run
         generator = SampleDataGenerator(db)
-        generator.generate_all_data()
+        if not args.bulk:
+            generator.generate_all_data()
         generator.print_summary()
 
     except Exception as e:
         print(f"❌ Error generating data: {str(e)}")
         raise
     finally:
-        db.close()
+        if db is not None:
+            db.close()
 
 
 if __name__ == "__main__":
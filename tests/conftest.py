@@ -1,12 +1,12 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 
 from api.main import app
-from api.dependencies.database import get_db, Base
+from api.dependencies.database import get_db, get_async_db, get_read_db, get_async_read_db, Base
 from api.models.customers import Customer
 from api.models.menu_items import MenuItem, FoodCategory
 from api.models.orders import Order, OrderType, StatusType
@@ -16,6 +16,9 @@ from api.models.menu_item_ingredients import MenuItemIngredient
 from api.models.payments import Payment, PaymentType, PaymentStatus
 from api.models.promotions import Promotion
 from api.models.reviews import Reviews
+from api.utils.recipe_index import recipe_index
+from api.utils.search_index import menu_search_index
+from api.utils.caching import cache, MENU_CACHE_TAG, ANALYTICS_CACHE_TAG
 
 # Test database configuration
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -31,6 +34,18 @@ def setup_database():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def reset_in_process_indexes():
+    """Each test rolls its data back, so start every test with empty in-memory indexes and cached results"""
+    recipe_index.clear()
+    menu_search_index.clear()
+    cache.invalidate_tags(MENU_CACHE_TAG, ANALYTICS_CACHE_TAG)
+    yield
+    recipe_index.clear()
+    menu_search_index.clear()
+    cache.invalidate_tags(MENU_CACHE_TAG, ANALYTICS_CACHE_TAG)
+
+
 @pytest.fixture
 def db_session():
     """Create a fresh database session for each test"""
@@ -45,6 +60,33 @@ def db_session():
     connection.close()
 
 
+@pytest.fixture
+def query_counter():
+    """Collect every SQL statement executed against the test database"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TransactionalAsyncSession:
+    """
+    Stands in for the AsyncSession of async routes, which only use run_sync:
+    runs the callable on the test's sync session so it sees (and rolls back)
+    the same transaction
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self.session, *args, **kwargs)
+
+
 @pytest.fixture
 def client(db_session):
     """Create test client with database dependency override"""
@@ -55,7 +97,13 @@ def client(db_session):
         finally:
             pass
 
+    async def override_get_async_db():
+        yield TransactionalAsyncSession(db_session)
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
     yield TestClient(app)
     app.dependency_overrides.clear()
 
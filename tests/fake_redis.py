@@ -0,0 +1,171 @@
+"""
+Minimal in-process stand-in for the parts of redis.Redis the cache uses.
+Clients created from the same FakeRedisServer share keys and pub/sub channels,
+like several workers talking to one Redis.
+"""
+import queue
+import threading
+import time
+from fnmatch import fnmatchcase
+
+
+class FakeRedisServer:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.subscribers = {}
+        self.lock = threading.RLock()
+
+    def client(self):
+        return FakeRedis(self)
+
+
+class FakeRedis:
+    def __init__(self, server=None):
+        self.server = server or FakeRedisServer()
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    def _alive(self, key):
+        expires = self.server.expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.server.data.pop(key, None)
+            self.server.expires.pop(key, None)
+        return key in self.server.data
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        with self.server.lock:
+            return self.server.data[key] if self._alive(key) else None
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        with self.server.lock:
+            if nx and self._alive(key):
+                return None
+            self.server.data[key] = self._encode(value)
+            self.server.expires.pop(key, None)
+            if ex is not None:
+                self.server.expires[key] = time.monotonic() + ex
+            if px is not None:
+                self.server.expires[key] = time.monotonic() + px / 1000
+            return True
+
+    def setex(self, key, ttl, value):
+        return self.set(key, value, ex=ttl)
+
+    def ttl(self, key):
+        with self.server.lock:
+            if not self._alive(key):
+                return -2
+            expires = self.server.expires.get(key)
+            return -1 if expires is None else max(int(expires - time.monotonic()), 0)
+
+    def delete(self, *keys):
+        with self.server.lock:
+            deleted = 0
+            for key in keys:
+                if self._alive(key):
+                    del self.server.data[key]
+                    self.server.expires.pop(key, None)
+                    deleted += 1
+            return deleted
+
+    def incr(self, key):
+        with self.server.lock:
+            value = int(self.get(key) or 0) + 1
+            self.server.data[key] = self._encode(value)
+            return value
+
+    def scan_iter(self, match="*", count=None):
+        with self.server.lock:
+            keys = [key for key in list(self.server.data) if self._alive(key)]
+        return iter([key.encode() for key in keys if fnmatchcase(key, match)])
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def publish(self, channel, message):
+        with self.server.lock:
+            subscribers = list(self.server.subscribers.get(channel, ()))
+        for subscriber in subscribers:
+            subscriber.put({"type": "message", "channel": channel.encode(), "data": self._encode(message)})
+        return len(subscribers)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self.server)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue_command(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue_command
+
+    def execute(self):
+        results = [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+
+class FakePubSub:
+    def __init__(self, server):
+        self.server = server
+        self.messages = queue.Queue()
+        self.channels = []
+
+    def subscribe(self, *channels):
+        with self.server.lock:
+            for channel in channels:
+                self.server.subscribers.setdefault(channel, []).append(self.messages)
+                self.channels.append(channel)
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        with self.server.lock:
+            for channel in self.channels:
+                self.server.subscribers[channel].remove(self.messages)
+            self.channels = []
+
+
+class FakeAsyncRedis:
+    """redis.asyncio flavour of FakeRedis: same commands, awaited"""
+
+    def __init__(self, server=None):
+        self.sync = FakeRedis(server)
+        self.calls = []
+
+    def __getattr__(self, name):
+        command = getattr(self.sync, name)
+
+        async def run(*args, **kwargs):
+            self.calls.append(name)
+            return command(*args, **kwargs)
+        return run
+
+    def pipeline(self, transaction=True):
+        self.calls.append("pipeline")
+        return FakeAsyncPipeline(self.sync)
+
+
+class FakeAsyncPipeline(FakePipeline):
+    async def execute(self):
+        return FakePipeline.execute(self)
@@ -0,0 +1,145 @@
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+from fastapi import status
+
+from api.models.orders import Order, OrderType, StatusType
+from api.models.order_details import OrderDetail
+from api.models.reviews import Reviews
+from api.utils.caching import cache, ANALYTICS_CACHE_TAG
+
+
+def _add_order(db_session, menu_item, quantity, order_date):
+    order = Order(
+        guest_name="Analytics Test",
+        guest_phone="1212121212",
+        order_date=order_date,
+        order_type=OrderType.DINE_IN,
+        status=StatusType.COMPLETED,
+        total_amount=Decimal("10.00")
+    )
+    db_session.add(order)
+    db_session.flush()
+    db_session.add(OrderDetail(order_id=order.id, menu_item_id=menu_item.id, amount=quantity))
+
+
+def _add_review(db_session, menu_item, rating, created_at):
+    db_session.add(Reviews(
+        menu_item_id=menu_item.id,
+        customer_name="Analytics Reviewer",
+        rating=rating,
+        review_text="Fine",
+        created_at=created_at
+    ))
+
+
+def test_menu_performance_does_not_multiply_orders_by_reviews(client, db_session, sample_menu_item):
+    """Order and review stats are aggregated independently"""
+    now = datetime.now()
+    _add_order(db_session, sample_menu_item, 2, now)
+    _add_order(db_session, sample_menu_item, 3, now)
+    for rating in (3, 4, 5):
+        _add_review(db_session, sample_menu_item, rating, now)
+    db_session.commit()
+
+    response = client.get("/staff_actions/analytics/menu-performance")
+
+    assert response.status_code == status.HTTP_200_OK
+    item = next(i for i in response.json() if i["menu_item_id"] == sample_menu_item.id)
+    assert item["order_count"] == 2
+    assert item["total_quantity_sold"] == 5
+    assert item["total_revenue"] == 79.95
+    assert item["review_count"] == 3
+    assert item["average_rating"] == 4.0
+
+
+def test_menu_performance_date_window(client, db_session, sample_menu_item):
+    """Only orders and reviews inside the window are counted"""
+    today = date.today()
+    last_month = datetime.now() - timedelta(days=30)
+    _add_order(db_session, sample_menu_item, 1, datetime.now())
+    _add_order(db_session, sample_menu_item, 4, last_month)
+    _add_review(db_session, sample_menu_item, 5, datetime.now())
+    _add_review(db_session, sample_menu_item, 1, last_month)
+    db_session.commit()
+
+    response = client.get(
+        f"/staff_actions/analytics/menu-performance?start_date={today - timedelta(days=7)}&end_date={today}"
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    item = next(i for i in response.json() if i["menu_item_id"] == sample_menu_item.id)
+    assert item["order_count"] == 1
+    assert item["total_quantity_sold"] == 1
+    assert item["review_count"] == 1
+    assert item["average_rating"] == 5.0
+
+
+def test_menu_performance_invalid_window(client):
+    """Start date after end date is rejected"""
+    today = date.today()
+    response = client.get(
+        f"/staff_actions/analytics/menu-performance?start_date={today}&end_date={today - timedelta(days=1)}"
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_review_insights_aggregates_and_streams_complaints(client, db_session, sample_menu_item):
+    """Distribution comes from SQL; complaints are the newest matching low ratings"""
+    now = datetime.now()
+    for minutes in range(12):
+        db_session.add(Reviews(
+            menu_item_id=sample_menu_item.id,
+            customer_name=f"Unhappy {minutes}",
+            rating=1,
+            review_text="Food arrived COLD",
+            created_at=now - timedelta(minutes=minutes)
+        ))
+    db_session.add(Reviews(
+        menu_item_id=sample_menu_item.id,
+        customer_name="Neutral",
+        rating=2,
+        review_text="Portion was small",
+        created_at=now
+    ))
+    for _ in range(3):
+        _add_review(db_session, sample_menu_item, 5, now)
+    db_session.commit()
+
+    response = client.get(f"/staff_actions/analytics/review-insights?menu_item_id={sample_menu_item.id}")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total_reviews"] == 16
+    assert data["rating_distribution"] == {"1": 12, "2": 1, "3": 0, "4": 0, "5": 3}
+    assert data["average_rating"] == round((12 + 2 + 15) / 16, 2)
+
+    complaints = data["recent_complaints"]
+    assert len(complaints) == 10
+    assert complaints[0]["customer_name"] == "Unhappy 0"
+    assert all(c["customer_name"] != "Neutral" for c in complaints)
+    assert "Review food temperature control and serving times" in data["recommendations"]
+
+
+def test_menu_performance_is_served_from_cache_between_writes(client, db_session, sample_menu_item):
+    """Writes do not invalidate the cached analytics; they show up once the entry is refreshed"""
+    item_id = sample_menu_item.id
+    now = datetime.now()
+    _add_order(db_session, sample_menu_item, 1, now)
+    db_session.commit()
+
+    def performance():
+        response = client.get("/staff_actions/analytics/menu-performance")
+        return next(i for i in response.json() if i["menu_item_id"] == item_id)
+
+    assert performance()["order_count"] == 1
+
+    _add_order(db_session, sample_menu_item, 2, now)
+    _add_review(db_session, sample_menu_item, 5, now)
+    db_session.commit()
+    assert performance()["order_count"] == 1
+
+    cache.invalidate_tags(ANALYTICS_CACHE_TAG)
+    item = performance()
+    assert item["order_count"] == 2
+    assert item["review_count"] == 1
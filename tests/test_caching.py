@@ -0,0 +1,336 @@
+import asyncio
+import inspect
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from api.utils.caching import CacheManager, cached, INVALIDATION_CHANNEL
+from api.utils.cache_codec import CacheCodec, CodecError, build_key
+from api.models.orders import StatusType
+from api.utils.memory_cache import MemoryCache, approximate_size
+from tests.fake_redis import FakeRedisServer, FakeAsyncRedis
+
+
+def test_invalidate_tags_drops_tagged_entries_only():
+    cache = CacheManager(redis_url=None)
+    cache.set("menu_search:a", [1], tags=["menu"])
+    cache.set("menu_item:1", {"id": 1}, tags=["menu", "menu_item:1"])
+    cache.set("orders:1", {"id": 1}, tags=["orders"])
+
+    cache.invalidate_tags("menu")
+
+    assert cache.get("menu_search:a", tags=["menu"]) is None
+    assert cache.get("menu_item:1", tags=["menu", "menu_item:1"]) is None
+    assert cache.get("orders:1", tags=["orders"]) == {"id": 1}
+
+
+def test_generated_keys_keep_readable_prefix():
+    cache = CacheManager(redis_url=None)
+    key = cache._generate_key("menu_search", "chicken", limit=5)
+    cache.set(key, ["hit"])
+
+    assert key.startswith("menu_search:")
+    assert cache.clear_pattern("menu_search:*") == 1
+    assert cache.get(key) is None
+
+
+def test_cached_decorator_honours_tags(monkeypatch):
+    manager = CacheManager(redis_url=None)
+    monkeypatch.setattr("api.utils.caching.cache", manager)
+    calls = []
+
+    @cached(ttl=60, key_prefix="menu_count", tags=["menu"])
+    def count_items(category):
+        calls.append(category)
+        return len(calls)
+
+    assert count_items("regular") == 1
+    assert count_items("regular") == 1
+    manager.invalidate_tags("menu")
+    assert count_items("regular") == 2
+    assert calls == ["regular", "regular"]
+
+
+def test_memory_cache_evicts_least_recently_used():
+    local = MemoryCache(max_entries=2, sweep_interval=None)
+    local.set("a", 1, ttl=60)
+    local.set("b", 2, ttl=60)
+    local.get("a")
+    local.set("c", 3, ttl=60)
+
+    assert local.get("b") is None
+    assert local.get("a") == 1
+    assert local.get("c") == 3
+    stats = local.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_memory_cache_respects_byte_budget():
+    value = ["x" * 100 for _ in range(10)]
+    budget = approximate_size(value) * 2 + 1
+    local = MemoryCache(max_bytes=budget, sweep_interval=None)
+    for key in ("a", "b", "c"):
+        local.set(key, value, ttl=60)
+
+    assert len(local) == 2
+    assert local.stats()["bytes"] <= budget
+    assert local.set("huge", "x" * budget, ttl=60) is False
+    # An oversized replacement drops the old value instead of keeping it
+    assert local.set("a", "x" * budget, ttl=60) is False
+    assert local.get("a") is None
+
+
+def test_memory_cache_expiry_sweep():
+    local = MemoryCache(sweep_interval=0.01)
+    local.set("short", 1, ttl=0.01)
+    local.set("long", 2, ttl=60)
+
+    deadline = time.monotonic() + 2
+    while len(local) > 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    local.stop()
+
+    assert local.keys() == ["long"]
+    assert local.stats()["expirations"] == 1
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def _two_workers():
+    server = FakeRedisServer()
+    workers = [CacheManager(redis_client=server.client(), l1_ttl=60) for _ in range(2)]
+    assert _wait_until(lambda: len(server.subscribers.get(INVALIDATION_CHANNEL, [])) == 2)
+    return server, workers
+
+
+def test_l1_serves_repeat_reads_without_redis():
+    server, workers = _two_workers()
+    worker = workers[0]
+    try:
+        worker.set("menu_item:1", {"id": 1})
+        server.data.clear()  # only the L1 copy is left
+
+        assert worker.get("menu_item:1") == {"id": 1}
+        assert worker.stats()["local"]["hits"] == 1
+    finally:
+        for manager in workers:
+            manager.stop_listener()
+
+
+def test_delete_is_broadcast_to_other_workers_l1():
+    server, (writer, reader) = _two_workers()
+    try:
+        writer.set("menu_item:1", {"id": 1})
+        assert reader.get("menu_item:1") == {"id": 1}  # now cached in reader's L1
+
+        writer.delete("menu_item:1")
+
+        assert _wait_until(lambda: reader.get("menu_item:1") is None)
+    finally:
+        writer.stop_listener()
+        reader.stop_listener()
+
+
+def test_tag_invalidation_is_broadcast_to_other_workers_l1():
+    server, (writer, reader) = _two_workers()
+    try:
+        writer.set("menu_search:a", [1], tags=["menu"])
+        assert reader.get("menu_search:a", tags=["menu"]) == [1]
+
+        writer.invalidate_tags("menu")
+
+        assert writer.get("menu_search:a", tags=["menu"]) is None
+        assert _wait_until(lambda: reader.get("menu_search:a", tags=["menu"]) is None)
+    finally:
+        writer.stop_listener()
+        reader.stop_listener()
+
+
+def test_concurrent_misses_compute_once():
+    manager = CacheManager(redis_url=None)
+    calls = []
+    started = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return "report"
+
+    def request(results):
+        started.wait()
+        results.append(manager.get_or_compute("menu_performance", compute, ttl=60))
+
+    results = []
+    threads = [threading.Thread(target=request, args=(results,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["report"] * 8
+
+
+def test_stale_value_served_while_another_worker_refreshes():
+    server = FakeRedisServer()
+    first = CacheManager(redis_client=server.client())
+    second = CacheManager(redis_client=server.client())
+
+    first.get_or_compute("menu_performance", lambda: "old", ttl=0, stale_ttl=60)
+    # The other worker is refreshing it right now
+    token = first._acquire_shared_lock("menu_performance", 10)
+
+    assert second.get_or_compute("menu_performance", lambda: "new", ttl=60, stale_ttl=60) == "old"
+
+    first._release_shared_lock("menu_performance", token)
+    assert second.get_or_compute("menu_performance", lambda: "new", ttl=60, stale_ttl=60) == "new"
+    assert first.get_or_compute("menu_performance", lambda: "newer", ttl=60, stale_ttl=60) == "new"
+
+
+def test_expired_entry_recomputed_once_across_workers_with_l1():
+    server = FakeRedisServer()
+    workers = [CacheManager(redis_client=server.client(), l1_ttl=60) for _ in range(3)]
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    try:
+        workers[0].get_or_compute("menu_performance", compute, ttl=0, stale_ttl=60)
+        for worker in workers[1:]:
+            worker.get("menu_performance")
+        # Every worker now holds the expired entry in its L1
+        assert all(worker.stats()["local"]["entries"] for worker in workers)
+        assert [worker.get_or_compute("menu_performance", compute, ttl=60, stale_ttl=60)
+                for worker in workers] == [2, 2, 2]
+        assert len(calls) == 2
+    finally:
+        for worker in workers:
+            worker.stop_listener()
+
+
+def _async_manager(server):
+    return CacheManager(redis_client=server.client(), async_redis_client=FakeAsyncRedis(server))
+
+
+def test_async_path_uses_async_client_only():
+    server = FakeRedisServer()
+    manager = _async_manager(server)
+    manager.redis_client = None  # any blocking call would now fail loudly
+
+    async def scenario():
+        await manager.aset("menu_item:1", {"id": 1}, tags=["menu"])
+        assert await manager.aget("menu_item:1", tags=["menu"]) == {"id": 1}
+        await manager.ainvalidate_tags("menu")
+        return await manager.aget("menu_item:1", tags=["menu"])
+
+    assert asyncio.run(scenario()) is None
+    assert {"setex", "pipeline"} <= set(manager.async_redis_client.calls)
+
+
+def test_amget_fetches_batch_in_one_round_trip():
+    server = FakeRedisServer()
+    manager = _async_manager(server)
+    for item_id in range(5):
+        manager.set(f"menu_item:{item_id}", item_id, tags=["menu"])
+
+    client = manager.async_redis_client
+    keys = [f"menu_item:{item_id}" for item_id in range(6)]
+    client.calls.clear()
+    values = asyncio.run(manager.amget(keys, tags=["menu"]))
+
+    assert values == [0, 1, 2, 3, 4, None]
+    # One MGET of the tag generations for the whole batch, then the pipelined fetch
+    assert client.calls.count("mget") == 1
+    assert client.calls.count("pipeline") == 1
+    assert "get" not in client.calls
+
+
+def test_cached_coroutine_goes_through_async_path(monkeypatch):
+    server = FakeRedisServer()
+    manager = _async_manager(server)
+    monkeypatch.setattr("api.utils.caching.cache", manager)
+    calls = []
+
+    @cached(ttl=60, key_prefix="menu_async")
+    async def load(category):
+        calls.append(category)
+        return [category]
+
+    async def scenario():
+        return await asyncio.gather(*(load("regular") for _ in range(5)))
+
+    assert asyncio.run(scenario()) == [["regular"]] * 5
+    assert calls == ["regular"]
+    assert "set" in manager.async_redis_client.calls
+
+
+def test_codec_round_trips_service_values():
+    codec = CacheCodec(compress_threshold=64)
+    value = [{
+        "menu_item_id": 1,
+        "popularity_score": Decimal("3.50"),
+        "order_date": datetime(2024, 5, 1, 12, 30),
+        "day": date(2024, 5, 1),
+        "status": StatusType.COMPLETED,
+        "rating_distribution": {5: 2, 1: 0},
+    }] * 10
+
+    encoded = codec.encode(value)
+    decoded = codec.decode(encoded)
+
+    assert decoded == value
+    assert decoded[0]["popularity_score"] == Decimal("3.50")
+    assert decoded[0]["status"] is StatusType.COMPLETED
+    assert len(encoded) < len(CacheCodec(compress_threshold=None).encode(value))
+
+
+def test_msgpack_codec_round_trips_service_values():
+    pytest.importorskip("msgpack")
+    codec = CacheCodec(use_msgpack=True, compress_threshold=64)
+    value = [{
+        "menu_item_id": 1,
+        "popularity_score": Decimal("3.50"),
+        "order_date": datetime(2024, 5, 1, 12, 30),
+        "day": date(2024, 5, 1),
+        "status": StatusType.COMPLETED,
+        "rating_distribution": {5: 2, 1: 0},
+        "tags": {"vegan"},
+    }] * 10
+
+    encoded = codec.encode(value)
+
+    assert codec.use_msgpack
+    assert codec.decode(encoded) == value
+    # The header records the format, so a JSON-configured worker still reads it
+    assert CacheCodec(compress_threshold=64).decode(encoded) == value
+    assert encoded != CacheCodec(compress_threshold=64).encode(value)
+
+
+def test_codec_rejects_other_schema_versions():
+    encoded = CacheCodec(schema_version=1).encode({"a": 1})
+    with pytest.raises(CodecError):
+        CacheCodec(schema_version=2).decode(encoded)
+
+
+def test_cache_key_ignores_session_and_binds_arguments(db_session):
+    def report(db, start_date=None, end_date=None):
+        return None
+
+    signature = inspect.signature(report)
+    key = build_key("report", (db_session, date(2024, 1, 1)), {}, signature)
+
+    assert key.startswith("report:")
+    assert key == build_key("report", (object.__new__(type(db_session)),), {"start_date": date(2024, 1, 1)}, signature)
+    assert key != build_key("report", (db_session, date(2024, 1, 2)), {}, signature)
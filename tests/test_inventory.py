@@ -1,6 +1,14 @@
-from fastapi import status
+from decimal import Decimal
 
+import pytest
+from fastapi import HTTPException, status
+
+from api.models.menu_items import MenuItem, FoodCategory
+from api.models.menu_item_ingredients import MenuItemIngredient
 from api.models.resources import Resource
+from api.models.orders import Order, OrderType, StatusType
+from api.models.order_details import OrderDetail
+from api.services.inventory_services import InventoryService
 
 
 def test_inventory_check(client, sample_menu_item, sample_resource):
@@ -36,3 +44,125 @@ def test_low_stock_items(client, db_session):
     assert isinstance(data, list)
     low_stock_items = [item["item"] for item in data]
     assert "Low Stock Item" in low_stock_items
+
+
+def test_inventory_check_sums_shared_ingredients(client, db_session, sample_menu_item, sample_resource):
+    """Lines sharing an ingredient are checked against the stock together"""
+    second_item = MenuItem(
+        name="Chicken Wrap",
+        description="Chicken breast in a tortilla",
+        price=Decimal("9.99"),
+        calories=420,
+        food_category=FoodCategory.REGULAR,
+        is_available=True
+    )
+    db_session.add(second_item)
+    db_session.commit()
+    db_session.add(MenuItemIngredient(
+        menu_item_id=second_item.id,
+        resource_id=sample_resource.id,
+        amount=60
+    ))
+    db_session.commit()
+
+    # 50 + 60 = 110 chicken breasts needed, only 100 in stock
+    order_items = [
+        {"menu_item_id": sample_menu_item.id, "quantity": 50},
+        {"menu_item_id": second_item.id, "quantity": 1}
+    ]
+
+    response = client.post("/staff_actions/inventory/check-availability", json=order_items)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+
+    assert data["all_available"] is False
+    assert set(data["insufficient_items"]) == {sample_menu_item.id, second_item.id}
+    chicken = data["details"][str(second_item.id)]["ingredients"]["Chicken Breast"]
+    assert chicken == {"required": 60, "available": 100, "sufficient": False}
+
+
+def _create_order(db_session, menu_item, quantity):
+    order = Order(
+        guest_name="Inventory Test",
+        guest_phone="8888888888",
+        order_type=OrderType.DINE_IN,
+        status=StatusType.PENDING
+    )
+    db_session.add(order)
+    db_session.flush()
+    db_session.add(OrderDetail(order_id=order.id, menu_item_id=menu_item.id, amount=quantity))
+    db_session.commit()
+    return order
+
+
+def test_confirm_order_deducts_inventory(client, db_session, sample_menu_item, sample_resource):
+    """Confirming an order applies the guarded deduction"""
+    order = _create_order(db_session, sample_menu_item, 2)
+
+    response = client.put(f"/orders/{order.id}/confirm")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "confirmed"
+    db_session.refresh(sample_resource)
+    assert sample_resource.amount == 98
+
+
+def test_confirm_orders_batch_reports_shortfall(client, db_session, sample_menu_item, sample_resource):
+    """A batch that exceeds stock is rejected as a whole with per-resource shortfalls"""
+    first = _create_order(db_session, sample_menu_item, 60)
+    second = _create_order(db_session, sample_menu_item, 50)
+    resource_id = sample_resource.id
+
+    response = client.put("/orders/confirm", json=[first.id, second.id])
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    shortfalls = response.json()["detail"]["shortfalls"]
+    assert shortfalls == [{
+        "resource_id": resource_id,
+        "ingredient": "Chicken Breast",
+        "needed": 110,
+        "available": 100,
+        "shortage": 10
+    }]
+
+
+def test_confirming_twice_deducts_inventory_once(client, db_session, sample_menu_item, sample_resource):
+    """Orders that are no longer pending are rejected before touching inventory"""
+    order = _create_order(db_session, sample_menu_item, 2)
+    order_id = order.id
+    assert client.put(f"/orders/{order_id}/confirm").status_code == status.HTTP_200_OK
+    db_session.refresh(sample_resource)
+    assert sample_resource.amount == 98
+
+    response = client.put(f"/orders/{order_id}/confirm")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == f"Only pending orders can be confirmed: order {order_id} is confirmed"
+
+
+def test_batch_confirm_rejects_orders_that_are_not_pending(client, db_session, sample_menu_item, sample_resource):
+    pending = _create_order(db_session, sample_menu_item, 1)
+    confirmed = _create_order(db_session, sample_menu_item, 1)
+    pending_id, confirmed_id = pending.id, confirmed.id
+    assert client.put(f"/orders/{confirmed_id}/confirm").status_code == status.HTTP_200_OK
+
+    response = client.put("/orders/confirm", json=[pending_id, confirmed_id])
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == f"Only pending orders can be confirmed: order {confirmed_id} is confirmed"
+
+
+def test_reservation_shortage_leaves_callers_transaction_alone(db_session, sample_menu_item, sample_resource):
+    """With commit=False a shortage is raised, and undoing the work is left to the caller"""
+    pending = Resource(item="Uncommitted Stock", amount=1)
+    db_session.add(pending)
+    db_session.flush()
+
+    with pytest.raises(HTTPException):
+        InventoryService.reserve_inventory(
+            db_session, [[{"menu_item_id": sample_menu_item.id, "quantity": 500}]], commit=False
+        )
+
+    assert pending in db_session
+    assert db_session.query(Resource).filter(Resource.item == "Uncommitted Stock").count() == 1
@@ -1,5 +1,14 @@
+from decimal import Decimal
+
 from fastapi import status
 
+from api.models.menu_items import MenuItem, FoodCategory
+from api.models.resources import Resource
+from api.models.reviews import Reviews
+from api.utils.recipe_index import recipe_index
+from api.utils.search_index import menu_search_index
+
+
 def test_create_menu_item_success(client):
     """Test successful menu item creation"""
     menu_item_data = {
@@ -44,3 +53,132 @@ def test_create_duplicate_menu_item(client, sample_menu_item):
 
     # Should be either 400 or 409 for duplicate/conflict
     assert response.status_code in [status.HTTP_400_BAD_REQUEST, status.HTTP_409_CONFLICT]
+
+
+def test_recipe_index_follows_ingredient_changes(client, db_session, sample_menu_item):
+    """Ingredient create/delete through the API is reflected without a full rebuild"""
+    response = client.get(f"/menu_items/{sample_menu_item.id}/nutrition")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["ingredients"] == [{"name": "Chicken Breast", "amount": 1}]
+    version = recipe_index.version
+
+    lemon = Resource(item="Lemon", amount=40)
+    db_session.add(lemon)
+    db_session.commit()
+
+    response = client.post("/menu_item_ingredients/", json={
+        "menu_item_id": sample_menu_item.id,
+        "resource_id": lemon.id,
+        "amount": 2
+    })
+    assert response.status_code == status.HTTP_200_OK
+    ingredient_id = response.json()["id"]
+    assert recipe_index.version > version
+
+    response = client.get(f"/staff_actions/?menu_item_id={sample_menu_item.id}&quantity=3")
+    assert response.json() == {"Chicken Breast": 3, "Lemon": 6}
+
+    response = client.delete(f"/menu_item_ingredients/{ingredient_id}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    response = client.get(f"/menu_items/{sample_menu_item.id}/nutrition")
+    assert response.json()["ingredients"] == [{"name": "Chicken Breast", "amount": 1}]
+
+
+def _add_rated_menu_items(db_session, start, count):
+    for i in range(start, start + count):
+        item = MenuItem(
+            name=f"Bench Dish {i:03d}",
+            description="Benchmark dish",
+            price=Decimal("10.00"),
+            calories=400,
+            food_category=FoodCategory.REGULAR,
+            is_available=True
+        )
+        db_session.add(item)
+        db_session.flush()
+        db_session.add(Reviews(menu_item_id=item.id, customer_name="Bench", rating=4))
+    db_session.commit()
+
+
+def test_menu_search_query_count_is_constant(client, db_session, query_counter):
+    """Search cost must not grow with the number of matching menu items"""
+    counts = []
+    for start, added, total in ((0, 5, 5), (5, 45, 50)):
+        _add_rated_menu_items(db_session, start, added)
+        query_counter.clear()
+
+        response = client.get("/menu_items/search?category=regular&sort_by=rating")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == total
+        assert all(item["review_count"] == 1 for item in response.json())
+        counts.append(len(query_counter))
+
+    assert counts[0] == counts[1] == 1
+
+
+def test_menu_search_term_query_count_is_constant(client, db_session, query_counter):
+    """Text search answers from the index and loads the matches in one query"""
+    counts = []
+    for start, added, total in ((0, 5, 5), (5, 45, 50)):
+        _add_rated_menu_items(db_session, start, added)
+        # Added behind the controller's back: the first search rebuilds the index
+        menu_search_index.clear()
+        query_counter.clear()
+
+        for _ in range(2):
+            response = client.get("/menu_items/search?search_term=Bench&sort_by=rating")
+
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.json()) == total
+            assert all(item["review_count"] == 1 for item in response.json())
+            counts.append(len(query_counter))
+            query_counter.clear()
+
+    # Rebuild plus search, then the search alone
+    assert counts == [2, 1, 2, 1]
+
+
+def test_menu_search_relevance_and_prefix(client, db_session, sample_menu_item):
+    """Name matches rank above description matches; word prefixes match"""
+    db_session.add(MenuItem(
+        name="Garden Salad",
+        description="Greens topped with chicken strips",
+        price=Decimal("8.99"),
+        calories=210,
+        food_category=FoodCategory.REGULAR,
+        is_available=True
+    ))
+    db_session.commit()
+
+    response = client.get("/menu_items/search?search_term=chick&sort_by=relevance")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["name"] for item in response.json()] == ["Grilled Chicken", "Garden Salad"]
+
+    response = client.get("/menu_items/search?search_term=grilled%20breast")
+    assert [item["name"] for item in response.json()] == ["Grilled Chicken"]
+
+    response = client.get("/menu_items/search?search_term=icken")
+    assert response.json() == []
+
+
+def test_menu_typeahead(client, sample_menu_item):
+    """Typeahead follows menu changes made through the API"""
+    response = client.get("/menu_items/typeahead?q=gri")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{"id": sample_menu_item.id, "name": "Grilled Chicken"}]
+
+    client.patch(f"/menu_items/{sample_menu_item.id}/availability?available=false")
+    assert client.get("/menu_items/typeahead?q=gri").json() == []
+
+    response = client.post("/menu_items/", json={
+        "name": "Grits Bowl",
+        "price": "7.50",
+        "calories": 300,
+        "food_category": "vegetarian"
+    })
+    assert response.status_code == status.HTTP_201_CREATED
+    assert [item["name"] for item in client.get("/menu_items/typeahead?q=gri").json()] == ["Grits Bowl"]
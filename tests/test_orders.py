@@ -1,3 +1,15 @@
+import csv
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from api.controllers.orders import OrderController
+from api.models.orders import Order, OrderType, StatusType
+from api.models.order_details import OrderDetail
+from api.models.payments import Payment, PaymentType, PaymentStatus
+from api.services.export_services import ExportService
+
+
 def test_create_guest_order_success(client, sample_menu_item):
     """Test successful guest order creation - TESTS THE BUG FIXES"""
     guest_info = {
@@ -29,3 +41,138 @@ def test_create_guest_order_via_customer_actions(client, sample_menu_item):
     response = client.post("/customer_actions/orders/guest",
                             json={"guest_info": guest_data, "order_items": order_items})
 
+
+def test_guest_takeout_order_can_be_tracked(client, sample_menu_item):
+    """The requested order type is stored as the model enum and reads back"""
+    guest_data = {"guest_name": "Takeout Guest", "guest_phone": "5555555555", "order_type": "takeout"}
+    order_items = [{"menu_item_id": sample_menu_item.id, "quantity": 1}]
+
+    response = client.post("/customer_actions/orders/guest",
+                           json={"guest_info": guest_data, "order_items": order_items})
+    assert response.status_code == 200
+
+    tracked = client.get(f"/customer_actions/orders/track/{response.json()['tracking_number']}")
+    assert tracked.status_code == 200
+    assert tracked.json()["order_type"] == "takeout"
+
+
+def test_list_orders_keyset_pagination(client, db_session):
+    """Walking the pages returns every order once, newest first"""
+    start = datetime(2024, 3, 1, 12, 0)
+    for offset in (0, 1, 1, 2, 3):  # two orders share a timestamp
+        db_session.add(Order(
+            guest_name="Page Guest",
+            guest_phone="5551231234",
+            order_date=start + timedelta(hours=offset),
+            order_type=OrderType.TAKEOUT,
+            status=StatusType.PENDING,
+            total_amount=Decimal("5.00")
+        ))
+    db_session.flush()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "include_total": True}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/orders/", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert page["total"] == 5
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            assert cursor is None
+            break
+
+    assert len({order["id"] for order in seen}) == 5
+    keys = [(order["order_date"], order["id"]) for order in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_page_total_counts_the_filtered_list(db_session):
+    """total follows list_query, so a filtering controller reports its own count"""
+    class PendingOrderController(OrderController):
+        def list_query(self, db):
+            return super().list_query(db).filter(Order.status == StatusType.PENDING)
+
+    for order_status in (StatusType.PENDING, StatusType.PENDING, StatusType.COMPLETED):
+        db_session.add(Order(guest_name="Total Guest", guest_phone="5551231234",
+                             order_type=OrderType.TAKEOUT, status=order_status))
+    db_session.flush()
+    pending = db_session.query(Order).filter(Order.status == StatusType.PENDING).count()
+
+    page = PendingOrderController().read_page(db_session, limit=1, include_total=True)
+
+    assert page["total"] == pending
+    assert page["total"] < db_session.query(Order).count()
+
+
+def test_list_orders_rejects_invalid_cursor(client):
+    response = client.get("/orders/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def _add_export_orders(db_session, menu_item, count):
+    orders = []
+    for number in range(count):
+        order = Order(
+            guest_name=f"Export Guest {number}",
+            guest_phone="5559998888",
+            order_date=datetime(2024, 4, 1 + number, 18, 0),
+            order_type=OrderType.DINE_IN,
+            status=StatusType.COMPLETED,
+            total_amount=Decimal("31.98")
+        )
+        db_session.add(order)
+        db_session.flush()
+        db_session.add(OrderDetail(order_id=order.id, menu_item_id=menu_item.id, amount=2))
+        db_session.add(Payment(
+            order_id=order.id, amount=31.98,
+            status=PaymentStatus.COMPLETED, payment_type=PaymentType.CASH
+        ))
+        orders.append(order)
+    db_session.flush()
+    return [order.id for order in orders]
+
+
+def test_export_orders_ndjson_streams_every_order(client, db_session, sample_menu_item):
+    order_ids = _add_export_orders(db_session, sample_menu_item, 3)
+    response = client.get("/orders/export", params={"include_details": True, "include_payments": True})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == order_ids
+    assert lines[0]["details"][0]["menu_item_name"] == "Grilled Chicken"
+    assert lines[0]["details"][0]["quantity"] == 2
+    assert lines[0]["payment"]["payment_type"] == "cash"
+
+
+def test_export_orders_csv_by_date_range(client, db_session, sample_menu_item):
+    order_ids = _add_export_orders(db_session, sample_menu_item, 3)
+    response = client.get("/orders/export", params={
+        "start_date": "2024-04-02", "end_date": "2024-04-03", "format": "csv",
+        "include_details": True, "include_payments": True
+    })
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(response.text.splitlines()))
+    assert [int(row["id"]) for row in rows] == order_ids[1:]
+    assert rows[0]["menu_item_name"] == "Grilled Chicken"
+    assert rows[0]["payment_status"] == "completed"
+
+
+def test_export_orders_rejects_reversed_dates(client):
+    response = client.get("/orders/export", params={"start_date": "2024-04-03", "end_date": "2024-04-02"})
+    assert response.status_code == 400
+
+
+def test_export_walks_orders_in_batches(db_session, sample_menu_item, query_counter):
+    order_ids = _add_export_orders(db_session, sample_menu_item, 5)
+    query_counter.clear()
+    exported = list(ExportService.iter_orders(db_session, include_details=True, batch_size=2))
+
+    assert [order["id"] for order in exported] == order_ids
+    # 3 batches of orders, each with one query for their details
+    assert len(query_counter) == 6
@@ -0,0 +1,85 @@
+"""
+Statement counts per endpoint. Each endpoint must issue the same number of
+queries however many orders and order lines it returns; a lazy load sneaking
+back into a response shows up here as a count that grows with the data.
+"""
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from api.models.customers import Customer
+from api.models.menu_items import MenuItem, FoodCategory
+from api.models.orders import Order, OrderType, StatusType
+from api.models.order_details import OrderDetail
+from api.models.payments import Payment, PaymentType, PaymentStatus
+
+DATE_RANGE = "start_date=2024-05-01&end_date=2024-05-31"
+
+# Endpoint -> most statements it may issue
+QUERY_BUDGETS = {
+    "/orders/?limit=100": 3,
+    "/orders/{id}": 3,
+    "/orders/track/{tracking_number}": 2,
+    "/customer_actions/orders/track/{tracking_number}": 2,
+    "/orders/date-range?" + DATE_RANGE: 1,
+    "/staff_actions/orders/date-range?" + DATE_RANGE: 1,
+}
+
+
+def _add_orders(db_session, count, lines, first_day):
+    """`count` orders of a registered customer, each with `lines` distinct menu items and a payment"""
+    customer = Customer(
+        customer_name=f"Counted Customer {first_day}",
+        customer_email=f"counted{first_day}@example.com",
+        customer_phone="5550001111",
+        customer_address="1 Query Ln"
+    )
+    db_session.add(customer)
+    menu_items = [
+        MenuItem(name=f"Counted Dish {first_day}-{line}", price=Decimal("9.50"), calories=400,
+                 food_category=FoodCategory.REGULAR, is_available=True)
+        for line in range(lines)
+    ]
+    db_session.add_all(menu_items)
+    db_session.flush()
+
+    orders = []
+    for number in range(count):
+        order = Order(
+            customer_id=customer.id,
+            tracking_number=f"QC{first_day:02d}{number:04d}",
+            order_date=datetime(2024, 5, first_day, 12, 0) + timedelta(hours=number),
+            order_type=OrderType.TAKEOUT,
+            status=StatusType.PENDING,
+            total_amount=Decimal("9.50") * lines
+        )
+        db_session.add(order)
+        db_session.flush()
+        db_session.add_all([
+            OrderDetail(order_id=order.id, menu_item_id=menu_item.id, amount=1)
+            for menu_item in menu_items
+        ])
+        db_session.add(Payment(order_id=order.id, amount=float(order.total_amount),
+                               status=PaymentStatus.PENDING, payment_type=PaymentType.CASH))
+        orders.append(order)
+    db_session.flush()
+    return orders[-1]
+
+
+def _count_statements(client, query_counter, path, order):
+    query_counter.clear()
+    response = client.get(path.format(id=order.id, tracking_number=order.tracking_number))
+    assert response.status_code == 200, response.text
+    return len(query_counter)
+
+
+@pytest.mark.parametrize("path", list(QUERY_BUDGETS))
+def test_statement_count_does_not_grow_with_data(client, db_session, query_counter, path):
+    small_order = _add_orders(db_session, count=2, lines=1, first_day=1)
+    small = _count_statements(client, query_counter, path, small_order)
+
+    large_order = _add_orders(db_session, count=10, lines=5, first_day=10)
+    large = _count_statements(client, query_counter, path, large_order)
+
+    assert large == small, f"{path}: {small} statements for small data, {large} for large data"
+    assert large <= QUERY_BUDGETS[path], f"{path}: {large} statements, budget {QUERY_BUDGETS[path]}"
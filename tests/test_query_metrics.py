@@ -0,0 +1,63 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from api.utils.query_metrics import QueryMetrics, QueryMetricsMiddleware, query_metrics
+
+
+def test_response_headers_report_request_queries(client, sample_menu_item, query_counter):
+    item_id = sample_menu_item.id
+    query_counter.clear()
+    response = client.get(f"/menu_items/{item_id}")
+
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Query-Count"]) == len(query_counter) > 0
+    assert float(response.headers["X-DB-Time-Ms"]) >= float(response.headers["X-DB-Slowest-Ms"]) > 0
+    # SQL stays out of the headers unless enabled
+    assert "X-DB-Slowest-Query" not in response.headers
+
+
+def test_queries_outside_requests_are_not_attributed(db_session, sample_menu_item):
+    assert query_metrics.current() is None
+    db_session.execute(text("SELECT 1"))
+    assert query_metrics.current() is None
+
+
+def test_slow_queries_are_logged_with_the_request_summary(client, sample_menu_item, monkeypatch, caplog):
+    monkeypatch.setattr(query_metrics, "slow_query_ms", 0)
+    with caplog.at_level(logging.INFO, logger="api.utils.query_metrics"):
+        response = client.get(f"/menu_items/{sample_menu_item.id}")
+
+    slow_logs = [record for record in caplog.records if record.getMessage().startswith("Slow query")]
+    summaries = [record.db_stats for record in caplog.records if hasattr(record, "db_stats")]
+    assert slow_logs and "menu_items" in slow_logs[0].db_statement
+    assert summaries[-1]["path"] == f"/menu_items/{sample_menu_item.id}"
+    assert summaries[-1]["status"] == 200
+    assert summaries[-1]["queries"] == int(response.headers["X-DB-Query-Count"])
+    assert summaries[-1]["slow_queries"] == summaries[-1]["queries"]
+    assert summaries[-1]["slowest_statement"]
+
+
+def test_slowest_statement_header_when_exposed():
+    metrics = QueryMetrics(slow_query_ms=1000)
+    metrics.install()
+    try:
+        engine = create_engine("sqlite://")
+        app = FastAPI()
+        app.add_middleware(QueryMetricsMiddleware, metrics=metrics, expose_sql=True)
+
+        @app.get("/numbers")
+        def numbers():
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                connection.execute(text("SELECT\n  2"))
+            return {}
+
+        response = TestClient(app).get("/numbers")
+    finally:
+        metrics.uninstall()
+
+    assert response.headers["X-DB-Query-Count"] == "2"
+    assert response.headers["X-DB-Slowest-Query"] in ("SELECT 1", "SELECT 2")
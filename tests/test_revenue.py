@@ -0,0 +1,180 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import Session
+
+from api.dependencies.database import Base
+from api.models import model_loader
+from api.models.daily_revenue import DailyRevenue
+from api.models.orders import Order, OrderType, StatusType
+from api.services.revenue_services import RevenueService
+
+DAY = date(2024, 3, 14)
+
+
+def _order(db_session, amount, order_status, hour=12, day=DAY, order_type=OrderType.TAKEOUT, discount="0.00"):
+    order = Order(
+        guest_name="Revenue Guest",
+        guest_phone="5550102020",
+        order_date=datetime.combine(day, datetime.min.time().replace(hour=hour)),
+        order_type=order_type,
+        status=order_status,
+        total_amount=Decimal(amount),
+        discount_amount=Decimal(discount),
+        tax_amount=Decimal("1.00")
+    )
+    db_session.add(order)
+    db_session.commit()
+    return order
+
+
+def _rollup(db_session):
+    return {
+        (row.revenue_date, row.order_type, row.status): (row.revenue, row.order_count)
+        for row in db_session.query(DailyRevenue).filter(DailyRevenue.order_count != 0)
+    }
+
+
+def test_rollup_follows_orders_into_and_out_of_completed(client, db_session):
+    order = _order(db_session, "40.00", StatusType.PENDING)
+    assert _rollup(db_session) == {}
+
+    response = client.put(f"/orders/{order.id}", json={"status": "completed"})
+    assert response.status_code == 200
+    assert _rollup(db_session) == {(DAY, OrderType.TAKEOUT, StatusType.COMPLETED): (Decimal("40.00"), 1)}
+
+    _order(db_session, "10.50", StatusType.COMPLETED, hour=20)
+    response = client.put(f"/orders/{order.id}", json={"status": "cancelled", "order_type": "delivery"})
+    assert response.status_code == 200
+    assert _rollup(db_session) == {
+        (DAY, OrderType.TAKEOUT, StatusType.COMPLETED): (Decimal("10.50"), 1),
+        (DAY, OrderType.DELIVERY, StatusType.CANCELLED): (Decimal("40.00"), 1),
+    }
+
+    assert client.delete(f"/orders/{order.id}").status_code == 204
+    assert _rollup(db_session) == {(DAY, OrderType.TAKEOUT, StatusType.COMPLETED): (Decimal("10.50"), 1)}
+
+
+def test_backfill_rebuilds_the_rollup(db_session):
+    _order(db_session, "20.00", StatusType.COMPLETED, discount="2.00")
+    _order(db_session, "30.00", StatusType.COMPLETED, order_type=OrderType.DINE_IN)
+    _order(db_session, "15.00", StatusType.COMPLETED, day=DAY + timedelta(days=1))
+    _order(db_session, "99.00", StatusType.PENDING)
+    expected = _rollup(db_session)
+
+    db_session.execute(delete(DailyRevenue))
+    RevenueService.backfill(db_session, DAY, DAY + timedelta(days=1))
+
+    assert _rollup(db_session) == expected
+    completed = db_session.query(DailyRevenue).filter(
+        DailyRevenue.revenue_date == DAY, DailyRevenue.order_type == OrderType.TAKEOUT
+    ).one()
+    assert (completed.discount, completed.tax) == (Decimal("2.00"), Decimal("1.00"))
+
+
+def test_revenue_range_reads_days_from_the_rollup(client, db_session, query_counter):
+    _order(db_session, "20.00", StatusType.COMPLETED)
+    _order(db_session, "5.00", StatusType.COMPLETED, order_type=OrderType.DELIVERY)
+    _order(db_session, "7.25", StatusType.COMPLETED, day=DAY + timedelta(days=2))
+    _order(db_session, "50.00", StatusType.CANCELLED)
+
+    query_counter.clear()
+    response = client.get(f"/staff_actions/revenue/range?start_date={DAY}&end_date={DAY + timedelta(days=2)}")
+
+    assert response.status_code == 200
+    assert len(query_counter) == 1
+    data = response.json()
+    assert data["total_revenue"] == 32.25
+    assert data["order_count"] == 3
+    assert [(day["date"], day["total_revenue"], day["order_count"]) for day in data["days"]] == [
+        ("2024-03-14", 25.0, 2),
+        ("2024-03-15", 0.0, 0),
+        ("2024-03-16", 7.25, 1),
+    ]
+
+    daily = client.get(f"/staff_actions/revenue/daily?target_date={DAY}").json()
+    assert (daily["total_revenue"], daily["order_count"]) == (25.0, 2)
+
+
+def test_revenue_range_rejects_reversed_dates(client):
+    response = client.get(f"/staff_actions/revenue/range?start_date={DAY}&end_date={DAY - timedelta(days=1)}")
+    assert response.status_code == 400
+
+
+def test_revenue_series_buckets_by_week_with_order_types(client, db_session, query_counter):
+    _order(db_session, "20.00", StatusType.COMPLETED, discount="4.00")
+    _order(db_session, "10.00", StatusType.COMPLETED, order_type=OrderType.DELIVERY)
+    _order(db_session, "30.00", StatusType.COMPLETED, day=DAY + timedelta(days=5))
+    _order(db_session, "80.00", StatusType.CANCELLED)
+
+    query_counter.clear()
+    response = client.get("/staff_actions/revenue/series", params={
+        "start_date": "2024-03-01", "end_date": "2024-03-31", "bucket": "week", "by_order_type": True
+    })
+
+    assert response.status_code == 200
+    assert len(query_counter) == 1
+    data = response.json()
+    assert (data["total_revenue"], data["order_count"], data["average_ticket"], data["discount_total"]) == (
+        60.0, 3, 20.0, 4.0
+    )
+    weeks = {week["bucket_start"]: week for week in data["buckets"]}
+    assert list(weeks) == ["2024-02-26", "2024-03-04", "2024-03-11", "2024-03-18", "2024-03-25"]
+    assert (weeks["2024-03-11"]["total_revenue"], weeks["2024-03-11"]["order_count"]) == (30.0, 2)
+    assert weeks["2024-03-11"]["order_types"]["takeout"]["average_ticket"] == 20.0
+    assert weeks["2024-03-11"]["order_types"]["dine_in"]["order_count"] == 0
+    assert weeks["2024-03-18"]["total_revenue"] == 30.0
+    assert weeks["2024-03-04"]["average_ticket"] == 0.0
+
+
+def test_revenue_series_by_hour_and_month(client, db_session):
+    _order(db_session, "12.00", StatusType.COMPLETED, hour=9)
+    _order(db_session, "8.00", StatusType.COMPLETED, hour=9)
+    _order(db_session, "5.00", StatusType.COMPLETED, hour=18)
+
+    hourly = client.get("/staff_actions/revenue/series", params={
+        "start_date": str(DAY), "end_date": str(DAY), "bucket": "hour"
+    }).json()
+    assert len(hourly["buckets"]) == 24
+    assert hourly["buckets"][9] == {
+        "bucket_start": "2024-03-14T09:00:00", "total_revenue": 20.0, "order_count": 2,
+        "average_ticket": 10.0, "discount_total": 0.0
+    }
+    assert hourly["buckets"][18]["total_revenue"] == 5.0
+
+    monthly = client.get("/staff_actions/revenue/series", params={
+        "start_date": "2024-01-15", "end_date": "2024-04-02", "bucket": "month"
+    }).json()
+    assert [(month["bucket_start"], month["total_revenue"]) for month in monthly["buckets"]] == [
+        ("2024-01-01", 0.0), ("2024-02-01", 0.0), ("2024-03-01", 25.0), ("2024-04-01", 0.0)
+    ]
+
+
+def test_revenue_series_validates_its_parameters(client):
+    assert client.get("/staff_actions/revenue/series", params={
+        "start_date": str(DAY), "end_date": str(DAY), "bucket": "year"
+    }).status_code == 422
+    assert client.get("/staff_actions/revenue/series", params={
+        "start_date": "2024-01-01", "end_date": "2024-03-01", "bucket": "hour"
+    }).status_code == 400
+
+
+def test_rollup_is_filled_when_its_table_is_created(tmp_path, monkeypatch):
+    """Upgrading a database that already has orders needs no manual backfill"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'upgrade.db'}")
+    Base.metadata.create_all(engine, tables=[
+        table for table in Base.metadata.sorted_tables if table.name != DailyRevenue.__tablename__
+    ])
+    with engine.begin() as connection:
+        connection.execute(Order.__table__.insert(), [{
+            "order_date": datetime(2024, 3, 14, 12), "order_type": OrderType.TAKEOUT,
+            "status": StatusType.COMPLETED, "total_amount": Decimal("12.50"), "tracking_number": "UPGRADE1"
+        }])
+    monkeypatch.setattr(model_loader, "engine", engine)
+
+    model_loader.index()
+
+    with Session(engine) as db:
+        assert _rollup(db) == {(DAY, OrderType.TAKEOUT, StatusType.COMPLETED): (Decimal("12.50"), 1)}
+    engine.dispose()
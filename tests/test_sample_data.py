@@ -0,0 +1,98 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from api.dependencies.database import Base
+from api.models.orders import Order, OrderType
+from api.models.order_details import OrderDetail
+from api.models.payments import Payment
+from api.models.reviews import Reviews
+from sample_data_generator import BulkDataGenerator, CsvSink, MAX_LINES_PER_ORDER, generate_parallel, plan_shards
+
+
+def _generate(path, seed=7):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    generator = BulkDataGenerator(engine, seed=seed, chunk_size=40, progress=False)
+    generator.ensure_reference_data()
+    generator.generate_customers(30)
+    end = datetime(2024, 6, 30, 23, 59)
+    generator.generate_orders(100, datetime(2024, 1, 1), end)
+    generator.generate_reviews(50, datetime(2024, 1, 1), end)
+    return engine
+
+
+def test_bulk_generator_writes_consistent_orders(tmp_path):
+    engine = _generate(tmp_path / "bulk.db")
+
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count(Order.id))).scalar() == 100
+        assert conn.execute(select(func.count(Reviews.id))).scalar() == 50
+        # Every order has lines and its totals add up
+        orders_without_lines = conn.execute(
+            select(func.count(Order.id)).where(~Order.order_details.any())
+        ).scalar()
+        assert orders_without_lines == 0
+        for subtotal, discount, tax, total in conn.execute(
+                select(Order.subtotal, Order.discount_amount, Order.tax_amount, Order.total_amount)):
+            assert Decimal(str(total)) == Decimal(str(subtotal)) - Decimal(str(discount)) + Decimal(str(tax))
+        # Payments only for orders that exist
+        assert conn.execute(
+            select(func.count(Payment.id)).where(~Payment.order_id.in_(select(Order.id)))
+        ).scalar() == 0
+        assert conn.execute(select(func.min(Order.order_date))).scalar() >= datetime(2024, 1, 1)
+
+
+def test_bulk_generator_is_reproducible(tmp_path):
+    def snapshot(engine):
+        with engine.connect() as conn:
+            return (
+                conn.execute(select(Order.id, Order.order_date, Order.status, Order.total_amount)).all(),
+                conn.execute(select(OrderDetail.order_id, OrderDetail.menu_item_id, OrderDetail.amount)).all(),
+            )
+
+    assert snapshot(_generate(tmp_path / "first.db")) == snapshot(_generate(tmp_path / "second.db"))
+
+
+def test_shard_plans_have_disjoint_id_ranges():
+    plans = plan_shards(orders=10, reviews=5, shards=3, seed=1, first_order_id=100, first_detail_id=500,
+                        first_payment_id=50, first_review_id=7)
+
+    assert [plan.orders for plan in plans] == [4, 3, 3]
+    assert [plan.reviews for plan in plans] == [2, 2, 1]
+    assert [plan.order_id for plan in plans] == [100, 104, 107]
+    assert [plan.detail_id for plan in plans] == [500, 500 + 4 * MAX_LINES_PER_ORDER, 500 + 7 * MAX_LINES_PER_ORDER]
+    assert [plan.review_id for plan in plans] == [7, 9, 11]
+    assert len({plan.seed for plan in plans}) == 3
+    assert plan_shards(10, 5, 3, 1, 100, 500, 50, 7) == plans
+
+
+@pytest.mark.slow
+def test_parallel_generation_writes_every_shard(tmp_path):
+    url = f"sqlite:///{tmp_path / 'parallel.db'}"
+    totals = generate_parallel(url, customers=20, orders=90, reviews=30, end=datetime(2024, 6, 30),
+                               seed=3, shards=3, workers=2, chunk_size=25)
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count(Order.id))).scalar() == totals["orders"] == 90
+        assert conn.execute(select(func.count(OrderDetail.id))).scalar() == totals["order_details"]
+        assert conn.execute(select(func.count(Reviews.id))).scalar() == 30
+        assert conn.execute(select(func.count(func.distinct(OrderDetail.order_id)))).scalar() == 90
+
+
+def test_csv_sink_formats_rows_for_load_data(tmp_path):
+    sink = CsvSink(str(tmp_path), suffix=".shard000")
+    sink.write([(Order.__table__, [
+        {"id": 1, "order_type": OrderType.TAKEOUT, "guest_name": "Pat, Jr.", "order_date": datetime(2024, 1, 2, 3, 4, 5),
+         "promotion_code": None},
+    ])])
+    sink.close()
+
+    with open(sink.paths["orders"]) as csv_file:
+        assert csv_file.read().splitlines() == [
+            "id,order_type,guest_name,order_date,promotion_code",
+            '1,TAKEOUT,"Pat, Jr.",2024-01-02 03:04:05,NULL',
+        ]